@@ -0,0 +1,201 @@
+"""Pluggable backends that perform automation actions, plus trace recording and replay"""
+import abc
+import argparse
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from automation_engine import Action, ClickAction, KeyAction, TypeAction, action_to_dict, compile_action
+
+try:
+    import pyautogui
+    GUI_AVAILABLE = True
+except Exception as e:
+    logging.warning(f"GUI libraries not available: {str(e)}. Running in headless mode.")
+    GUI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+MAX_TRACE_ENTRIES = 100_000
+
+
+class ActionBackend(abc.ABC):
+    """Performs actions handed over by the scheduler"""
+    name = "base"
+
+    @abc.abstractmethod
+    def perform(self, action: Action):
+        """Carry out one click, key press or typed text"""
+
+    def dispatch(self, action: Action, script_id: str, deadline: float):
+        """Called by the scheduler with the monotonic time the action was due"""
+        self.perform(action)
+
+    def stats(self) -> dict:
+        return {}
+
+
+class PyAutoGUIBackend(ActionBackend):
+    """Drives the real mouse and keyboard"""
+    name = "pyautogui"
+
+    def __init__(self):
+        if not GUI_AVAILABLE:
+            raise RuntimeError("GUI libraries not available")
+        # The scheduler owns the timing between actions
+        pyautogui.PAUSE = 0
+
+    def perform(self, action: Action):
+        if isinstance(action, ClickAction):
+            pyautogui.click(action.x, action.y)
+        elif isinstance(action, KeyAction):
+            pyautogui.press(action.key)
+        elif isinstance(action, TypeAction):
+            pyautogui.write(action.text)
+
+
+class LoggingBackend(ActionBackend):
+    """Headless fallback that only logs what it would do"""
+    name = "log"
+
+    def perform(self, action: Action):
+        logging.info(f"Simulating action: {action_to_dict(action)}")
+
+
+@dataclass(frozen=True)
+class TraceEntry:
+    script_id: str
+    action: Action
+    deadline: float  # monotonic time the action was due
+    dispatched: float  # monotonic time it was handed to the backend
+
+    @property
+    def lateness(self) -> float:
+        return self.dispatched - self.deadline
+
+
+class RecordingBackend(ActionBackend):
+    """Keeps a timestamped in-memory trace of every dispatched action
+
+    Nothing is performed, so the scheduler's throughput and timing error
+    can be measured on headless machines. The trace holds the last
+    ``max_entries`` actions.
+    """
+    name = "recorder"
+
+    def __init__(self, max_entries: int = MAX_TRACE_ENTRIES):
+        self.entries: deque = deque(maxlen=max_entries)
+
+    def perform(self, action: Action):
+        pass
+
+    def dispatch(self, action: Action, script_id: str, deadline: float):
+        self.entries.append(TraceEntry(script_id, action, deadline, time.monotonic()))
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return trace_stats(list(self.entries))
+
+    def to_trace(self) -> dict:
+        """Serializable trace with times relative to the first entry"""
+        entries = list(self.entries)
+        origin = entries[0].deadline if entries else 0.0
+        return {
+            "version": TRACE_VERSION,
+            "entries": [
+                {
+                    "script_id": entry.script_id,
+                    "action": action_to_dict(entry.action),
+                    "at": round(entry.deadline - origin, 6),
+                    "lateness": round(entry.lateness, 6),
+                }
+                for entry in entries
+            ],
+        }
+
+
+def trace_stats(entries: List[TraceEntry]) -> dict:
+    """Throughput and timing error of a list of trace entries"""
+    if not entries:
+        return {"actions": 0}
+    lateness = np.array([entry.lateness for entry in entries]) * 1000
+    duration = entries[-1].dispatched - entries[0].dispatched
+    return {
+        "actions": len(entries),
+        "duration": duration,
+        "actions_per_sec": (len(entries) - 1) / duration if duration > 0 else None,
+        "lateness_ms": {
+            "mean": float(lateness.mean()),
+            "p50": float(np.percentile(lateness, 50)),
+            "p99": float(np.percentile(lateness, 99)),
+            "max": float(lateness.max()),
+        },
+        "scripts": sorted({entry.script_id for entry in entries}),
+    }
+
+
+BACKENDS = {backend.name: backend for backend in (PyAutoGUIBackend, LoggingBackend, RecordingBackend)}
+
+
+def create_backend(name: Optional[str] = None) -> ActionBackend:
+    """Instantiate a backend by name; defaults to pyautogui when available"""
+    name = name or ("pyautogui" if GUI_AVAILABLE else "log")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown automation backend: {name}")
+    return BACKENDS[name]()
+
+
+def load_trace(trace: dict) -> List[dict]:
+    if trace.get("version") != TRACE_VERSION:
+        raise ValueError(f"Unsupported trace version: {trace.get('version')}")
+    return [
+        {"script_id": entry["script_id"], "action": compile_action(entry["action"]), "at": float(entry["at"])}
+        for entry in trace["entries"]
+    ]
+
+
+def replay(entries: Iterable[dict], backend: ActionBackend, speed: Optional[float] = 1.0) -> dict:
+    """Dispatch recorded actions again; ``speed=None`` runs as fast as possible
+
+    With a speed, each action is due ``at / speed`` seconds after the
+    replay started and waits for its monotonic deadline; the returned stats
+    measure the replay itself.
+    """
+    recorder = RecordingBackend(max_entries=None)
+    started = time.monotonic()
+    for entry in entries:
+        if speed:
+            deadline = started + entry["at"] / speed
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        else:
+            deadline = time.monotonic()
+        recorder.dispatch(entry["action"], entry["script_id"], deadline)
+        backend.dispatch(entry["action"], entry["script_id"], deadline)
+    return {**recorder.stats(), "backend": backend.name, "speed": speed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded automation trace")
+    parser.add_argument("trace", help="trace JSON written from GET /api/automation/trace")
+    parser.add_argument("--speed", default="1", help="playback speed factor, or 'max' for as fast as possible")
+    parser.add_argument("--backend", default="recorder", choices=sorted(BACKENDS))
+    args = parser.parse_args()
+
+    with open(args.trace) as trace_file:
+        entries = load_trace(json.load(trace_file))
+    speed = None if args.speed == "max" else float(args.speed)
+    print(json.dumps(replay(entries, create_backend(args.backend), speed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Automation scripts compiled to typed actions and run on a deadline scheduler"""
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from deadline_scheduler import DeadlineScheduler
+
+logger = logging.getLogger(__name__)
+
+ACTION_DELAY = 0.1  # gap after every action
+LOOP_DELAY = 1.0  # gap between two passes over a script
+
+
+@dataclass(frozen=True)
+class ClickAction:
+    x: int
+    y: int
+
+
+@dataclass(frozen=True)
+class KeyAction:
+    key: str
+
+
+@dataclass(frozen=True)
+class TypeAction:
+    text: str
+
+
+@dataclass(frozen=True)
+class WaitAction:
+    duration: float
+
+
+Action = Union[ClickAction, KeyAction, TypeAction, WaitAction]
+
+
+def _number(action: dict, key: str, default: float, cast: Callable = float):
+    value = action.get(key)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {key} for {action.get('type')} action: {value!r}")
+
+
+def compile_action(action: dict) -> Action:
+    """Validate one action dict from a script and turn it into a typed action"""
+    action_type = action.get("type")
+    if action_type == "click":
+        return ClickAction(x=_number(action, "x", 100, int), y=_number(action, "y", 100, int))
+    if action_type == "key":
+        return KeyAction(key=str(action.get("key") or "space"))
+    if action_type == "type":
+        return TypeAction(text=str(action.get("text") or ""))
+    if action_type == "wait":
+        duration = _number(action, "duration", 1.0)
+        if duration < 0:
+            raise ValueError("Wait duration cannot be negative")
+        return WaitAction(duration=duration)
+    raise ValueError(f"Unknown action type: {action_type!r}")
+
+
+ACTION_TYPES = {ClickAction: "click", KeyAction: "key", TypeAction: "type", WaitAction: "wait"}
+
+
+def action_to_dict(action: Action) -> dict:
+    """Inverse of ``compile_action``, used when saving traces"""
+    return {"type": ACTION_TYPES[type(action)], **asdict(action)}
+
+
+@dataclass(frozen=True)
+class CompiledScript:
+    """Dispatchable actions with their start offsets within one pass
+
+    Waits are folded into the offsets, so the scheduler only ever sees
+    actions that do something. ``period`` is the length of one pass.
+    """
+    actions: Tuple[Action, ...]
+    offsets: Tuple[float, ...]
+    period: float
+
+
+def compile_script(actions: List[Dict[str, Any]], action_delay: float = ACTION_DELAY,
+                   loop_delay: float = LOOP_DELAY) -> CompiledScript:
+    compiled, offsets = [], []
+    elapsed = 0.0
+    for action in map(compile_action, actions):
+        if isinstance(action, WaitAction):
+            elapsed += action.duration
+        else:
+            compiled.append(action)
+            offsets.append(elapsed)
+        elapsed += action_delay
+    if not compiled:
+        raise ValueError("Script has no click, key or type actions")
+    return CompiledScript(tuple(compiled), tuple(offsets), elapsed + loop_delay)
+
+
+@dataclass
+class ScriptRun:
+    script_id: str
+    name: str
+    script: CompiledScript
+    max_loops: Optional[int] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    loops: int = 0
+    dispatched: int = 0
+    errors: int = 0
+    max_lateness: float = 0.0
+    total_lateness: float = 0.0
+    stopped: bool = False
+    _index: int = 0
+    _loop_start: float = 0.0
+
+    def status(self) -> dict:
+        return {
+            "script_id": self.script_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "loops": self.loops,
+            "dispatched": self.dispatched,
+            "errors": self.errors,
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+            "mean_lateness_ms": round(self.total_lateness / self.dispatched * 1000, 3) if self.dispatched else 0.0,
+            "running": not self.stopped,
+        }
+
+    def advance(self, now: float) -> Optional[float]:
+        """Move to the next action and return its deadline, or None when done"""
+        self._index += 1
+        if self._index == len(self.script.actions):
+            self._index = 0
+            self.loops += 1
+            if self.max_loops is not None and self.loops >= self.max_loops:
+                return None
+            self._loop_start += self.script.period
+        deadline = self._loop_start + self.script.offsets[self._index]
+        if deadline < now:
+            # Running behind (a slow dispatch): shift the schedule instead of
+            # firing the missed actions back to back
+            self._loop_start += now - deadline
+            deadline = now
+        return deadline
+
+
+class AutomationEngine:
+    """Runs any number of scripts concurrently on one scheduler thread
+
+    Every run's next action waits on a ``DeadlineScheduler`` heap ordered
+    by its monotonic deadline. Deadlines are computed from the start of the
+    pass rather than from the end of the previous action, so dispatch time
+    does not add up into drift. Actions are handed to ``backend.dispatch``
+    (see ``automation_backends``), which may be swapped while scripts run.
+    ``on_finish`` is called from the scheduler thread with every run that
+    ends by reaching its ``max_loops``.
+    """
+
+    def __init__(self, backend, on_finish: Optional[Callable[[ScriptRun], None]] = None):
+        self.backend = backend
+        self.on_finish = on_finish
+        self._runs: Dict[str, ScriptRun] = {}
+        self._scheduler = DeadlineScheduler("automation-scheduler", self._dispatch)
+        self._wakeup = self._scheduler.condition
+
+    @property
+    def active(self) -> bool:
+        return any(not run.stopped for run in self._runs.values())
+
+    def start(self, script_id: str, name: str, script: CompiledScript, max_loops: Optional[int] = None) -> ScriptRun:
+        with self._wakeup:
+            current = self._runs.get(script_id)
+            if current is not None and not current.stopped:
+                raise ValueError(f"Script {script_id} is already running")
+            run = ScriptRun(script_id, name, script, max_loops)
+            run._loop_start = time.monotonic()
+            self._runs[script_id] = run
+            self._scheduler.schedule(run, run._loop_start + script.offsets[0])
+        return run
+
+    def stop(self, script_id: str) -> bool:
+        with self._wakeup:
+            run = self._runs.get(script_id)
+            if run is None or run.stopped:
+                return False
+            run.stopped = True
+            self._wakeup.notify()
+        return True
+
+    def stop_all(self) -> int:
+        with self._wakeup:
+            running = [run for run in self._runs.values() if not run.stopped]
+            for run in running:
+                run.stopped = True
+            self._scheduler.clear()
+        return len(running)
+
+    def runs(self) -> List[dict]:
+        return [run.status() for run in self._runs.values()]
+
+    def get(self, script_id: str) -> Optional[ScriptRun]:
+        return self._runs.get(script_id)
+
+    def shutdown(self):
+        self.stop_all()
+        self._scheduler.shutdown()
+
+    def _dispatch(self, run: ScriptRun, deadline: float) -> Optional[float]:
+        """Perform the due action of ``run``; returns the deadline of its next one"""
+        lateness = time.monotonic() - deadline
+        try:
+            self.backend.dispatch(run.script.actions[run._index], run.script_id, deadline)
+        except Exception as e:
+            run.errors += 1
+            logger.error(f"Automation error in {run.name}: {str(e)}")
+        run.dispatched += 1
+        run.total_lateness += lateness
+        run.max_lateness = max(run.max_lateness, lateness)
+
+        with self._wakeup:
+            if run.stopped:
+                return None
+            deadline = run.advance(time.monotonic())
+            if deadline is not None:
+                return deadline
+            run.stopped = True
+        if self.on_finish is not None:
+            try:
+                self.on_finish(run)
+            except Exception as e:
+                logger.error(f"Automation finish callback error: {str(e)}")
+        return None
@@ -0,0 +1,87 @@
+"""One thread that runs scheduled items at monotonic deadlines"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class DeadlineScheduler:
+    """Heap of ``(deadline, item)`` pairs served in deadline order by one thread
+
+    Items are anything with a ``stopped`` flag. When an item is due, the
+    thread calls ``fire(item, deadline)`` without holding the lock; it
+    returns the item's next deadline, or None when the item is done. Items
+    that were stopped while waiting are dropped. ``condition`` is the
+    reentrant lock that owners hold while changing their own state;
+    ``notify`` wakes the thread after such a change.
+    """
+
+    def __init__(self, name: str, fire: Callable[[Any, float], Optional[float]]):
+        self.name = name
+        self.fire = fire
+        self.condition = threading.Condition()
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def schedule(self, item, deadline: float):
+        """Queue ``item`` to fire at the monotonic time ``deadline``"""
+        with self.condition:
+            heapq.heappush(self._heap, (deadline, next(self._sequence), item))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self.condition.notify()
+
+    def notify(self):
+        with self.condition:
+            self.condition.notify()
+
+    def clear(self) -> List[Any]:
+        """Unschedule every item; returns them"""
+        with self.condition:
+            pending = [item for _, _, item in self._heap]
+            self._heap.clear()
+            self.condition.notify()
+        return pending
+
+    def shutdown(self) -> List[Any]:
+        """Stop the thread; returns the items that were still scheduled"""
+        with self.condition:
+            self._closed = True
+        pending = self.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        return pending
+
+    def _next_due(self) -> Optional[Tuple[float, Any]]:
+        """Block until the earliest deadline is due; None once shut down"""
+        with self.condition:
+            while not self._closed:
+                while self._heap and self._heap[0][2].stopped:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self.condition.wait()
+                    continue
+                remaining = self._heap[0][0] - time.monotonic()
+                if remaining <= 0:
+                    deadline, _, item = heapq.heappop(self._heap)
+                    return deadline, item
+                self.condition.wait(remaining)
+        return None
+
+    def _run(self):
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            deadline, item = due
+            deadline = self.fire(item, deadline)
+            if deadline is None:
+                continue
+            with self.condition:
+                if not item.stopped:
+                    heapq.heappush(self._heap, (deadline, next(self._sequence), item))
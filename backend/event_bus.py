@@ -0,0 +1,106 @@
+"""In-process change events with fan-out to WebSocket subscribers"""
+import asyncio
+import itertools
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKLOG = 256  # undelivered events kept per subscriber
+
+
+class EventSubscription:
+    """Bounded queue of serialized events for one subscriber
+
+    Unlike telemetry frames, events cannot be collapsed into the latest
+    one, so a subscriber that falls ``MAX_BACKLOG`` events behind gets its
+    backlog replaced by a single ``resync`` event telling it to re-fetch.
+    """
+
+    def __init__(self, max_backlog: int = MAX_BACKLOG):
+        self.max_backlog = max_backlog
+        self.dropped = 0
+        self.closed = False
+        self._events: deque = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, event: str):
+        if len(self._events) >= self.max_backlog:
+            self.dropped += len(self._events)
+            self._events.clear()
+            event = json.dumps({"type": "resync", "timestamp": datetime.utcnow().isoformat()})
+        self._events.append(event)
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def next(self) -> Optional[str]:
+        """Wait for the next event; returns None once the subscription is closed"""
+        while not self._events:
+            if self.closed:
+                return None
+            await self._ready.wait()
+            self._ready.clear()
+        return self._events.popleft()
+
+
+class EventBus:
+    """Publishes change events to every subscriber on the event loop
+
+    Each event is serialized once no matter how many clients listen.
+    ``publish`` may be called from worker threads (the automation
+    scheduler, the freeze writer); the event is then handed to the loop
+    that the bus was started on.
+    """
+
+    def __init__(self):
+        self.published = 0
+        self._subscribers: Set[EventSubscription] = set()
+        self._sequence = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> EventSubscription:
+        subscription = EventSubscription()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription):
+        self._subscribers.discard(subscription)
+        subscription.close()
+
+    def publish(self, event_type: str, **data):
+        event = {"type": event_type, "timestamp": datetime.utcnow().isoformat(), **data}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is not None and running is not self._loop:
+            if not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._deliver, event)
+            return
+        self._deliver(event)
+
+    def _deliver(self, event: dict):
+        event["seq"] = next(self._sequence)
+        self.published += 1
+        if not self._subscribers:
+            return
+        frame = json.dumps(event, default=str)
+        for subscription in self._subscribers:
+            subscription.push(frame)
+
+    def close(self):
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
@@ -0,0 +1,239 @@
+"""Frozen values: one background writer re-applies them on a fixed-rate tick"""
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from deadline_scheduler import DeadlineScheduler
+from memory_io import encode_value, parse_address, plan_writes, write_run
+from process_registry import ProcessHandle
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FREEZE_RATE = 20.0  # ticks per second
+MAX_FREEZE_RATE = 1000.0
+MAX_FROZEN_VALUES = 4096
+LATENCY_WINDOW = 1024  # ticks kept for the latency percentiles
+
+
+@dataclass(frozen=True)
+class FrozenValue:
+    address: int
+    data_type: str
+    value: Any
+    payload: bytes
+
+    @classmethod
+    def from_request(cls, entry: dict) -> "FrozenValue":
+        data_type = entry.get("data_type", "int").lower()
+        return cls(parse_address(entry["address"]), data_type, entry["value"], encode_value(entry["value"], data_type))
+
+    def to_dict(self) -> dict:
+        return {"address": hex(self.address), "data_type": self.data_type, "value": self.value}
+
+
+def check_rate(rate: float) -> float:
+    if not 0 < rate <= MAX_FREEZE_RATE:
+        raise ValueError(f"Freeze rate must be between 0 and {MAX_FREEZE_RATE:g} ticks per second")
+    return float(rate)
+
+
+class FreezeList:
+    """Frozen values of one process and the write plan compiled from them
+
+    The plan groups the values into runs of adjacent addresses (see
+    ``plan_writes``) whenever the list changes, so a tick is one
+    ``pwritev`` per run on the pooled descriptor of the process handle.
+    """
+
+    def __init__(self, handle: ProcessHandle, rate: float = DEFAULT_FREEZE_RATE):
+        self.handle = handle
+        self.pid = handle.pid
+        self.rate = check_rate(rate)
+        self.values: Dict[int, FrozenValue] = {}
+        self.created_at = datetime.utcnow()
+        self.ticks = 0
+        self.missed = 0
+        self.writes = 0
+        self.failed = 0
+        self.syscalls = 0
+        self.max_lateness = 0.0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.failing: List[int] = []  # addresses the last tick could not write
+        self.stopped = False
+        self.exited = False
+        # (run address, payloads, value addresses), swapped whole on change
+        self._plan: Tuple[Tuple[int, Tuple[bytes, ...], Tuple[int, ...]], ...] = ()
+
+    @property
+    def period(self) -> float:
+        return 1.0 / self.rate
+
+    def update(self, values: Sequence[FrozenValue] = (), remove: Sequence[int] = ()):
+        """Add or replace values by address and drop ``remove``; the list is unchanged on error"""
+        merged = dict(self.values)
+        for address in remove:
+            merged.pop(address, None)
+        for value in values:
+            merged[value.address] = value
+        if len(merged) > MAX_FROZEN_VALUES:
+            raise ValueError(f"At most {MAX_FROZEN_VALUES} values can be frozen per process")
+
+        entries = list(merged.values())
+        runs = plan_writes(np.array([value.address for value in entries], dtype=np.uint64),
+                           [len(value.payload) for value in entries])
+        self._plan = tuple(
+            (entries[run[0]].address, tuple(entries[i].payload for i in run), tuple(entries[i].address for i in run))
+            for run in runs
+        )
+        self.values = merged
+
+    def tick(self, deadline: float):
+        """Write every frozen value once; called by the writer thread"""
+        started = time.monotonic()
+        self.max_lateness = max(self.max_lateness, started - deadline)
+        plan = self._plan
+        failing = []
+        try:
+            with self.handle.memory(writable=True) as memory:
+                for address, payloads, addresses in plan:
+                    for value_address, ok in zip(addresses, write_run(memory, address, payloads)):
+                        if not ok:
+                            failing.append(value_address)
+        except OSError as e:
+            logger.debug(f"Cannot open memory of pid {self.pid}: {e}")
+            failing = [address for _, _, addresses in plan for address in addresses]
+
+        written = sum(len(addresses) for _, _, addresses in plan) - len(failing)
+        self.latencies.append(time.monotonic() - started)
+        self.ticks += 1
+        self.syscalls += len(plan)
+        self.writes += written
+        self.failed += len(failing)
+        self.failing = failing
+        if failing and not written and not self.handle.alive():
+            self.exited = True
+            self.stopped = True
+
+    def next_deadline(self, deadline: float, now: float) -> float:
+        """Deadline after ``deadline``, skipping (and counting) the ticks that are already past"""
+        deadline += self.period
+        if deadline <= now:
+            skipped = int((now - deadline) / self.period) + 1
+            self.missed += skipped
+            deadline += skipped * self.period
+        return deadline
+
+    def status(self) -> dict:
+        latencies = np.array(self.latencies) * 1000
+        return {
+            "pid": self.pid,
+            "rate": self.rate,
+            "values": [value.to_dict() for value in self.values.values()],
+            "created_at": self.created_at.isoformat(),
+            "ticks": self.ticks,
+            "missed_deadlines": self.missed,
+            "writes": self.writes,
+            "failed_writes": self.failed,
+            "syscalls": self.syscalls,
+            "failing": [hex(address) for address in self.failing],
+            "syscalls_per_tick": len(self._plan),
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+            "latency_ms": {
+                "last": round(float(latencies[-1]), 3),
+                "mean": round(float(latencies.mean()), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+                "max": round(float(latencies.max()), 3),
+            } if latencies.size else None,
+            "running": not self.stopped,
+            "exited": self.exited,
+        }
+
+
+class FreezeEngine:
+    """Keeps the freeze lists of all processes on one writer thread
+
+    Each list's next tick waits on a ``DeadlineScheduler`` heap ordered by
+    its monotonic deadline. Ticks are due at fixed multiples of the period;
+    a writer that falls behind skips the ticks it missed and counts them
+    instead of writing back to back.
+    """
+
+    def __init__(self):
+        self._lists: Dict[int, FreezeList] = {}
+        self._scheduler = DeadlineScheduler("memory-freeze", self._tick)
+        self._wakeup = self._scheduler.condition
+
+    def freeze(self, handle: ProcessHandle, values: Sequence[FrozenValue], rate: Optional[float] = None) -> FreezeList:
+        """Add values to the freeze list of the process behind ``handle``, creating it if needed"""
+        with self._wakeup:
+            freeze_list = self._lists.get(handle.pid)
+            if freeze_list is not None and freeze_list.handle is not handle:
+                # The pid was reconnected; the old list wrote to another process
+                self._stop(freeze_list)
+                freeze_list = None
+            if freeze_list is None or freeze_list.stopped:
+                freeze_list = FreezeList(handle, DEFAULT_FREEZE_RATE if rate is None else rate)
+                freeze_list.update(values)
+                self._lists[handle.pid] = freeze_list
+                self._scheduler.schedule(freeze_list, time.monotonic())
+            else:
+                if rate is not None:
+                    freeze_list.rate = check_rate(rate)
+                freeze_list.update(values)
+        return freeze_list
+
+    def unfreeze(self, pid: int, addresses: Optional[Sequence[int]] = None) -> int:
+        """Drop the given addresses, or the whole list; returns how many values were dropped"""
+        with self._wakeup:
+            freeze_list = self._lists.get(pid)
+            if freeze_list is None:
+                return 0
+            if addresses is None:
+                self._stop(freeze_list)
+                return len(freeze_list.values)
+            before = len(freeze_list.values)
+            freeze_list.update(remove=addresses)
+            if not freeze_list.values:
+                self._stop(freeze_list)
+            return before - len(freeze_list.values)
+
+    def forget(self, pid: int):
+        self.unfreeze(pid)
+
+    def get(self, pid: int) -> Optional[FreezeList]:
+        return self._lists.get(pid)
+
+    def lists(self) -> List[dict]:
+        return [freeze_list.status() for freeze_list in self._lists.values()]
+
+    def shutdown(self):
+        with self._wakeup:
+            for freeze_list in list(self._lists.values()):
+                self._stop(freeze_list)
+        self._scheduler.shutdown()
+
+    def _stop(self, freeze_list: FreezeList):
+        freeze_list.stopped = True
+        if self._lists.get(freeze_list.pid) is freeze_list:
+            del self._lists[freeze_list.pid]
+        self._wakeup.notify()
+
+    def _tick(self, freeze_list: FreezeList, deadline: float) -> Optional[float]:
+        """Write one tick of ``freeze_list``; returns the deadline of its next tick"""
+        try:
+            freeze_list.tick(deadline)
+        except Exception as e:
+            logger.error(f"Freeze tick error for pid {freeze_list.pid}: {str(e)}")
+
+        with self._wakeup:
+            if freeze_list.exited:
+                logger.info(f"Process {freeze_list.pid} exited; dropping its freeze list")
+                self._stop(freeze_list)
+            if freeze_list.stopped:
+                return None
+            return freeze_list.next_deadline(deadline, time.monotonic())
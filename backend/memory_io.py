@@ -0,0 +1,275 @@
+"""Coalesced access to many scattered addresses in /proc/<pid>/mem"""
+import logging
+import os
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from memory_scanner import NUMERIC_TYPES, PAGE_SIZE, ProcessMemory, compile_pattern, to_scalar
+
+logger = logging.getLogger(__name__)
+
+# Addresses closer than this are read with a single syscall
+COALESCE_GAP = 4 * PAGE_SIZE
+# Spans are split once they grow past this many bytes
+MAX_SPAN = 1024 * 1024
+IOV_MAX = os.sysconf("SC_IOV_MAX") if "SC_IOV_MAX" in os.sysconf_names else 1024
+
+
+def plan_spans(addresses: np.ndarray, sizes: Union[int, np.ndarray], max_gap: int = COALESCE_GAP,
+               max_span: int = MAX_SPAN) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group sorted ``addresses`` into contiguous read spans
+
+    Returns ``(span_starts, span_ends, span_of)`` where ``span_of[i]`` is the
+    index of the span that covers ``addresses[i]``. A span is split every
+    ``max_span`` bytes, so no span is longer than ``max_span`` plus the
+    largest entry, however densely the addresses are packed.
+    """
+    addresses = np.asarray(addresses, dtype=np.uint64)
+    if not addresses.size:
+        empty = np.empty(0, dtype=np.uint64)
+        return empty, empty, np.empty(0, dtype=np.intp)
+
+    ends = np.maximum.accumulate(addresses + np.asarray(sizes, dtype=np.uint64))
+    gaps = addresses[1:] > ends[:-1] + np.uint64(max_gap)
+    run_start = addresses[np.concatenate(([0], np.flatnonzero(gaps) + 1))][np.concatenate(([0], np.cumsum(gaps)))]
+    slot = (addresses - run_start) // np.uint64(max_span)
+    breaks = np.flatnonzero(gaps | (slot[1:] != slot[:-1])) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks, [addresses.size])) - 1
+    span_of = np.repeat(np.arange(first.size), last - first + 1)
+    return addresses[first], ends[last], span_of
+
+
+def _read_span(memory: ProcessMemory, view: memoryview, start: int, end: int) -> list:
+    """Read ``[start, end)`` into ``view`` and return the unreadable sub-ranges"""
+    try:
+        read = memory.readinto(view, start)
+        if start + read >= end:
+            return []
+    except OSError:
+        read = 0
+
+    # Fall back to page-sized reads so one bad page does not sink the span
+    bad = []
+    address = start + read
+    while address < end:
+        page_end = min((address // PAGE_SIZE + 1) * PAGE_SIZE, end)
+        try:
+            got = memory.readinto(view[address - start:page_end - start], address)
+        except OSError:
+            got = 0
+        if got < page_end - address:
+            bad.append((address + got, page_end))
+        address = page_end
+    return bad
+
+
+def _unaligned(buffer: np.ndarray, size: int) -> np.ndarray:
+    """View of ``buffer`` with one ``size``-byte element starting at every byte"""
+    return np.ndarray(shape=(buffer.size - size + 1,), dtype=np.dtype(f"V{size}"), buffer=buffer, strides=(1,))
+
+
+def read_scattered(memory: ProcessMemory, addresses: np.ndarray, sizes: Union[int, np.ndarray],
+                   max_gap: int = COALESCE_GAP) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Read the bytes behind many sorted addresses with one syscall per span
+
+    Returns ``(buffer, offsets, valid)``: the bytes of ``addresses[i]`` start
+    at ``buffer[offsets[i]]`` and are only meaningful where ``valid[i]``.
+    Spans are read one at a time into a scratch buffer and only the bytes
+    of the entries are kept, so the gaps between them are never held at once.
+    """
+    addresses = np.asarray(addresses, dtype=np.uint64)
+    sizes = np.broadcast_to(np.asarray(sizes, dtype=np.uint64), addresses.shape)
+    starts, ends, span_of = plan_spans(addresses, sizes, max_gap)
+    lengths = (ends - starts).astype(np.int64)
+    counts = sizes.astype(np.int64)
+    offsets = np.cumsum(counts) - counts
+    buffer = np.empty(int(counts.sum()), dtype=np.uint8)
+    scratch = np.empty(int(lengths.max()) if lengths.size else 0, dtype=np.uint8)
+    view = memoryview(scratch)
+    # Entries of one size are copied as single ``V<size>`` elements read at
+    # span-local byte offsets, so no per-byte index is ever built
+    uniform = bool(counts.size) and counts.min() == counts.max()
+    groups = []
+    for size in [int(counts[0])] if uniform else np.unique(counts).tolist():
+        if size <= 0:
+            continue
+        index = None if uniform else np.flatnonzero(counts == size)
+        bounds = np.searchsorted(span_of if index is None else span_of[index], np.arange(starts.size + 1)).tolist()
+        groups.append((size, index, bounds, _unaligned(buffer, size)))
+
+    bad = []
+    for span, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        bad.extend(_read_span(memory, view[:end - start], start, end))
+        for size, index, bounds, target in groups:
+            low, high = bounds[span], bounds[span + 1]
+            if low == high:
+                continue
+            entries = slice(low, high) if index is None else index[low:high]
+            local = (addresses[entries] - np.uint64(start)).astype(np.intp)
+            target[offsets[entries]] = _unaligned(scratch[:end - start], size)[local]
+
+    valid = np.ones(addresses.size, dtype=bool)
+    if bad:
+        # An entry is unreadable when the first bad range ending past its
+        # start also begins before its end
+        bad.sort()
+        bad_starts = np.array([bad_start for bad_start, _ in bad], dtype=np.uint64)
+        bad_ends = np.maximum.accumulate(np.array([bad_end for _, bad_end in bad], dtype=np.uint64))
+        first = np.searchsorted(bad_ends, addresses, side="right")
+        hit = first < len(bad)
+        valid[hit] = bad_starts[first[hit]] >= addresses[hit] + sizes[hit]
+        logger.debug(f"{int((~valid).sum())} of {addresses.size} addresses unreadable in pid {memory.pid}")
+    return buffer, offsets, valid
+
+
+def gather(buffer: np.ndarray, offsets: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Pick one ``dtype`` value at each byte offset of ``buffer``"""
+    count = buffer.size - dtype.itemsize + 1
+    if count <= 0:
+        return np.empty(0, dtype=dtype)
+    unaligned = np.ndarray(shape=(count,), dtype=dtype, buffer=buffer, strides=(1,))
+    return unaligned[offsets]
+
+
+def read_values(memory: ProcessMemory, addresses: np.ndarray, dtype: np.dtype,
+                max_gap: int = COALESCE_GAP) -> Tuple[np.ndarray, np.ndarray]:
+    """Read one ``dtype`` value per sorted address; returns ``(values, valid)``"""
+    buffer, offsets, valid = read_scattered(memory, addresses, dtype.itemsize, max_gap)
+    return gather(buffer, offsets, dtype), valid
+
+
+def parse_offset(offset: Union[int, str]) -> int:
+    """Accept integer offsets as well as hex strings such as ``-0x18``"""
+    return offset if isinstance(offset, int) else int(str(offset), 0)
+
+
+def parse_address(address: Union[int, str]) -> int:
+    """Accept integer addresses as well as hex strings such as ``0x7FFE1000``"""
+    address = parse_offset(address)
+    if address < 0:
+        raise ValueError(f"Negative address: {address}")
+    return address
+
+
+def format_address(address: int) -> str:
+    """Canonical ``0x7FFE1000`` form that addresses are stored under"""
+    return f"0x{address:X}"
+
+
+def entry_size(data_type: str, size: Optional[int] = None) -> int:
+    """Byte size of one value of ``data_type``; strings and bytes need ``size``"""
+    data_type = data_type.lower()
+    if data_type in NUMERIC_TYPES:
+        return NUMERIC_TYPES[data_type].itemsize
+    if data_type not in ("string", "bytes"):
+        raise ValueError(f"Unsupported data type: {data_type}")
+    if not size or size <= 0:
+        raise ValueError(f"A positive size is required to read {data_type} values")
+    return size
+
+
+def encode_value(value: Any, data_type: str) -> bytes:
+    """Serialize ``value`` to the bytes written into the target"""
+    data_type = data_type.lower()
+    if data_type in NUMERIC_TYPES:
+        return to_scalar(value, NUMERIC_TYPES[data_type]).tobytes()
+    return compile_pattern(value, data_type).value
+
+
+def decode_value(raw: bytes, data_type: str) -> Any:
+    if data_type == "string":
+        return raw.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+    return raw.hex()
+
+
+def read_batch(memory: ProcessMemory, addresses: Sequence[int], data_types: Sequence[str],
+               sizes: Sequence[Optional[int]], max_gap: int = COALESCE_GAP) -> Tuple[List[Any], List[bool]]:
+    """Read many typed values at once; results come back in request order
+
+    Entries are sorted by address and coalesced into page spans, so a few
+    hundred watched addresses usually cost a handful of ``preadv`` calls.
+    Values that could not be read are returned as ``None``.
+    """
+    data_types = [data_type.lower() for data_type in data_types]
+    addresses = np.asarray(addresses, dtype=np.uint64)
+    byte_sizes = np.array([entry_size(t, s) for t, s in zip(data_types, sizes)], dtype=np.uint64)
+    order = np.argsort(addresses, kind="stable")
+
+    buffer, sorted_offsets, sorted_valid = read_scattered(memory, addresses[order], byte_sizes[order], max_gap)
+    offsets = np.empty_like(sorted_offsets)
+    offsets[order] = sorted_offsets
+    valid = np.empty_like(sorted_valid)
+    valid[order] = sorted_valid
+
+    values: List[Any] = [None] * addresses.size
+    types = np.array(data_types)
+    for data_type in set(data_types):
+        index = np.flatnonzero(types == data_type)
+        if data_type in NUMERIC_TYPES:
+            decoded = gather(buffer, offsets[index], NUMERIC_TYPES[data_type]).tolist()
+        else:
+            decoded = [
+                decode_value(buffer[offsets[i]:offsets[i] + int(byte_sizes[i])].tobytes(), data_type)
+                for i in index.tolist()
+            ]
+        for i, value in zip(index.tolist(), decoded):
+            if valid[i]:
+                values[i] = value
+    return values, valid.tolist()
+
+
+def plan_writes(addresses: np.ndarray, lengths: np.ndarray) -> List[List[int]]:
+    """Group write entries into runs that one ``pwritev`` call each can cover
+
+    Returns lists of entry indices in address order. Only entries that touch
+    end to end share a run: filling a gap would need a read-modify-write
+    that races with the target's own writes. Overlapping entries are
+    rejected.
+    """
+    addresses = np.asarray(addresses, dtype=np.uint64)
+    lengths = np.asarray(lengths, dtype=np.uint64)
+    if not addresses.size:
+        return []
+    order = np.argsort(addresses, kind="stable")
+    starts, ends = addresses[order], addresses[order] + lengths[order]
+    if np.any(starts[1:] < ends[:-1]):
+        raise ValueError("Write entries overlap")
+
+    runs = []
+    breaks = np.flatnonzero(starts[1:] != ends[:-1]) + 1
+    for run in np.split(order, breaks):
+        for first in range(0, run.size, IOV_MAX):
+            runs.append(run[first:first + IOV_MAX].tolist())
+    return runs
+
+
+def write_run(memory: ProcessMemory, address: int, payloads: Sequence[bytes]) -> List[bool]:
+    """Write adjacent payloads starting at ``address`` with one ``pwritev``"""
+    try:
+        written = memory.writev(payloads, address)
+    except OSError:
+        written = 0
+    # Entries fully covered by a short write still count as written
+    ok = [False] * len(payloads)
+    for i, payload in enumerate(payloads):
+        if written < len(payload):
+            break
+        ok[i] = True
+        written -= len(payload)
+    return ok
+
+
+def write_batch(memory: ProcessMemory, addresses: Sequence[int], payloads: Sequence[bytes]) -> Tuple[List[bool], int]:
+    """Write many payloads; returns ``(ok, syscalls)`` with ``ok`` in request order
+
+    Payloads that touch end to end are written with one vectored
+    ``pwritev`` call (see ``plan_writes``).
+    """
+    runs = plan_writes(np.asarray(addresses, dtype=np.uint64), [len(payload) for payload in payloads])
+    ok = [False] * len(payloads)
+    for run in runs:
+        for i, written in zip(run, write_run(memory, int(addresses[run[0]]), [payloads[i] for i in run])):
+            ok[i] = written
+    return ok, len(runs)
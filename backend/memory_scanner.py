@@ -0,0 +1,549 @@
+"""Process memory scanning over /proc/<pid>/maps and /proc/<pid>/mem"""
+import asyncio
+import contextlib
+import ctypes
+import functools
+import logging
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+# Amount of memory handed to one process-pool task
+DEFAULT_TASK_SIZE = 64 * 1024 * 1024
+
+# /proc/<pid>/pagemap holds one little-endian uint64 per virtual page
+PAGEMAP_PRESENT = np.uint64(1 << 63)
+PAGEMAP_FRAME_MASK = np.uint64((1 << 55) - 1)
+PAGEMAP_BATCH = 64 * 1024  # entries per pagemap read
+
+# Little-endian dtypes for every numeric type the scanner understands.
+# "int", "float" and "double" are the names used by the MemoryEditor UI.
+NUMERIC_TYPES = {
+    "int8": np.dtype("<i1"),
+    "int16": np.dtype("<i2"),
+    "int32": np.dtype("<i4"),
+    "int64": np.dtype("<i8"),
+    "uint8": np.dtype("<u1"),
+    "uint16": np.dtype("<u2"),
+    "uint32": np.dtype("<u4"),
+    "uint64": np.dtype("<u8"),
+    "float32": np.dtype("<f4"),
+    "float64": np.dtype("<f8"),
+    "int": np.dtype("<i4"),
+    "float": np.dtype("<f4"),
+    "double": np.dtype("<f8"),
+}
+BYTE_TYPES = ("bytes", "string")
+
+# Mappings that are listed as readable but always fail through /proc/<pid>/mem
+UNSCANNABLE_PATHS = ("[vvar]", "[vvar_vclock]", "[vsyscall]")
+
+EMPTY_ADDRESSES = np.empty(0, dtype=np.uint64)
+
+
+@dataclass(frozen=True)
+class MemoryRegion:
+    start: int
+    end: int
+    perms: str
+    offset: int
+    path: str
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+    @property
+    def readable(self) -> bool:
+        return self.perms[0] == "r"
+
+    @property
+    def writable(self) -> bool:
+        return self.perms[1] == "w"
+
+    @property
+    def executable(self) -> bool:
+        return self.perms[2] == "x"
+
+    @property
+    def anonymous(self) -> bool:
+        """Not backed by a file, so untouched pages read as zeros"""
+        return not self.path.startswith("/")
+
+
+def parse_map_line(line: str) -> MemoryRegion:
+    parts = line.split(None, 5)
+    start, end = parts[0].split("-")
+    return MemoryRegion(
+        start=int(start, 16),
+        end=int(end, 16),
+        perms=parts[1],
+        offset=int(parts[2], 16),
+        path=parts[5].strip() if len(parts) > 5 else "",
+    )
+
+
+def parse_maps(pid: int) -> List[MemoryRegion]:
+    """Parse /proc/<pid>/maps into a list of regions sorted by start address"""
+    with open(f"/proc/{pid}/maps", "r") as maps:
+        return [parse_map_line(line) for line in maps]
+
+
+def scannable_regions(regions: List[MemoryRegion], writable_only: bool = False) -> List[MemoryRegion]:
+    """Keep the regions that can actually be read through /proc/<pid>/mem"""
+    return [
+        region for region in regions
+        if region.readable
+        and region.path not in UNSCANNABLE_PATHS
+        and (region.writable or not writable_only)
+    ]
+
+
+@dataclass(frozen=True)
+class ScanPattern:
+    """A compiled search value: a NumPy scalar for numeric types, raw bytes otherwise"""
+    data_type: str
+    dtype: Optional[np.dtype]
+    value: Union[np.generic, bytes]
+    tolerance: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return self.dtype.itemsize if self.dtype is not None else len(self.value)
+
+
+def resolve_dtype(data_type: str) -> np.dtype:
+    """Return the NumPy dtype for a numeric data type name"""
+    try:
+        return NUMERIC_TYPES[data_type.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported numeric data type: {data_type}")
+
+
+def to_scalar(value: Any, dtype: np.dtype) -> np.generic:
+    """Convert a JSON value to a scalar of ``dtype``, rejecting out-of-range integers"""
+    if dtype.kind == "f":
+        return dtype.type(float(value))
+    number = int(value)
+    info = np.iinfo(dtype)
+    if not info.min <= number <= info.max:
+        raise ValueError(f"Value {number} does not fit in {dtype.name}")
+    return dtype.type(number)
+
+
+def compile_pattern(value: Any, data_type: str = "int", tolerance: float = 0.0) -> ScanPattern:
+    """Validate a search value and convert it to the scanner's representation"""
+    data_type = data_type.lower()
+    if data_type in NUMERIC_TYPES:
+        dtype = NUMERIC_TYPES[data_type]
+        return ScanPattern(data_type, dtype, to_scalar(value, dtype), tolerance if dtype.kind == "f" else 0.0)
+
+    if data_type == "string":
+        raw = str(value).encode("utf-8")
+    elif data_type == "bytes":
+        raw = bytes(value) if isinstance(value, (bytes, bytearray)) else bytes.fromhex(str(value))
+    else:
+        raise ValueError(f"Unsupported data type: {data_type}")
+    if not raw:
+        raise ValueError("Search value must not be empty")
+    return ScanPattern(data_type, None, raw)
+
+
+def search_chunk(buf: bytearray, length: int, base: int, pattern: ScanPattern, aligned: bool = True) -> np.ndarray:
+    """Return the addresses of every match of ``pattern`` in ``buf[:length]``
+
+    ``base`` is the address of ``buf[0]`` in the target process. Numeric
+    patterns are compared with one vectorized NumPy pass per byte shift
+    (a single pass when ``aligned``), byte patterns use ``bytearray.find``.
+    """
+    if pattern.dtype is None:
+        return _find_bytes(buf, length, base, pattern.value)
+
+    itemsize = pattern.dtype.itemsize
+    hits = []
+    for shift in (0,) if aligned else range(itemsize):
+        count = (length - shift) // itemsize
+        if count <= 0:
+            continue
+        values = np.frombuffer(buf, dtype=pattern.dtype, count=count, offset=shift)
+        if pattern.tolerance:
+            with np.errstate(invalid="ignore", over="ignore"):
+                mask = np.abs(values - pattern.value) <= pattern.tolerance
+        else:
+            mask = values == pattern.value
+        index = np.flatnonzero(mask)
+        if index.size:
+            hits.append(index.astype(np.uint64) * np.uint64(itemsize) + np.uint64(base + shift))
+
+    if not hits:
+        return EMPTY_ADDRESSES
+    if len(hits) == 1:
+        return hits[0]
+    return np.sort(np.concatenate(hits))
+
+
+def _find_bytes(buf: bytearray, length: int, base: int, needle: bytes) -> np.ndarray:
+    hits = []
+    position = buf.find(needle, 0, length)
+    while position != -1:
+        hits.append(base + position)
+        position = buf.find(needle, position + 1, length)
+    return np.array(hits, dtype=np.uint64) if hits else EMPTY_ADDRESSES
+
+
+class ProcessMemory:
+    """File descriptor on /proc/<pid>/mem used for positional reads and writes"""
+
+    def __init__(self, pid: int, writable: bool = False):
+        self.pid = pid
+        self.fd = os.open(f"/proc/{pid}/mem", os.O_RDWR if writable else os.O_RDONLY)
+
+    def readinto(self, buf: memoryview, address: int) -> int:
+        return os.preadv(self.fd, [buf], address)
+
+    def read(self, address: int, size: int) -> bytes:
+        return os.pread(self.fd, size, address)
+
+    def writev(self, buffers: List[bytes], address: int) -> int:
+        return os.pwritev(self.fd, buffers, address)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@functools.lru_cache(maxsize=None)
+def zero_page_frame() -> Optional[int]:
+    """Page frame of the kernel's shared zero page
+
+    Found by read-faulting a fresh private page of this process, which maps
+    the zero page, and looking it up in our own pagemap. None when frame
+    numbers are hidden, which they are without CAP_SYS_ADMIN.
+    """
+    page = mmap.mmap(-1, PAGE_SIZE, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+    try:
+        cell = ctypes.c_char.from_buffer(page)
+        address = ctypes.addressof(cell)
+        del cell
+        page[0]  # read fault only
+        with open("/proc/self/pagemap", "rb") as pagemap:
+            pagemap.seek(address // PAGE_SIZE * 8)
+            entry = np.frombuffer(pagemap.read(8), dtype="<u8")[0]
+    except OSError:
+        return None
+    finally:
+        page.close()
+    frame = int(entry & PAGEMAP_FRAME_MASK)
+    return frame if entry & PAGEMAP_PRESENT and frame else None
+
+
+class Pagemap:
+    """Residency of the pages of a process from /proc/<pid>/pagemap
+
+    A page that is not present was either never touched or has been
+    swapped out; reading it through /proc/<pid>/mem would fault it in.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.fd = os.open(f"/proc/{pid}/pagemap", os.O_RDONLY)
+        self.zero_frame = zero_page_frame()
+
+    def resident(self, start: int, end: int) -> np.ndarray:
+        """Boolean per page of ``[start, end)``: present and not the shared zero page"""
+        first, pages = start // PAGE_SIZE, -(-end // PAGE_SIZE) - start // PAGE_SIZE
+        resident = np.zeros(pages, dtype=bool)
+        for offset in range(0, pages, PAGEMAP_BATCH):
+            count = min(PAGEMAP_BATCH, pages - offset)
+            raw = os.pread(self.fd, count * 8, (first + offset) * 8)
+            entries = np.frombuffer(raw, dtype="<u8")
+            present = (entries & PAGEMAP_PRESENT) != 0
+            if self.zero_frame is not None:
+                present &= (entries & PAGEMAP_FRAME_MASK) != self.zero_frame
+            resident[offset:offset + present.size] = present
+        return resident
+
+    def runs(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """``(start, end)`` of each run of adjacent resident pages, clamped to ``[start, end)``"""
+        resident = self.resident(start, end)
+        edges = np.flatnonzero(np.diff(resident.astype(np.int8), prepend=0, append=0))
+        base = start - start % PAGE_SIZE
+        return [
+            (max(base + first * PAGE_SIZE, start), min(base + last * PAGE_SIZE, end))
+            for first, last in zip(edges[::2].tolist(), edges[1::2].tolist())
+        ]
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass
+class ScanResult:
+    addresses: np.ndarray
+    bytes_scanned: int
+    regions_scanned: int
+    elapsed: float
+    workers: int = 1
+    tasks: int = 1
+    worker_time: float = 0.0  # summed scan time of all tasks
+    bytes_skipped: int = 0  # pages left out of a resident-only scan
+
+    @property
+    def count(self) -> int:
+        return int(self.addresses.size)
+
+    @property
+    def throughput(self) -> float:
+        """Scan throughput in GB/s"""
+        return self.bytes_scanned / self.elapsed / 1e9 if self.elapsed else 0.0
+
+
+def scan_regions(pid: int, regions: List[MemoryRegion], pattern: ScanPattern,
+                 aligned: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 resident_only: bool = False) -> ScanResult:
+    """Scan ``regions`` of ``pid`` chunk by chunk and return every matching address
+
+    Chunks are read into one reusable buffer. Unaligned and byte-pattern
+    scans overlap consecutive chunks by ``pattern.size - 1`` bytes so that
+    matches straddling a chunk boundary are not lost.
+
+    With ``resident_only`` the anonymous regions are only read where their
+    pages are present and not the shared zero page, one run of adjacent
+    pages at a time. Untouched pages hold zeros and swapped-out pages are
+    left alone instead of being faulted in, so an all-zero value is not
+    found there and neither is anything that was swapped out. File-backed
+    regions are always read in full, as their untouched pages hold file data.
+    """
+    started = time.perf_counter()
+    overlap = 0 if aligned and pattern.dtype is not None else pattern.size - 1
+    chunk_size = max(chunk_size - chunk_size % PAGE_SIZE, PAGE_SIZE)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    found = []
+    bytes_scanned = 0
+    bytes_skipped = 0
+    regions_scanned = 0
+
+    with contextlib.ExitStack() as stack:
+        memory = stack.enter_context(ProcessMemory(pid))
+        pagemap = stack.enter_context(Pagemap(pid)) if resident_only else None
+        for region in regions:
+            spans = [(region.start, region.end)]
+            if pagemap is not None and region.anonymous:
+                spans = pagemap.runs(region.start, region.end)
+                bytes_skipped += region.size - sum(end - start for start, end in spans)
+            for start, end in spans:
+                address = start
+                while address < end:
+                    length = min(chunk_size, end - address)
+                    try:
+                        read = memory.readinto(view[:length], address)
+                    except OSError as e:
+                        logger.debug(f"Skipping unreadable chunk at 0x{address:X}: {e}")
+                        address += length
+                        continue
+                    if read <= 0:
+                        break
+
+                    hits = search_chunk(buf, read, address, pattern, aligned)
+                    if hits.size:
+                        found.append(hits)
+                    bytes_scanned += read
+                    if address + read >= end or read <= overlap:
+                        break
+                    address += read - overlap
+            regions_scanned += 1
+
+    addresses = np.concatenate(found) if found else EMPTY_ADDRESSES
+    return ScanResult(addresses, bytes_scanned, regions_scanned, time.perf_counter() - started,
+                      bytes_skipped=bytes_skipped)
+
+
+def scan_process(pid: int, value: Any, data_type: str = "int", aligned: bool = True,
+                 tolerance: float = 0.0, writable_only: bool = False,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, resident_only: bool = False) -> ScanResult:
+    """Scan every readable region of ``pid`` for ``value``"""
+    pattern = compile_pattern(value, data_type, tolerance)
+    regions = scannable_regions(parse_maps(pid), writable_only=writable_only)
+    return scan_regions(pid, regions, pattern, aligned=aligned, chunk_size=chunk_size,
+                        resident_only=resident_only)
+
+
+def split_regions(regions: List[MemoryRegion], task_size: int = DEFAULT_TASK_SIZE,
+                  overlap: int = 0) -> List[List[MemoryRegion]]:
+    """Cut ``regions`` into tasks of roughly ``task_size`` bytes each
+
+    Large regions are split into pieces that extend ``overlap`` bytes into
+    the next piece (clamped to the region end) so boundary matches survive;
+    small regions are batched together until a task is full.
+    """
+    task_size = max(task_size - task_size % PAGE_SIZE, PAGE_SIZE)
+    tasks, current, current_size = [], [], 0
+    for region in regions:
+        for start in range(region.start, region.end, task_size):
+            end = min(start + task_size, region.end)
+            piece = region if start == region.start and end == region.end else MemoryRegion(
+                start=start,
+                end=min(end + overlap, region.end),
+                perms=region.perms,
+                offset=region.offset + (start - region.start),
+                path=region.path,
+            )
+            current.append(piece)
+            current_size += end - start
+            if current_size >= task_size:
+                tasks.append(current)
+                current, current_size = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def _scan_task(pid: int, regions: List[MemoryRegion], pattern: ScanPattern,
+               aligned: bool, chunk_size: int, resident_only: bool) -> Tuple[np.ndarray, int, float, int]:
+    # Runs in a pool worker, which opens /proc/<pid>/mem itself so only the
+    # region list goes in and only the hit addresses come back.
+    result = scan_regions(pid, regions, pattern, aligned=aligned, chunk_size=chunk_size,
+                          resident_only=resident_only)
+    return result.addresses, result.bytes_scanned, result.elapsed, result.bytes_skipped
+
+
+class ParallelScanner:
+    """Spreads region scans over a ``ProcessPoolExecutor``
+
+    Workers are started from a forkserver so they never inherit the event
+    loop or the threads of the API process. A worker that dies breaks the
+    whole pool; the broken pool is then replaced, so only the scan that
+    was running fails (after one retry on the fresh pool).
+    """
+
+    def __init__(self, workers: Optional[int] = None, task_size: int = DEFAULT_TASK_SIZE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.task_size = task_size
+        self.chunk_size = chunk_size
+        self.resets = 0  # broken pools replaced so far
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    def configure(self, workers: Optional[int] = None, task_size: Optional[int] = None):
+        """Change the pool size or task size; the pool restarts on the next scan"""
+        if workers is not None and workers != self.workers:
+            if workers < 1:
+                raise ValueError("workers must be at least 1")
+            self.workers = workers
+            self.shutdown()
+        if task_size is not None:
+            if task_size < PAGE_SIZE:
+                raise ValueError(f"task_size must be at least {PAGE_SIZE} bytes")
+            self.task_size = task_size
+
+    def start(self):
+        """Spin up the worker processes ahead of the first scan"""
+        for _ in range(self.workers):
+            self.executor.submit(os.getpid)
+
+    def submit(self, pid: int, regions: List[MemoryRegion], pattern: ScanPattern, aligned: bool = True,
+               resident_only: bool = False) -> Tuple[List[List[MemoryRegion]], List[Future]]:
+        """Queue one pool task per piece of ``regions``; returns the tasks and their futures
+
+        Each future resolves to ``(addresses, bytes_scanned, elapsed, bytes_skipped)``.
+        """
+        overlap = 0 if aligned and pattern.dtype is not None else pattern.size - 1
+        tasks = split_regions(regions, self.task_size, overlap)
+        try:
+            futures = self._submit_tasks(pid, tasks, pattern, aligned, resident_only)
+        except BrokenProcessPool:
+            # A worker died during an earlier scan; start over on a fresh pool
+            self.reset()
+            futures = self._submit_tasks(pid, tasks, pattern, aligned, resident_only)
+        return tasks, futures
+
+    def _submit_tasks(self, pid: int, tasks: List[List[MemoryRegion]], pattern: ScanPattern,
+                      aligned: bool, resident_only: bool) -> List[Future]:
+        executor = self.executor
+        return [
+            executor.submit(_scan_task, pid, task, pattern, aligned, self.chunk_size, resident_only)
+            for task in tasks
+        ]
+
+    async def scan(self, pid: int, regions: List[MemoryRegion], pattern: ScanPattern,
+                   aligned: bool = True, resident_only: bool = False) -> ScanResult:
+        """Scan ``regions`` across the pool and merge the hits in address order"""
+        started = time.perf_counter()
+        for attempt in range(2):
+            tasks, futures = self.submit(pid, regions, pattern, aligned, resident_only)
+            executor = self._executor
+            try:
+                parts = await asyncio.gather(*[asyncio.wrap_future(future) for future in futures])
+                break
+            except BrokenProcessPool:
+                self.reset(executor)
+                if attempt:
+                    raise
+                logger.warning(f"Scan worker died while scanning pid {pid}; retrying on a fresh pool")
+
+        # Tasks cover ascending, disjoint address ranges, so concatenating
+        # them in submission order keeps the hits sorted.
+        found = [addresses for addresses, _, _, _ in parts if addresses.size]
+        return ScanResult(
+            addresses=np.concatenate(found) if found else EMPTY_ADDRESSES,
+            bytes_scanned=sum(scanned for _, scanned, _, _ in parts),
+            regions_scanned=len(regions),
+            elapsed=time.perf_counter() - started,
+            workers=self.workers,
+            tasks=len(tasks),
+            worker_time=sum(elapsed for _, _, elapsed, _ in parts),
+            bytes_skipped=sum(skipped for _, _, _, skipped in parts),
+        )
+
+    def reset(self, executor: Optional[ProcessPoolExecutor] = None):
+        """Drop a broken pool; the next scan starts a new one
+
+        With ``executor`` given, the pool is only dropped if it is still the
+        current one, so concurrent scans that saw the same pool break do not
+        tear down the replacement.
+        """
+        if executor is not None and executor is not self._executor:
+            return
+        self.resets += 1
+        self.shutdown()
+
+    def shutdown(self, wait: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
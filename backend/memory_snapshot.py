@@ -0,0 +1,274 @@
+"""Unknown-initial-value scans backed by on-disk memory snapshots"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from memory_scanner import (
+    DEFAULT_CHUNK_SIZE, EMPTY_ADDRESSES, PAGE_SIZE, MemoryRegion, ProcessMemory, resolve_dtype,
+)
+from scan_sessions import NarrowResult, ScanSession, compare_values
+
+logger = logging.getLogger(__name__)
+
+# Snapshot sessions switch to an in-memory candidate list below this size
+MATERIALIZE_LIMIT = 4_000_000
+
+
+@dataclass(frozen=True)
+class SnapshotRegion:
+    start: int  # address in the target process
+    size: int
+    offset: int  # byte offset in the data file
+    mask_offset: int  # byte offset in the packed candidate mask
+
+
+class MemorySnapshot:
+    """Copy of a set of regions kept in a temporary directory
+
+    Region contents live in ``data.bin`` and candidate slots (one per
+    aligned ``dtype`` value) in the packed bitmask ``mask.bin``. The data
+    file is mapped one chunk at a time with ``np.memmap``, so RAM use stays
+    at a couple of chunk buffers no matter how large the target is.
+    """
+
+    def __init__(self, pid: int, dtype: np.dtype, directory: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.pid = pid
+        self.dtype = dtype
+        self.directory = directory
+        self.chunk_size = max(chunk_size - chunk_size % PAGE_SIZE, PAGE_SIZE)
+        self.regions: List[SnapshotRegion] = []
+        self.count = 0
+        self._mask_size = 0
+        self._mask: Optional[np.memmap] = None  # None until the first comparison: every slot is a candidate
+
+    @property
+    def data_path(self) -> str:
+        return os.path.join(self.directory, "data.bin")
+
+    @property
+    def mask_path(self) -> str:
+        return os.path.join(self.directory, "mask.bin")
+
+    @property
+    def size(self) -> int:
+        return sum(region.size for region in self.regions)
+
+    @classmethod
+    def capture(cls, memory: ProcessMemory, dtype: np.dtype, regions: List[MemoryRegion],
+                directory: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "MemorySnapshot":
+        """Copy ``regions`` of the process behind ``memory`` into a new snapshot directory
+
+        ``directory`` defaults to ``$SNAPSHOT_DIR`` or the system temp dir.
+        """
+        path = tempfile.mkdtemp(prefix="scan-snapshot-", dir=directory or os.environ.get("SNAPSHOT_DIR"))
+        snapshot = cls(memory.pid, dtype, path, chunk_size)
+        try:
+            snapshot._write(memory, regions)
+        except BaseException:
+            snapshot.close()
+            raise
+        return snapshot
+
+    def _write(self, memory: ProcessMemory, regions: List[MemoryRegion]):
+        itemsize = self.dtype.itemsize
+        buf = bytearray(self.chunk_size)
+        view = memoryview(buf)
+        offset = mask_offset = 0
+
+        with open(self.data_path, "wb") as out:
+            for region in regions:
+                size = 0
+                while size < region.size:
+                    length = min(self.chunk_size, region.size - size)
+                    try:
+                        read = memory.readinto(view[:length], region.start + size)
+                    except OSError:
+                        read = 0
+                    read -= read % itemsize
+                    if read <= 0:
+                        break
+                    out.write(view[:read])
+                    size += read
+                    if read < length:
+                        break
+                if size:
+                    self.regions.append(SnapshotRegion(region.start, size, offset, mask_offset))
+                    offset += size
+                    mask_offset += -(-size // itemsize // 8)
+
+        self.count = offset // itemsize
+        self._mask_size = mask_offset
+
+    def _data_chunk(self, offset: int, length: int) -> np.memmap:
+        return np.memmap(self.data_path, dtype=self.dtype, mode="r+", offset=offset,
+                         shape=(length // self.dtype.itemsize,))
+
+    def _chunks(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        """Yield ``(address, data_offset, length, mask_offset, slots)`` per chunk"""
+        itemsize = self.dtype.itemsize
+        for region in self.regions:
+            for position in range(0, region.size, self.chunk_size):
+                length = min(self.chunk_size, region.size - position)
+                # chunk_size is a multiple of the page size, so each chunk's
+                # slots start on a byte boundary of the mask
+                yield (
+                    region.start + position,
+                    region.offset + position,
+                    length,
+                    region.mask_offset + position // itemsize // 8,
+                    length // itemsize,
+                )
+
+    def _candidate_bits(self, mask_offset: int, slots: int) -> np.ndarray:
+        packed = self._mask[mask_offset:mask_offset + -(-slots // 8)]
+        return np.unpackbits(packed, count=slots, bitorder="little").view(bool)
+
+    def compare(self, memory: ProcessMemory, comparison: str, low: Any = None, high: Any = None) -> int:
+        """Keep the candidates whose current value satisfies ``comparison``
+
+        Current values are read chunk by chunk, compared against the memmap
+        snapshot and written back into it. Chunks without a surviving
+        candidate are not read at all. Returns the number of unreadable slots.
+        """
+        if not self.regions:
+            return 0
+        if self._mask is None:
+            self._mask = np.memmap(self.mask_path, dtype=np.uint8, mode="w+", shape=(self._mask_size,))
+            first = True
+        else:
+            first = False
+
+        itemsize = self.dtype.itemsize
+        buf = bytearray(self.chunk_size)
+        view = memoryview(buf)
+        survivors = unreadable = 0
+
+        for address, offset, length, mask_offset, slots in self._chunks():
+            candidates = None
+            if not first:
+                candidates = self._candidate_bits(mask_offset, slots)
+                if not candidates.any():
+                    continue
+            try:
+                read = memory.readinto(view[:length], address)
+            except OSError:
+                read = 0
+            readable = read // itemsize
+
+            current = np.frombuffer(buf, dtype=self.dtype, count=slots)
+            previous = self._data_chunk(offset, length)
+            keep = compare_values(comparison, current, previous, low, high)
+            if readable < slots:
+                keep[readable:] = False
+                unreadable += slots - readable
+            if candidates is not None:
+                keep &= candidates
+
+            packed = np.packbits(keep, bitorder="little")
+            self._mask[mask_offset:mask_offset + packed.size] = packed
+            previous[:readable] = current[:readable]
+            del previous
+            survivors += int(np.count_nonzero(keep))
+
+        self.count = survivors
+        return unreadable
+
+    def candidates(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(addresses, values)`` of the candidates, in address order"""
+        itemsize = self.dtype.itemsize
+        addresses, values = [], []
+        skip, remaining = offset, limit
+        for address, data_offset, length, mask_offset, slots in self._chunks():
+            if remaining is not None and remaining <= 0:
+                break
+            if self._mask is None:
+                index = np.arange(slots)
+            else:
+                index = np.flatnonzero(self._candidate_bits(mask_offset, slots))
+            if skip:
+                if index.size <= skip:
+                    skip -= index.size
+                    continue
+                index, skip = index[skip:], 0
+            if remaining is not None:
+                index = index[:remaining]
+                remaining -= index.size
+            if index.size:
+                addresses.append(index.astype(np.uint64) * np.uint64(itemsize) + np.uint64(address))
+                values.append(self._data_chunk(data_offset, length)[index])
+
+        if not addresses:
+            return EMPTY_ADDRESSES, np.empty(0, dtype=self.dtype)
+        return np.concatenate(addresses), np.concatenate(values)
+
+    def close(self):
+        """Drop the memory maps and delete the snapshot directory"""
+        self._mask = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+@dataclass
+class SnapshotSession(ScanSession):
+    """Scan session that starts from a snapshot instead of a search value
+
+    While more than ``MATERIALIZE_LIMIT`` candidates survive, they are kept
+    as the snapshot's on-disk bitmask; below that the session turns into a
+    regular candidate list and the snapshot is deleted.
+    """
+    snapshot: Optional[MemorySnapshot] = None
+
+    @classmethod
+    def capture(cls, memory: ProcessMemory, data_type: str, regions: List[MemoryRegion],
+                directory: Optional[str] = None) -> "SnapshotSession":
+        dtype = resolve_dtype(data_type)
+        snapshot = MemorySnapshot.capture(memory, dtype, regions, directory)
+        return cls(pid=memory.pid, data_type=data_type, dtype=dtype, addresses=EMPTY_ADDRESSES,
+                   values=np.empty(0, dtype=dtype), snapshot=snapshot)
+
+    @property
+    def count(self) -> int:
+        return self.snapshot.count if self.snapshot is not None else super().count
+
+    @property
+    def mode(self) -> str:
+        return "snapshot" if self.snapshot is not None else super().mode
+
+    def _narrow(self, memory: ProcessMemory, comparison: str, value: Any, value_max: Any) -> NarrowResult:
+        if self.snapshot is None:
+            return super()._narrow(memory, comparison, value, value_max)
+
+        started = time.perf_counter()
+        low, high = self._operands(comparison, value, value_max)
+        previous_count = self.count
+        unreadable = self.snapshot.compare(memory, comparison, low, high)
+        if self.snapshot.count <= MATERIALIZE_LIMIT:
+            self.addresses, self.values = self.snapshot.candidates()
+            self.snapshot.close()
+            self.snapshot = None
+
+        self.scans += 1
+        self.updated_at = datetime.utcnow()
+        return NarrowResult(
+            comparison=comparison,
+            previous_count=previous_count,
+            count=self.count,
+            unreadable=unreadable,
+            elapsed=time.perf_counter() - started,
+        )
+
+    def page(self, offset: int = 0, limit: int = 1000):
+        if self.snapshot is not None:
+            return self.snapshot.candidates(offset, limit)
+        return super().page(offset, limit)
+
+    def close(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
@@ -0,0 +1,146 @@
+"""Watch lists: poll many addresses at a fixed rate and report only changes"""
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from memory_io import decode_value, entry_size, gather, parse_address, read_scattered
+from memory_scanner import NUMERIC_TYPES, ProcessMemory
+
+DEFAULT_WATCH_RATE = 20.0
+MAX_WATCH_RATE = 120.0
+MAX_WATCH_ENTRIES = 4096
+
+# Binary frame header: frame kind, timestamp, number of changed entries
+BINARY_HEADER = struct.Struct("<Bdi")
+BINARY_VALUES = 1
+
+
+@dataclass(frozen=True)
+class WatchEntry:
+    address: int
+    data_type: str
+    size: int
+
+
+class WatchList:
+    """A compiled set of watched addresses with change suppression
+
+    The addresses are sorted once when the list is built; every poll reads
+    them with coalesced page-span reads, decodes each numeric type with one
+    vectorized gather and compares the result against the previous poll.
+    """
+
+    def __init__(self, entries: List[WatchEntry]):
+        if len(entries) > MAX_WATCH_ENTRIES:
+            raise ValueError(f"At most {MAX_WATCH_ENTRIES} addresses can be watched")
+        self.entries = entries
+        addresses = np.array([entry.address for entry in entries], dtype=np.uint64)
+        self._order = np.argsort(addresses, kind="stable")
+        self._addresses = addresses[self._order]
+        self._sizes = np.array([entry.size for entry in entries], dtype=np.uint64)[self._order]
+
+        types = np.array([entry.data_type for entry in entries])
+        self._numeric = [
+            (np.flatnonzero(types == data_type), NUMERIC_TYPES[data_type])
+            for data_type in sorted(set(types.tolist()) & NUMERIC_TYPES.keys())
+        ]
+        self._raw = [index for index, entry in enumerate(entries) if entry.data_type not in NUMERIC_TYPES]
+        self._previous: Optional[List[Any]] = None
+        # ``numeric_entries``: indices into ``entries`` of the numeric entries,
+        # grouped by data type. ``numeric``: after each poll, the positions in
+        # ``numeric_entries`` of the entries that were readable, and their
+        # values as float64.
+        self.numeric_entries = np.concatenate([index for index, _ in self._numeric]) if self._numeric \
+            else np.empty(0, dtype=np.intp)
+        self.numeric: Tuple[np.ndarray, np.ndarray] = (np.empty(0, dtype=np.intp), np.empty(0))
+
+    @classmethod
+    def from_request(cls, entries: List[dict]) -> "WatchList":
+        """Build a watch list from ``{"address", "data_type", "size"}`` dicts"""
+        return cls([
+            WatchEntry(
+                address=parse_address(entry["address"]),
+                data_type=entry.get("data_type", "int").lower(),
+                size=entry_size(entry.get("data_type", "int"), entry.get("size")),
+            )
+            for entry in entries
+        ])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def poll(self, memory: ProcessMemory) -> Tuple[np.ndarray, List[Any], List[bytes]]:
+        """Read every entry and return ``(changed_indices, values, raw_bytes)``
+
+        ``values`` are the decoded new values of the changed entries (``None``
+        when unreadable) and ``raw_bytes`` their bytes, for binary frames.
+        The first poll reports every entry.
+        """
+        buffer, sorted_offsets, sorted_valid = read_scattered(memory, self._addresses, self._sizes)
+        offsets = np.empty_like(sorted_offsets)
+        offsets[self._order] = sorted_offsets
+        valid = np.empty_like(sorted_valid)
+        valid[self._order] = sorted_valid
+
+        current: List[Any] = [None] * len(self.entries)
+        readable = valid[self.numeric_entries]
+        numeric_values = []
+        for index, dtype in self._numeric:
+            gathered = gather(buffer, offsets[index], dtype)
+            for i, value in zip(index.tolist(), gathered.tolist()):
+                current[i] = value if valid[i] else None
+            numeric_values.append(gathered.astype(np.float64))
+        if numeric_values:
+            self.numeric = (np.flatnonzero(readable), np.concatenate(numeric_values)[readable])
+        for i in self._raw:
+            entry = self.entries[i]
+            raw = buffer[offsets[i]:offsets[i] + entry.size].tobytes()
+            current[i] = decode_value(raw, entry.data_type) if valid[i] else None
+
+        if self._previous is None:
+            changed = np.arange(len(self.entries))
+        else:
+            changed = np.array(
+                [i for i, value in enumerate(current) if _differs(value, self._previous[i])], dtype=np.intp
+            )
+        self._previous = current
+
+        raw_bytes = [
+            buffer[offsets[i]:offsets[i] + self.entries[i].size].tobytes() if valid[i] else b""
+            for i in changed.tolist()
+        ]
+        return changed, [current[i] for i in changed.tolist()], raw_bytes
+
+
+def _differs(value: Any, previous: Any) -> bool:
+    # NaN never equals itself; a NaN that stays NaN is not a change
+    return value != previous and not (value != value and previous != previous)
+
+
+def json_frame(changed: np.ndarray, values: List[Any]) -> dict:
+    """Delta-JSON frame: ``[[index, value], ...]`` for changed entries only"""
+    return {
+        "type": "values",
+        "timestamp": time.time(),
+        "changes": [[index, value] for index, value in zip(changed.tolist(), values)],
+    }
+
+
+def binary_frame(changed: np.ndarray, raw_bytes: List[bytes]) -> bytes:
+    """Compact binary frame
+
+    Layout (little endian): ``uint8`` kind (1), ``float64`` timestamp,
+    ``int32`` count, ``count`` x ``uint32`` entry indices, ``count`` x
+    ``uint32`` value lengths (0 for unreadable entries), then the raw bytes
+    of each changed entry in the same order.
+    """
+    sizes = np.array([len(raw) for raw in raw_bytes], dtype="<u4")
+    return b"".join([
+        BINARY_HEADER.pack(BINARY_VALUES, time.time(), changed.size),
+        changed.astype("<u4").tobytes(),
+        sizes.tobytes(),
+        *raw_bytes,
+    ])
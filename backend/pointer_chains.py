@@ -0,0 +1,133 @@
+"""Pointer chains (module+offset -> deref -> +offset ...) and their batched resolution"""
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from memory_io import parse_address, parse_offset, read_values
+from memory_scanner import MemoryRegion, ProcessMemory, parse_maps
+from process_discovery import read_start_time
+
+POINTER_TYPES = {8: np.dtype("<u8"), 4: np.dtype("<u4")}
+
+
+@dataclass(frozen=True)
+class PointerChain:
+    """``[[module + base_offset] + offsets[0]] + offsets[1] ...``
+
+    Each offset is added to the pointer read at the previous address; the
+    last sum is the address of the value itself. ``module`` is matched
+    against the full path or the file name of a mapping; ``None`` makes
+    ``base_offset`` absolute.
+    """
+    module: Optional[str]
+    base_offset: int
+    offsets: Tuple[int, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PointerChain":
+        return cls(
+            module=data.get("module") or None,
+            base_offset=parse_address(data.get("base_offset", 0)),
+            offsets=tuple(parse_offset(offset) for offset in data.get("offsets", ())),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "module": self.module,
+            "base_offset": hex(self.base_offset),
+            "offsets": [hex(offset) for offset in self.offsets],
+        }
+
+    def __str__(self) -> str:
+        text = f"{self.module}+{self.base_offset:#x}" if self.module else f"{self.base_offset:#x}"
+        for offset in self.offsets:
+            text = f"[{text}]+{offset:#x}"
+        return text
+
+
+def module_bases(regions: List[MemoryRegion]) -> Dict[str, int]:
+    """Lowest mapped address of every file-backed or named mapping
+
+    Each module is listed under its full path and under its file name.
+    """
+    bases: Dict[str, int] = {}
+    for region in regions:
+        if not region.path:
+            continue
+        for name in {region.path, os.path.basename(region.path)}:
+            if name not in bases or region.start < bases[name]:
+                bases[name] = region.start
+    return bases
+
+
+class ModuleCache:
+    """Module base addresses per pid, kept until the pid's start time changes
+
+    A lookup that misses re-reads the maps once, since libraries can be
+    loaded after the first parse. ``maps`` returns the regions of a pid.
+    """
+
+    def __init__(self, maps: Callable[[int], List[MemoryRegion]] = parse_maps):
+        self.maps = maps
+        self._modules: Dict[int, Tuple[int, Dict[str, int]]] = {}
+
+    def bases(self, pid: int, refresh: bool = False) -> Dict[str, int]:
+        start_time = read_start_time(pid)
+        if start_time is None:
+            self._modules.pop(pid, None)
+            raise ProcessLookupError(f"Process {pid} not found")
+        cached = self._modules.get(pid)
+        if cached is None or cached[0] != start_time or refresh:
+            cached = (start_time, module_bases(self.maps(pid)))
+            self._modules[pid] = cached
+        return cached[1]
+
+    def base(self, pid: int, module: str) -> Optional[int]:
+        bases = self.bases(pid)
+        if module not in bases:
+            bases = self.bases(pid, refresh=True)
+        return bases.get(module)
+
+    def forget(self, pid: int):
+        self._modules.pop(pid, None)
+
+
+def resolve_chains(memory: ProcessMemory, modules: ModuleCache, chains: Sequence[PointerChain],
+                   pointer_size: int = 8) -> List[Optional[int]]:
+    """Resolve many chains at once; unresolvable chains come back as ``None``
+
+    All chains advance one level per round, and the pointers read in a
+    round are fetched with one coalesced ``read_values`` call, so N chains
+    of depth D cost D read rounds rather than N x D syscalls. Chains hitting
+    an unreadable or null pointer stop there.
+    """
+    dtype = POINTER_TYPES[pointer_size]
+    count = len(chains)
+    addresses = np.zeros(count, dtype=np.uint64)
+    alive = np.ones(count, dtype=bool)
+    bases = {module: modules.base(memory.pid, module) for module in {chain.module for chain in chains if chain.module}}
+    for i, chain in enumerate(chains):
+        base = bases[chain.module] if chain.module else 0
+        if base is None:
+            alive[i] = False
+        else:
+            addresses[i] = base + chain.base_offset
+
+    depths = np.array([len(chain.offsets) for chain in chains], dtype=np.intp)
+    for level in range(int(depths.max()) if count else 0):
+        index = np.flatnonzero(alive & (depths > level))
+        if not index.size:
+            break
+        order = np.argsort(addresses[index], kind="stable")
+        sorted_index = index[order]
+        pointers, valid = read_values(memory, addresses[sorted_index], dtype)
+        valid &= pointers != 0
+        alive[sorted_index[~valid]] = False
+
+        offsets = np.array([chains[i].offsets[level] for i in sorted_index.tolist()], dtype=np.int64)
+        resolved = pointers.astype(np.uint64) + offsets.astype(np.uint64)  # wraps for negative offsets
+        addresses[sorted_index[valid]] = resolved[valid]
+
+    return [int(address) if ok else None for address, ok in zip(addresses.tolist(), alive.tolist())]
@@ -0,0 +1,257 @@
+"""Pointer maps of a process and backwards pointer scans over them"""
+import json
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from memory_scanner import DEFAULT_CHUNK_SIZE, MemoryRegion, ProcessMemory, parse_maps, scannable_regions
+from pointer_chains import POINTER_TYPES, PointerChain
+
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_MAX_OFFSET = 0x1000
+DEFAULT_MAX_NODES = 200_000  # pointer locations followed per level
+DEFAULT_MAX_RESULTS = 10_000
+
+
+def pointer_map_dir() -> str:
+    return os.environ.get("POINTER_MAP_DIR") or os.path.join(tempfile.gettempdir(), "pointer-maps")
+
+
+@dataclass(frozen=True)
+class StaticRange:
+    """Address range that survives restarts at a fixed offset from a module base"""
+    module: str
+    base: int
+    start: int
+    end: int
+
+
+def static_ranges(regions: List[MemoryRegion]) -> List[StaticRange]:
+    """Module images plus the anonymous .bss mappings that directly follow them"""
+    bases = {}
+    for region in regions:
+        if region.path.startswith("/"):
+            bases.setdefault(region.path, region.start)
+
+    ranges, previous = [], None
+    for region in regions:
+        if region.path.startswith("/"):
+            previous = StaticRange(os.path.basename(region.path), bases[region.path], region.start, region.end)
+            ranges.append(previous)
+        elif not region.path and previous is not None and region.start == previous.end and region.writable:
+            previous = StaticRange(previous.module, previous.base, region.start, region.end)
+            ranges.append(previous)
+        else:
+            previous = None
+    return ranges
+
+
+class PointerMap:
+    """Every aligned pointer-sized value that points into a mapped region
+
+    ``addresses`` (sorted) and ``values`` hold each pointer's location and
+    target; ``sorted_values`` and ``by_value`` index the same pointers by
+    target for the backwards scan. Maps are saved as ``.npy`` files and
+    loaded memory-mapped, so a map can be reused after the process restarts.
+    """
+
+    def __init__(self, addresses: np.ndarray, values: np.ndarray, statics: List[StaticRange],
+                 pointer_size: int = 8, meta: Optional[dict] = None,
+                 by_value: Optional[np.ndarray] = None, sorted_values: Optional[np.ndarray] = None):
+        self.addresses = addresses
+        self.values = values
+        self.statics = statics
+        self.pointer_size = pointer_size
+        self.meta = meta or {}
+        self.by_value = np.argsort(values, kind="stable") if by_value is None else by_value
+        self.sorted_values = values[self.by_value] if sorted_values is None else sorted_values
+        self._static_starts = np.array([static.start for static in statics], dtype=np.uint64)
+        self._static_ends = np.array([static.end for static in statics], dtype=np.uint64)
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.meta.get("id")
+
+    def __len__(self) -> int:
+        return int(self.addresses.size)
+
+    @classmethod
+    def build(cls, memory: ProcessMemory, pointer_size: int = 8, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              regions: Optional[List[MemoryRegion]] = None) -> "PointerMap":
+        """Read the writable and module-image regions behind ``memory`` and index their pointers
+
+        ``regions`` are the scannable regions of the process when already known.
+        """
+        started = time.perf_counter()
+        pid = memory.pid
+        dtype = POINTER_TYPES[pointer_size]
+        if regions is None:
+            regions = scannable_regions(parse_maps(pid))
+        targets = sorted(regions, key=lambda region: region.start)
+        target_starts = np.array([region.start for region in targets], dtype=np.uint64)
+        target_ends = np.array([region.end for region in targets], dtype=np.uint64)
+        sources = [
+            region for region in regions
+            if region.writable or (region.path.startswith("/") and not region.executable)
+        ]
+
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        addresses, values = [], []
+        scanned = 0
+        for region in sources:
+            for position in range(0, region.size, chunk_size):
+                length = min(chunk_size, region.size - position)
+                try:
+                    read = memory.readinto(view[:length], region.start + position)
+                except OSError:
+                    break
+                scanned += read
+                chunk = np.frombuffer(buf, dtype=dtype, count=read // pointer_size).astype(np.uint64)
+                slot = np.searchsorted(target_starts, chunk, side="right") - 1
+                hits = np.flatnonzero((slot >= 0) & (chunk < target_ends[np.maximum(slot, 0)]))
+                if hits.size:
+                    addresses.append(np.uint64(region.start + position) + hits.astype(np.uint64) * np.uint64(pointer_size))
+                    values.append(chunk[hits])
+                if read < length:
+                    break
+
+        empty = np.empty(0, dtype=np.uint64)
+        pointer_map = cls(
+            np.concatenate(addresses) if addresses else empty,
+            np.concatenate(values) if values else empty,
+            static_ranges(regions),
+            pointer_size,
+        )
+        pointer_map.meta = {
+            "id": str(uuid.uuid4()),
+            "pid": pid,
+            "pointer_size": pointer_size,
+            "pointers": len(pointer_map),
+            "bytes_scanned": scanned,
+            "elapsed": time.perf_counter() - started,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        return pointer_map
+
+    def save(self, directory: Optional[str] = None) -> str:
+        path = os.path.join(directory or pointer_map_dir(), self.id)
+        os.makedirs(path, exist_ok=True)
+        for name in ("addresses", "values", "by_value", "sorted_values"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as meta:
+            json.dump({**self.meta, "statics": [static.__dict__ for static in self.statics]}, meta)
+        return path
+
+    @classmethod
+    def load(cls, map_id: str, directory: Optional[str] = None) -> "PointerMap":
+        path = os.path.join(directory or pointer_map_dir(), os.path.basename(map_id))
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in ("addresses", "values", "by_value", "sorted_values")
+        }
+        statics = [StaticRange(**static) for static in meta.pop("statics")]
+        return cls(arrays["addresses"], arrays["values"], statics, meta["pointer_size"], meta,
+                   arrays["by_value"], arrays["sorted_values"])
+
+    def static_of(self, addresses: np.ndarray) -> np.ndarray:
+        """Index into ``statics`` for each address, -1 for dynamic memory"""
+        if not self.statics:
+            return np.full(addresses.size, -1)
+        slot = np.searchsorted(self._static_starts, addresses, side="right") - 1
+        inside = (slot >= 0) & (addresses < self._static_ends[np.maximum(slot, 0)])
+        return np.where(inside, slot, -1)
+
+    def read(self, addresses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pointer value stored at each address as ``(values, found)``"""
+        slot = np.searchsorted(self.addresses, addresses)
+        found = slot < self.addresses.size
+        found[found] = self.addresses[slot[found]] == addresses[found]
+        values = np.zeros(addresses.size, dtype=np.uint64)
+        values[found] = self.values[slot[found]]
+        return values, found
+
+    def scan(self, target: int, max_depth: int = DEFAULT_MAX_DEPTH, max_offset: int = DEFAULT_MAX_OFFSET,
+             max_nodes: int = DEFAULT_MAX_NODES, max_results: int = DEFAULT_MAX_RESULTS) -> List[PointerChain]:
+        """Find static pointer paths that lead to ``target``
+
+        Works backwards one level at a time: every pointer whose value lies
+        within ``max_offset`` below a current target is found with two
+        binary searches over ``sorted_values``. Pointers stored in a module
+        image end a path; the others become the next level's targets.
+        """
+        levels: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []  # (addresses, offsets, parent)
+        frontier = np.array([target], dtype=np.uint64)
+        visited = frontier
+        results: List[PointerChain] = []
+
+        for depth in range(max_depth):
+            low = np.where(frontier > np.uint64(max_offset), frontier - np.uint64(max_offset), np.uint64(0))
+            first = np.searchsorted(self.sorted_values, low, side="left")
+            last = np.searchsorted(self.sorted_values, frontier, side="right")
+            counts = last - first
+            if not counts.sum():
+                break
+            parent = np.repeat(np.arange(frontier.size), counts)
+            index = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first, counts)
+            pointers = self.by_value[index]
+            addresses = self.addresses[pointers]
+            offsets = (frontier[parent] - self.values[pointers]).astype(np.int64)
+
+            keep = ~np.isin(addresses, visited)  # cycles and already-expanded locations
+            addresses, offsets, parent = addresses[keep], offsets[keep], parent[keep]
+            levels.append((addresses, offsets, parent))
+
+            statics = self.static_of(addresses)
+            for node in np.flatnonzero(statics >= 0).tolist():
+                results.append(self._chain(levels, node, self.statics[statics[node]]))
+                if len(results) >= max_results:
+                    return results
+
+            frontier = addresses[statics < 0][:max_nodes]
+            levels[-1] = tuple(array[statics < 0][:max_nodes] for array in levels[-1])
+            if not frontier.size:
+                break
+            visited = np.union1d(visited, frontier)
+        return results
+
+    @staticmethod
+    def _chain(levels, node: int, static: StaticRange) -> PointerChain:
+        addresses, offsets, parent = levels[-1]
+        address = int(addresses[node])
+        chain_offsets = [int(offsets[node])]
+        for level in range(len(levels) - 2, -1, -1):
+            node = int(parent[node])
+            chain_offsets.append(int(levels[level][1][node]))
+        return PointerChain(static.module, address - static.base, tuple(chain_offsets))
+
+
+def filter_chains(pointer_map: PointerMap, chains: Sequence[PointerChain], target: int) -> List[PointerChain]:
+    """Keep the chains that still lead to ``target`` in another run's map
+
+    Module bases come from the map's static ranges; each level is one
+    vectorized lookup in the map's sorted pointer locations.
+    """
+    bases = {static.module: static.base for static in pointer_map.statics}
+    candidates = [chain for chain in chains if chain.module in bases]
+    if not candidates:
+        return []
+    addresses = np.array([bases[chain.module] + chain.base_offset for chain in candidates], dtype=np.uint64)
+    alive = np.ones(len(candidates), dtype=bool)
+    depths = np.array([len(chain.offsets) for chain in candidates])
+    for level in range(int(depths.max())):
+        index = np.flatnonzero(alive & (depths > level))
+        values, found = pointer_map.read(addresses[index])
+        alive[index[~found]] = False
+        offsets = np.array([candidates[i].offsets[level] for i in index.tolist()], dtype=np.int64).astype(np.uint64)
+        addresses[index[found]] = values[found] + offsets[found]
+    keep = alive & (addresses == np.uint64(target))
+    return [chain for chain, ok in zip(candidates, keep.tolist()) if ok]
@@ -0,0 +1,162 @@
+"""Incremental process discovery with a pid -> info cache"""
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import psutil
+
+from process_matcher import ProcessMatcher
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_INTERVAL = 2.0
+
+
+@dataclass
+class DiscoveredProcess:
+    pid: int
+    start_time: int  # clock ticks since boot, from /proc/<pid>/stat
+    name: str
+    matched: bool
+    exe: Optional[str] = None
+    cmdline: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    detected_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def exe_path(self) -> str:
+        return self.exe or "Unknown"
+
+
+@dataclass
+class DiscoveryChanges:
+    added: List[DiscoveredProcess]
+    removed: List[DiscoveredProcess]
+    scanned: int
+    elapsed: float
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def read_start_time(pid: int) -> Optional[int]:
+    """Start time of ``pid`` in clock ticks, or None if it is gone"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as stat:
+            data = stat.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses; fields resume
+    # after the last ')' with field 3 (state). starttime is field 22.
+    return int(data[data.rindex(b")") + 2:].split()[19])
+
+
+def read_exe(pid: int) -> Optional[str]:
+    try:
+        return os.readlink(f"/proc/{pid}/exe")
+    except OSError:
+        return None
+
+
+def read_cmdline(pid: int) -> Optional[str]:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as cmdline:
+            return cmdline.read().rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+class ProcessDiscovery:
+    """Keeps track of running processes between passes
+
+    Each pass lists /proc and reads only the start time of pids it already
+    knows; a process is inspected (name, match, exe) only when its
+    (pid, start time) pair is new. ``exe`` and ``cmdline`` are only read
+    for processes that match or when the matcher looks at them.
+    """
+
+    def __init__(self, matcher: ProcessMatcher, interval: float = DISCOVERY_INTERVAL):
+        self.matcher = matcher
+        self.interval = interval
+        self.generation = 0
+        self.refreshed_at: Optional[float] = None
+        self.last_elapsed = 0.0
+        self._processes: Dict[int, DiscoveredProcess] = {}
+
+    def _match(self, process: DiscoveredProcess) -> bool:
+        if self.matcher.needs_exe and process.exe is None:
+            process.exe = read_exe(process.pid)
+        if self.matcher.needs_cmdline and process.cmdline is None:
+            process.cmdline = read_cmdline(process.pid)
+        matched = self.matcher.match(process.name, process.exe, process.cmdline)
+        if matched and process.exe is None:
+            process.exe = read_exe(process.pid)
+        return matched
+
+    def _inspect(self, pid: int, start_time: int) -> Optional[DiscoveredProcess]:
+        try:
+            name = psutil.Process(pid).name()
+        except psutil.Error:
+            return None
+        process = DiscoveredProcess(pid=pid, start_time=start_time, name=name, matched=False)
+        process.matched = self._match(process)
+        return process
+
+    def refresh(self) -> DiscoveryChanges:
+        """Run one discovery pass and return the matched processes that came and went"""
+        started = time.perf_counter()
+        known = self._processes
+        current: Dict[int, DiscoveredProcess] = {}
+        added, removed = [], []
+
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            start_time = read_start_time(pid)
+            if start_time is None:
+                continue
+            previous = known.get(pid)
+            if previous is not None and previous.start_time == start_time:
+                current[pid] = previous
+                continue
+
+            if previous is not None and previous.matched:
+                removed.append(previous)  # pid was reused by a new process
+            process = self._inspect(pid, start_time)
+            if process is not None:
+                current[pid] = process
+                if process.matched:
+                    added.append(process)
+
+        removed.extend(process for pid, process in known.items() if pid not in current and process.matched)
+        self._processes = current
+        if added or removed:
+            self.generation += 1
+        self.refreshed_at = time.time()
+        self.last_elapsed = time.perf_counter() - started
+        return DiscoveryChanges(added, removed, len(current), self.last_elapsed)
+
+    def set_matcher(self, matcher: ProcessMatcher) -> DiscoveryChanges:
+        """Swap the matcher and re-evaluate every cached process against it"""
+        started = time.perf_counter()
+        self.matcher = matcher
+        added, removed = [], []
+        for process in list(self._processes.values()):
+            matched = self._match(process)
+            if matched != process.matched:
+                (added if matched else removed).append(process)
+            process.matched = matched
+        if added or removed:
+            self.generation += 1
+        return DiscoveryChanges(added, removed, len(self._processes), time.perf_counter() - started)
+
+    def matches(self) -> List[DiscoveredProcess]:
+        return [process for process in self._processes.values() if process.matched]
+
+    def get(self, pid: int) -> Optional[DiscoveredProcess]:
+        return self._processes.get(pid)
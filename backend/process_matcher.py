@@ -0,0 +1,90 @@
+"""Configurable process matching compiled into a single regex"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+DEFAULT_KEYWORDS = ("game", "unity", "unreal", "kingshot", "steam", "battle", "rpg", "mmo")
+DEFAULT_FIELDS = ("name",)
+MATCH_FIELDS = ("name", "exe", "cmdline")
+
+
+@dataclass(frozen=True)
+class MatcherConfig:
+    keywords: Tuple[str, ...] = DEFAULT_KEYWORDS  # case-insensitive substrings
+    patterns: Tuple[str, ...] = ()  # case-insensitive regular expressions
+    fields: Tuple[str, ...] = DEFAULT_FIELDS  # which of name / exe / cmdline are matched
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MatcherConfig":
+        fields = tuple(data.get("fields", DEFAULT_FIELDS))
+        unknown = set(fields) - set(MATCH_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown match fields: {', '.join(sorted(unknown))}")
+        return cls(
+            keywords=tuple(keyword for keyword in data.get("keywords", DEFAULT_KEYWORDS) if keyword),
+            patterns=tuple(pattern for pattern in data.get("patterns", ()) if pattern),
+            fields=fields,
+        )
+
+    def to_dict(self) -> dict:
+        return {"keywords": list(self.keywords), "patterns": list(self.patterns), "fields": list(self.fields)}
+
+
+class ProcessMatcher:
+    """All keywords and patterns of a config as one compiled alternation
+
+    Matching a process is one lowercase plus a single ``regex.search`` per
+    configured field instead of one lowercase-and-compare per keyword.
+    """
+
+    def __init__(self, config: MatcherConfig = MatcherConfig()):
+        self.config = config
+        # Inputs are lowercased before searching: a case-sensitive search over
+        # lowercase keywords is several times faster than re.IGNORECASE
+        alternatives = [re.escape(keyword.lower()) for keyword in config.keywords]
+        alternatives += [f"(?i:{pattern})" for pattern in config.patterns]
+        try:
+            self._regex = re.compile("|".join(alternatives)) if alternatives else None
+        except re.error as e:
+            raise ValueError(f"Invalid process pattern: {str(e)}")
+        self._search = self._regex.search if self._regex is not None else None
+        self._match_name = "name" in config.fields
+        self.needs_exe = "exe" in config.fields
+        self.needs_cmdline = "cmdline" in config.fields
+
+    def match(self, name: str, exe: Optional[str] = None, cmdline: Optional[str] = None) -> bool:
+        search = self._search
+        if search is None:
+            return False
+        return bool(
+            (self._match_name and name and search(name.lower()))
+            or (self.needs_exe and exe and search(exe.lower()))
+            or (self.needs_cmdline and cmdline and search(cmdline.lower()))
+        )
+
+
+class MatcherConfigFile:
+    """JSON matcher config on disk, reloaded when its mtime changes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime: Optional[float] = None
+
+    def load_if_changed(self) -> Optional[MatcherConfig]:
+        """Return the new config if the file changed since the last call"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+        if mtime == self._mtime:
+            return None
+        # Remember the mtime first so a bad file is reported once, not every pass
+        self._mtime = mtime
+        with open(self.path) as config_file:
+            return MatcherConfig.from_dict(json.load(config_file))
+
+    def save(self, config: MatcherConfig):
+        with open(self.path, "w") as config_file:
+            json.dump(config.to_dict(), config_file, indent=2)
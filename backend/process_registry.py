@@ -0,0 +1,202 @@
+"""Connected processes with pooled handles and exit detection"""
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import psutil
+
+from memory_scanner import ProcessMemory
+from process_discovery import read_start_time
+from region_map import RegionMap
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessHandle:
+    """Everything kept open for one connected process
+
+    The /proc/<pid>/mem descriptors are opened on first use and shared by
+    every caller: positional reads and writes need no locking, and the lock
+    only guards opening and the final close, which waits for the last lease
+    to be returned.
+    """
+
+    def __init__(self, pid: int, start_time: int):
+        self.pid = pid
+        self.start_time = start_time
+        self.process = psutil.Process(pid)
+        self.process.cpu_percent()  # the first call only primes the counters
+        self.name = self.process.name()
+        self.regions = RegionMap(pid)
+        self.connected_at = datetime.utcnow()
+        self.closed = False
+        self.leases = 0  # memory leases handed out so far
+        self._memory: Dict[bool, ProcessMemory] = {}
+        self._users = 0
+        self._lock = threading.Lock()
+        self._pidfd: Optional[int] = None
+
+    def alive(self) -> bool:
+        """True while the pid still belongs to the process that was connected"""
+        return not self.closed and read_start_time(self.pid) == self.start_time
+
+    @contextlib.contextmanager
+    def memory(self, writable: bool = False) -> Iterator[ProcessMemory]:
+        """Lease the shared /proc/<pid>/mem descriptor"""
+        with self._lock:
+            if self.closed:
+                raise ProcessLookupError(f"Process {self.pid} is no longer connected")
+            memory = self._memory.get(writable)
+            if memory is None:
+                if read_start_time(self.pid) != self.start_time:
+                    raise ProcessLookupError(f"Process {self.pid} has exited")
+                memory = self._memory[writable] = ProcessMemory(self.pid, writable=writable)
+            self._users += 1
+            self.leases += 1
+        try:
+            yield memory
+        finally:
+            with self._lock:
+                self._users -= 1
+                if self.closed and not self._users:
+                    self._close_memory()
+
+    def _close_memory(self):
+        for memory in self._memory.values():
+            memory.close()
+        self._memory.clear()
+
+    def close(self):
+        """Stop handing out leases; descriptors close once the last one is returned"""
+        with self._lock:
+            self.closed = True
+            if not self._users:
+                self._close_memory()
+
+    def info(self) -> dict:
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "status": "connected",
+            "start_time": self.start_time,
+            "connected_at": self.connected_at,
+            "open_descriptors": len(self._memory),
+            "leases": self.leases,
+            "regions": len(self.regions),
+        }
+
+
+class ProcessRegistry:
+    """Connected processes keyed by pid, dropped as soon as they exit
+
+    Each connection gets a pidfd watched by the event loop, which becomes
+    readable when the process exits, so exits are noticed without polling.
+    Where pidfds are not available, an exit is noticed the next time the
+    pid is looked up. Lookups also compare the start time of the pid with
+    the one seen at connect time, so a reused pid never inherits handles.
+    ``on_exit`` is called on the loop with the handle of every process
+    that went away.
+    """
+
+    def __init__(self, on_exit: Optional[Callable[[ProcessHandle], None]] = None):
+        self.on_exit = on_exit
+        self.exits = 0
+        self._handles: Dict[int, ProcessHandle] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    def connect(self, pid: int) -> ProcessHandle:
+        """Handle for ``pid``, reusing the current one if it is the same process"""
+        start_time = read_start_time(pid)
+        if start_time is None:
+            raise ProcessLookupError(f"Process {pid} not found")
+        handle = self._handles.get(pid)
+        if handle is not None:
+            if handle.start_time == start_time and not handle.closed:
+                return handle
+            self._exited(handle)
+        try:
+            handle = ProcessHandle(pid, start_time)
+        except psutil.NoSuchProcess:
+            raise ProcessLookupError(f"Process {pid} not found")
+        self._handles[pid] = handle
+        self._watch(handle)
+        return handle
+
+    def _watch(self, handle: ProcessHandle):
+        if self._loop is None or not hasattr(os, "pidfd_open"):
+            return
+        try:
+            handle._pidfd = os.pidfd_open(handle.pid)
+        except OSError as e:
+            logger.debug(f"No pidfd for process {handle.pid}: {e}")
+            return
+        # The pid may have been reused between reading the start time and
+        # opening the pidfd; the lookup then drops the handle
+        self._loop.add_reader(handle._pidfd, self._exited, handle)
+
+    def _unwatch(self, handle: ProcessHandle):
+        if handle._pidfd is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(handle._pidfd)
+        os.close(handle._pidfd)
+        handle._pidfd = None
+
+    def _exited(self, handle: ProcessHandle):
+        if self._handles.get(handle.pid) is handle:
+            self.exits += 1
+            self._release(handle)
+            if self.on_exit is not None:
+                try:
+                    self.on_exit(handle)
+                except Exception as e:
+                    logger.warning(f"Exit cleanup for process {handle.pid} failed: {e}")
+
+    def _release(self, handle: ProcessHandle):
+        self._handles.pop(handle.pid, None)
+        self._unwatch(handle)
+        handle.close()
+
+    def get(self, pid: int) -> Optional[ProcessHandle]:
+        """Handle of a connected process that is still running"""
+        handle = self._handles.get(pid)
+        if handle is not None and not handle.alive():
+            self._exited(handle)
+            return None
+        return handle
+
+    def handle(self, pid: int) -> ProcessHandle:
+        handle = self.get(pid)
+        if handle is None:
+            raise ProcessLookupError(f"Process {pid} not connected")
+        return handle
+
+    def memory(self, pid: int, writable: bool = False):
+        """Lease the pooled /proc/<pid>/mem descriptor of a connected process"""
+        return self.handle(pid).memory(writable)
+
+    def disconnect(self, pid: int) -> Optional[ProcessHandle]:
+        handle = self._handles.get(pid)
+        if handle is not None:
+            self._release(handle)
+        return handle
+
+    def handles(self) -> List[ProcessHandle]:
+        return list(self._handles.values())
+
+    def __contains__(self, pid: int) -> bool:
+        return self.get(pid) is not None
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def close(self):
+        for handle in list(self._handles.values()):
+            self._release(handle)
@@ -0,0 +1,151 @@
+"""Shared per-process telemetry sampling with fan-out to many subscribers"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 1.0
+
+
+class Subscription:
+    """Latest-frame mailbox for one subscriber
+
+    A slow consumer never builds a backlog: a frame that has not been
+    picked up yet is replaced by the next one and counted as dropped.
+    """
+
+    def __init__(self):
+        self.dropped = 0
+        self.closed = False
+        self._frame: Optional[str] = None
+        self._ready = asyncio.Event()
+
+    def push(self, frame: str, final: bool = False):
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self.closed = self.closed or final
+        self._ready.set()
+
+    async def next(self) -> Optional[str]:
+        """Wait for the next frame; returns None once the stream has ended"""
+        while self._frame is None:
+            if self.closed:
+                return None
+            await self._ready.wait()
+            self._ready.clear()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+class ProcessSampler:
+    """Samples one pid on a fixed interval while it has subscribers"""
+
+    def __init__(self, pid: int, process: Callable[[int], Optional[psutil.Process]],
+                 interval: float = SAMPLE_INTERVAL, on_sample: Optional[Callable[[int, dict], None]] = None):
+        self.pid = pid
+        self.interval = interval
+        self.subscribers: Set[Subscription] = set()
+        self.samples = 0
+        self._process = process
+        self._on_sample = on_sample
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def sample(self, proc: psutil.Process) -> dict:
+        with proc.oneshot():
+            return {
+                "timestamp": datetime.utcnow().isoformat(),
+                "cpu_percent": proc.cpu_percent(),
+                "memory_info": proc.memory_info()._asdict(),
+                "status": proc.status(),
+                "num_threads": proc.num_threads()
+            }
+
+    def publish(self, frame: str, final: bool = False):
+        for subscription in self.subscribers:
+            subscription.push(frame, final)
+
+    async def _run(self):
+        deadline = time.monotonic()
+        while self.subscribers:
+            proc = self._process(self.pid)
+            if proc is not None:
+                try:
+                    sample = self.sample(proc)
+                    frame = json.dumps(sample)
+                    if self._on_sample is not None:
+                        self._on_sample(self.pid, sample)
+                except psutil.NoSuchProcess:
+                    self.publish(json.dumps({"error": "Process no longer exists"}), final=True)
+                    break
+                except psutil.Error as e:
+                    frame = json.dumps({"error": f"Sampling failed: {str(e)}"})
+                self.samples += 1
+            else:
+                frame = json.dumps({"error": "Process not connected"})
+            self.publish(frame)
+
+            deadline = max(deadline + self.interval, time.monotonic())
+            await asyncio.sleep(deadline - time.monotonic())
+
+
+class TelemetryHub:
+    """One sampler per pid, shared by every subscriber of that pid
+
+    ``process`` returns the ``psutil.Process`` of a connected pid, or None
+    when it is not connected. It is the handle kept for the whole
+    connection, so ``cpu_percent()`` always has a previous reading to
+    compare against, even across sampler restarts.
+    """
+
+    def __init__(self, process: Callable[[int], Optional[psutil.Process]], interval: float = SAMPLE_INTERVAL,
+                 on_sample: Optional[Callable[[int, dict], None]] = None):
+        self.interval = interval
+        self._process = process
+        self._on_sample = on_sample
+        self._samplers: Dict[int, ProcessSampler] = {}
+
+    def subscribe(self, pid: int) -> Subscription:
+        sampler = self._samplers.get(pid)
+        if sampler is None:
+            sampler = ProcessSampler(pid, self._process, self.interval, on_sample=self._on_sample)
+            self._samplers[pid] = sampler
+        subscription = Subscription()
+        sampler.subscribers.add(subscription)
+        sampler.start()
+        return subscription
+
+    def unsubscribe(self, pid: int, subscription: Subscription):
+        sampler = self._samplers.get(pid)
+        if sampler is None:
+            return
+        sampler.subscribers.discard(subscription)
+        if not sampler.subscribers:
+            sampler.stop()
+            del self._samplers[pid]
+
+    def stats(self) -> dict:
+        return {
+            pid: {"subscribers": len(sampler.subscribers), "samples": sampler.samples}
+            for pid, sampler in self._samplers.items()
+        }
+
+    def close(self):
+        for sampler in self._samplers.values():
+            sampler.stop()
+        self._samplers.clear()
@@ -0,0 +1,201 @@
+"""Cached memory map of a process, refreshed only when /proc/<pid>/maps changes"""
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from memory_scanner import UNSCANNABLE_PATHS, MemoryRegion, parse_map_line
+from pointer_chains import module_bases
+
+PERM_FLAGS = "rwxp"
+
+
+def _common_length(a: bytes, b: bytes, from_end: bool = False) -> int:
+    """Length of the common prefix (or suffix) of two byte strings"""
+    size = min(len(a), len(b))
+    left, right = np.frombuffer(a, dtype=np.uint8), np.frombuffer(b, dtype=np.uint8)
+    if from_end:
+        left, right = left[::-1], right[::-1]
+    differ = np.flatnonzero(left[:size] != right[:size])
+    return int(differ[0]) if differ.size else size
+
+
+def _columns(regions: List[MemoryRegion]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """``(starts, ends, flags, paths)`` arrays for a list of regions"""
+    count = len(regions)
+    starts = np.fromiter((region.start for region in regions), dtype=np.uint64, count=count)
+    ends = np.fromiter((region.end for region in regions), dtype=np.uint64, count=count)
+    # "rw-p" -> one bit per letter that is set
+    letters = np.array([region.perms for region in regions], dtype="S4").view(np.uint8).reshape(-1, 4)
+    set_bits = letters == np.frombuffer(PERM_FLAGS.encode(), dtype=np.uint8)
+    flags = (set_bits * (1 << np.arange(4, dtype=np.uint8))).sum(axis=1, dtype=np.uint8)
+    paths = np.empty(count, dtype=object)
+    paths[:] = [region.path for region in regions]
+    return starts, ends, flags, paths
+
+
+class _Layout(NamedTuple):
+    """One parse of the maps file; replaced as a whole, never changed in place"""
+    raw: bytes
+    regions: List[MemoryRegion]
+    starts: np.ndarray
+    ends: np.ndarray
+    flags: np.ndarray
+    paths: np.ndarray
+
+
+EMPTY_LAYOUT = _Layout(b"", [], *_columns([]))
+
+
+def _update(layout: _Layout, raw: bytes) -> Tuple[_Layout, int]:
+    """New layout for the maps file ``raw`` and the number of lines parsed for it
+
+    The file is sorted by address and changes are usually local: the lines
+    of the common prefix and suffix are kept, only the middle is parsed.
+    """
+    old = layout.raw
+    prefix = _common_length(old, raw)
+    prefix = old.rfind(b"\n", 0, prefix) + 1
+    suffix = min(_common_length(old, raw, from_end=True), len(old) - prefix, len(raw) - prefix)
+    # Lines kept at the end start after a newline inside the common suffix
+    suffix_at = old.find(b"\n", len(old) - suffix) + 1 if suffix else len(old)
+    if not suffix_at:
+        suffix_at = len(old)
+    keep_head = old.count(b"\n", 0, prefix)
+    keep_tail = old.count(b"\n", suffix_at)
+    middle = raw[prefix:suffix_at + len(raw) - len(old)]
+    parsed = [parse_map_line(line.decode("utf-8", errors="replace")) for line in middle.splitlines()]
+
+    tail = len(layout.regions) - keep_tail
+    columns = (
+        np.concatenate((old_column[:keep_head], new_column, old_column[tail:]))
+        for old_column, new_column in zip(layout[2:], _columns(parsed))
+    )
+    return _Layout(raw, layout.regions[:keep_head] + parsed + layout.regions[tail:], *columns), len(parsed)
+
+
+class RegionMap:
+    """The mappings of one process as sorted columns
+
+    ``starts`` and ``ends`` are uint64 arrays in address order (mappings
+    never overlap), so an address lookup is one binary search. ``flags``
+    holds one bit per ``rwxp`` permission for vectorized filtering.
+
+    ``refresh`` reads the maps file in one go and compares its line count
+    and bytes with the previous read; an unchanged map is not parsed at
+    all, and a changed one only parses the lines between the unchanged
+    head and tail of the file.
+
+    Scans read the map from worker threads while handlers refresh it on the
+    event loop. A refresh builds a complete new ``_Layout`` and publishes it
+    with one attribute assignment, so every reader that takes ``_layout``
+    once sees columns that belong together; refreshes are serialized.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.version = 0  # bumped whenever the mappings change
+        self.checked_at = 0.0  # monotonic time of the last read
+        self.parsed = 0  # lines parsed by the last change
+        self._layout = EMPTY_LAYOUT
+        self._bases: Tuple[Optional[_Layout], Dict[str, int]] = (None, {})
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._layout.regions)
+
+    @property
+    def regions(self) -> List[MemoryRegion]:
+        return self._layout.regions
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._layout.starts
+
+    @property
+    def ends(self) -> np.ndarray:
+        return self._layout.ends
+
+    @property
+    def flags(self) -> np.ndarray:
+        return self._layout.flags
+
+    @property
+    def paths(self) -> np.ndarray:
+        return self._layout.paths
+
+    def refresh(self, max_age: float = 0.0) -> "RegionMap":
+        """Re-read the maps file unless it was checked less than ``max_age`` seconds ago"""
+        now = time.monotonic()
+        if max_age and now - self.checked_at < max_age:
+            return self
+        with self._refresh_lock:
+            with open(f"/proc/{self.pid}/maps", "rb") as maps:
+                raw = maps.read()
+            self.checked_at = now
+            layout = self._layout
+            if raw.count(b"\n") == len(layout.regions) and raw == layout.raw:
+                return self
+            self._layout, self.parsed = _update(layout, raw)
+            self.version += 1
+        return self
+
+    def find(self, address: int) -> Optional[MemoryRegion]:
+        """Region containing ``address``"""
+        layout = self._layout
+        slot = int(np.searchsorted(layout.starts, np.uint64(address), side="right")) - 1
+        if slot < 0 or address >= layout.regions[slot].end:
+            return None
+        return layout.regions[slot]
+
+    def locate(self, addresses: np.ndarray) -> np.ndarray:
+        """Index of the region containing each address, -1 where unmapped"""
+        layout = self._layout
+        addresses = np.asarray(addresses, dtype=np.uint64)
+        slot = np.searchsorted(layout.starts, addresses, side="right") - 1
+        inside = (slot >= 0) & (addresses < layout.ends[np.maximum(slot, 0)]) if layout.regions else slot >= 0
+        return np.where(inside, slot, -1)
+
+    def module_bases(self) -> Dict[str, int]:
+        layout = self._layout
+        cached, bases = self._bases
+        if cached is not layout:
+            bases = module_bases(layout.regions)
+            self._bases = (layout, bases)
+        return bases
+
+    def select(self, perms: str = "r", module: Optional[str] = None, min_size: int = 0,
+               max_size: Optional[int] = None, scannable: bool = True) -> List[MemoryRegion]:
+        """Regions that have every permission in ``perms`` and pass the other filters
+
+        ``module`` matches a mapping's full path or file name; ``scannable``
+        drops the mappings that cannot be read through /proc/<pid>/mem.
+        """
+        required = 0
+        for flag in perms:
+            if flag not in PERM_FLAGS:
+                raise ValueError(f"Unknown permission flag: {flag!r}")
+            required |= 1 << PERM_FLAGS.index(flag)
+        layout = self._layout
+        keep = (layout.flags & required) == required
+        sizes = layout.ends - layout.starts
+        if min_size:
+            keep &= sizes >= np.uint64(min_size)
+        if max_size is not None:
+            keep &= sizes <= np.uint64(max_size)
+        if module:
+            keep &= np.array([path == module or os.path.basename(path) == module for path in layout.paths], dtype=bool)
+        if scannable:
+            keep &= ~np.isin(layout.paths, UNSCANNABLE_PATHS)
+        return [layout.regions[i] for i in np.flatnonzero(keep).tolist()]
+
+    def stats(self) -> dict:
+        layout = self._layout
+        return {
+            "regions": len(layout.regions),
+            "version": self.version,
+            "parsed": self.parsed,
+            "mapped_bytes": int((layout.ends - layout.starts).sum()),
+        }
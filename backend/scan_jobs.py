@@ -0,0 +1,231 @@
+"""Background scan jobs that report progress and can be read while they run"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+import numpy as np
+
+from memory_scanner import EMPTY_ADDRESSES, MemoryRegion, ParallelScanner, ScanPattern
+
+PROGRESS_INTERVAL = 0.25  # seconds between progress callbacks of a job
+STREAM_BATCH = 4096  # addresses per block yielded by ScanJob.stream
+
+
+class ScanJob:
+    """An exact value scan running on the worker pool
+
+    The pool tasks cover ascending, disjoint address ranges, so the hits of
+    the leading tasks that have finished are a sorted prefix of the final
+    result; ``page`` and ``stream`` serve that prefix while the scan runs
+    and offsets into it never move. Cancelling drops the tasks that have
+    not started; hits of the finished ones stay readable.
+    """
+
+    def __init__(self, pid: int, value: Any, data_type: str):
+        self.id = str(uuid.uuid4())
+        self.pid = pid
+        self.value = value
+        self.data_type = data_type
+        self.state = "running"  # running, completed, cancelled or failed
+        self.error: Optional[str] = None
+        self.result_id: Optional[str] = None  # stored scan result once completed
+        self.regions = 0
+        self.total_bytes = 0
+        self.bytes_done = 0  # planned bytes of the finished tasks
+        self.bytes_scanned = 0  # bytes the workers actually read
+        self.bytes_skipped = 0  # non-resident pages left out
+        self.hits = 0
+        self.worker_time = 0.0
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None  # coroutine driving the job
+        self._started = time.perf_counter()
+        self._elapsed: Optional[float] = None
+        self._sizes: List[int] = []
+        self._parts: List[Optional[np.ndarray]] = []
+        self._pending: List[asyncio.Future] = []
+        self._ready = 0  # leading parts that can be read
+        self._available = 0  # hits in those parts
+        self._changed = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed if self._elapsed is not None else time.perf_counter() - self._started
+
+    def start(self, scanner: ParallelScanner, regions: List[MemoryRegion], pattern: ScanPattern,
+              aligned: bool = True, resident_only: bool = False):
+        """Queue the scan tasks on ``scanner``'s pool"""
+        tasks, futures = scanner.submit(self.pid, regions, pattern, aligned, resident_only)
+        self.regions = len(regions)
+        self._sizes = [sum(region.size for region in task) for task in tasks]
+        self._parts = [None] * len(tasks)
+        self.total_bytes = sum(self._sizes)
+        self._pending = [asyncio.wrap_future(future) for future in futures]
+
+    async def collect(self, on_progress: Optional[Callable[["ScanJob"], None]] = None):
+        """Take in task results as they finish until the scan is done or cancelled"""
+        index_of = {future: index for index, future in enumerate(self._pending)}
+        pending = set(self._pending)
+        reported = 0.0
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled() or not self.running:
+                    continue
+                if future.exception() is not None:
+                    self._fail(future.exception())
+                    continue
+                self._finish_task(index_of[future], *future.result())
+            self._notify()
+            now = time.perf_counter()
+            if on_progress is not None and self.running and now - reported >= PROGRESS_INTERVAL:
+                reported = now
+                on_progress(self)
+        if self.running:
+            self._finish("completed")
+
+    def _finish_task(self, index: int, addresses: np.ndarray, scanned: int, elapsed: float, skipped: int):
+        self._parts[index] = addresses
+        self.bytes_done += self._sizes[index]
+        self.bytes_scanned += scanned
+        self.bytes_skipped += skipped
+        self.worker_time += elapsed
+        self.hits += int(addresses.size)
+        while self._ready < len(self._parts) and self._parts[self._ready] is not None:
+            self._available += int(self._parts[self._ready].size)
+            self._ready += 1
+
+    def _fail(self, error: BaseException):
+        if self.running:
+            self.error = str(error) or type(error).__name__
+            self._finish("failed")
+
+    def _finish(self, state: str):
+        """Stop the remaining tasks and open every finished part for reading"""
+        self.state = state
+        self.finished_at = datetime.utcnow()
+        self._elapsed = time.perf_counter() - self._started
+        for future in self._pending:
+            future.cancel()
+        self._ready = len(self._parts)
+        self._available = self.hits
+        self._notify()
+
+    def cancel(self) -> bool:
+        """Cancel a running job; returns False if it had already finished"""
+        if not self.running:
+            return False
+        self._finish("cancelled")
+        return True
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def page(self, offset: int = 0, limit: int = 1000) -> np.ndarray:
+        """``hits[offset:offset + limit]`` out of the part of the result that is known"""
+        pieces, skip = [], max(offset, 0)
+        for part in self._parts[:self._ready]:
+            if limit <= 0:
+                break
+            if part is None:
+                continue
+            if skip >= part.size:
+                skip -= part.size
+                continue
+            piece = part[skip:skip + limit]
+            pieces.append(piece)
+            limit -= piece.size
+            skip = 0
+        return np.concatenate(pieces) if pieces else EMPTY_ADDRESSES
+
+    async def stream(self, offset: int = 0, batch: int = STREAM_BATCH) -> AsyncIterator[np.ndarray]:
+        """Yield the hits from ``offset`` on in address order as the tasks covering them finish"""
+        while True:
+            while offset >= self._available and self.running:
+                await self._changed.wait()
+            if offset >= self._available:
+                return
+            block = self.page(offset, batch)
+            offset += block.size
+            yield block
+
+    def status(self) -> dict:
+        elapsed = self.elapsed
+        return {
+            "id": self.id,
+            "pid": self.pid,
+            "state": self.state,
+            "value": self.value,
+            "data_type": self.data_type,
+            "regions": self.regions,
+            "tasks": len(self._parts),
+            "tasks_done": sum(part is not None for part in self._parts),
+            "total_bytes": self.total_bytes,
+            "bytes_done": self.bytes_done,
+            "bytes_scanned": self.bytes_scanned,
+            "bytes_skipped": self.bytes_skipped,
+            "progress": round(self.bytes_done / self.total_bytes, 4) if self.total_bytes else 1.0,
+            "hits": self.hits,
+            "available": self._available,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "worker_time_ms": round(self.worker_time * 1000, 3),
+            "throughput_gbps": round(self.bytes_scanned / elapsed / 1e9, 3) if elapsed else 0.0,
+            "error": self.error,
+            "result_id": self.result_id,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ScanJobStore:
+    """Registry of scan jobs that forgets the oldest finished ones first"""
+
+    def __init__(self, max_jobs: int = 32):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+
+    def add(self, job: ScanJob) -> ScanJob:
+        self._jobs[job.id] = job
+        finished = [job_id for job_id, known in self._jobs.items() if not known.running]
+        for job_id in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+            del self._jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self._jobs.get(job_id)
+
+    def remove(self, job_id: str) -> Optional[ScanJob]:
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def list(self) -> List[ScanJob]:
+        return list(self._jobs.values())
+
+    @property
+    def running(self) -> int:
+        return sum(job.running for job in self._jobs.values())
+
+    def drop_pid(self, pid: int) -> int:
+        """Cancel and forget every job of ``pid``; returns how many were dropped"""
+        stale = [job_id for job_id, job in self._jobs.items() if job.pid == pid]
+        for job_id in stale:
+            self._jobs.pop(job_id).cancel()
+        return len(stale)
+
+    def close(self):
+        for job in self._jobs.values():
+            job.cancel()
+        self._jobs.clear()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
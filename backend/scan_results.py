@@ -0,0 +1,66 @@
+"""Scan results persisted as compressed, chunked address arrays"""
+import zlib
+from datetime import datetime
+from typing import List, Tuple
+
+import numpy as np
+from bson import Binary
+
+from memory_scanner import EMPTY_ADDRESSES
+
+RESULT_CHUNK = 1 << 20  # addresses per chunk document
+MAX_HISTORY_RECORDS = 1000  # scan matches also stored as memory_addresses records
+MAX_STORED_RESULTS = 8  # newest scan results kept per process
+RESULT_TTL = 24 * 3600  # seconds before Mongo expires a stored scan result
+
+
+def encode_chunk(addresses: np.ndarray) -> bytes:
+    """Delta-encode a sorted address array and compress it
+
+    Scan hits are sorted and dense, so the deltas are small and a million
+    addresses usually compress to well under their 8 MiB raw size.
+    """
+    deltas = np.diff(addresses, prepend=addresses[:1])
+    return zlib.compress(deltas.astype("<u8").tobytes(), 1)
+
+
+def decode_chunk(first: int, data: bytes) -> np.ndarray:
+    deltas = np.frombuffer(zlib.decompress(data), dtype="<u8").astype(np.uint64)
+    deltas[0] = first
+    return np.cumsum(deltas, dtype=np.uint64)
+
+
+def result_chunks(result_id: str, addresses: np.ndarray, process_id: str, created_at: datetime) -> List[dict]:
+    """Chunk documents for the ``scan_result_chunks`` collection
+
+    Chunks carry the process and creation time of their result so they
+    can be expired and dropped together with its summary document.
+    """
+    chunks = []
+    for index, start in enumerate(range(0, addresses.size, RESULT_CHUNK)):
+        chunk = addresses[start:start + RESULT_CHUNK]
+        chunks.append({
+            "result_id": result_id,
+            "process_id": process_id,
+            "created_at": created_at,
+            "index": index,
+            "count": int(chunk.size),
+            "first": int(chunk[0]),
+            "last": int(chunk[-1]),
+            "addresses": Binary(encode_chunk(chunk)),
+        })
+    return chunks
+
+
+def chunk_range(offset: int, limit: int) -> Tuple[int, int]:
+    """Indices of the first and last chunk holding ``addresses[offset:offset + limit]``"""
+    return offset // RESULT_CHUNK, (offset + max(limit, 1) - 1) // RESULT_CHUNK
+
+
+def read_chunks(chunks: List[dict], offset: int, limit: int) -> np.ndarray:
+    """Slice ``addresses[offset:offset + limit]`` out of the chunks returned for ``chunk_range``"""
+    if not chunks:
+        return EMPTY_ADDRESSES
+    addresses = np.concatenate([decode_chunk(chunk["first"], chunk["addresses"]) for chunk in chunks])
+    start = offset - chunks[0]["index"] * RESULT_CHUNK
+    return addresses[start:start + limit]
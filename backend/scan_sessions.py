@@ -0,0 +1,185 @@
+"""Server-side scan sessions narrowed by follow-up ("next") scans"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+
+from memory_io import read_values
+from memory_scanner import ProcessMemory, ScanPattern, ScanResult, compile_pattern, to_scalar
+
+COMPARISONS = ("equal", "changed", "unchanged", "increased", "decreased", "in_range")
+BYTE_COMPARISONS = ("equal", "changed", "unchanged")
+
+
+def pattern_dtype(pattern: ScanPattern) -> np.dtype:
+    """dtype used to snapshot values matched by ``pattern``"""
+    return pattern.dtype if pattern.dtype is not None else np.dtype((np.void, len(pattern.value)))
+
+
+def compare_values(comparison: str, current: np.ndarray, previous: np.ndarray,
+                   low: Any = None, high: Any = None) -> np.ndarray:
+    """Boolean mask of the ``current`` values that satisfy ``comparison``"""
+    if comparison == "equal":
+        return current == low
+    if comparison == "changed":
+        return current != previous
+    if comparison == "unchanged":
+        return current == previous
+    if comparison == "increased":
+        return current > previous
+    if comparison == "decreased":
+        return current < previous
+    if comparison == "in_range":
+        return (current >= low) & (current <= high)
+    raise ValueError(f"Unsupported comparison: {comparison}")
+
+
+@dataclass
+class NarrowResult:
+    comparison: str
+    previous_count: int
+    count: int
+    unreadable: int
+    elapsed: float
+
+
+@dataclass
+class ScanSession:
+    """Candidate addresses of a scan plus a snapshot of their last seen values"""
+    pid: int
+    data_type: str
+    dtype: np.dtype
+    addresses: np.ndarray
+    values: np.ndarray
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    scans: int = 1
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @classmethod
+    def from_scan(cls, memory: ProcessMemory, pattern: ScanPattern, result: ScanResult) -> "ScanSession":
+        dtype = pattern_dtype(pattern)
+        addresses = result.addresses
+        if pattern.tolerance:
+            # Fuzzy float matches differ from the search value, read the real ones
+            values, valid = read_values(memory, addresses, dtype)
+            addresses, values = addresses[valid], values[valid]
+        else:
+            values = np.full(addresses.size, np.asarray(pattern.value, dtype=dtype), dtype=dtype)
+        return cls(pid=memory.pid, data_type=pattern.data_type, dtype=dtype, addresses=addresses, values=values)
+
+    @property
+    def count(self) -> int:
+        return int(self.addresses.size)
+
+    @property
+    def mode(self) -> str:
+        return "candidates"
+
+    def _operand(self, value: Any) -> np.generic:
+        if value is None:
+            raise ValueError("This comparison needs a value")
+        if self.dtype.kind == "V":
+            raw = compile_pattern(value, self.data_type).value
+            if len(raw) != self.dtype.itemsize:
+                raise ValueError(f"Value must be {self.dtype.itemsize} bytes long")
+            return np.asarray(np.void(raw), dtype=self.dtype)
+        return to_scalar(value, self.dtype)
+
+    def _operands(self, comparison: str, value: Any, value_max: Any):
+        if comparison == "equal":
+            return self._operand(value), None
+        if comparison == "in_range":
+            return self._operand(value), self._operand(value_max)
+        return None, None
+
+    def next_scan(self, memory: ProcessMemory, comparison: str, value: Any = None,
+                  value_max: Any = None) -> NarrowResult:
+        """Re-read only the current candidates and keep those matching ``comparison``
+
+        Candidates are read with coalesced page-span reads, so the cost is
+        proportional to the surviving candidates rather than to the size of
+        the target process. Unreadable candidates are dropped.
+        """
+        if comparison not in COMPARISONS:
+            raise ValueError(f"Unsupported comparison: {comparison}")
+        if self.dtype.kind == "V" and comparison not in BYTE_COMPARISONS:
+            raise ValueError(f"Comparison '{comparison}' is not supported for {self.data_type} scans")
+
+        with self._lock:
+            return self._narrow(memory, comparison, value, value_max)
+
+    def _narrow(self, memory: ProcessMemory, comparison: str, value: Any, value_max: Any) -> NarrowResult:
+        started = time.perf_counter()
+        current, valid = read_values(memory, self.addresses, self.dtype)
+
+        low, high = self._operands(comparison, value, value_max)
+        mask = compare_values(comparison, current, self.values, low, high) & valid
+
+        previous_count = self.count
+        self.addresses = self.addresses[mask]
+        self.values = current[mask]
+        self.scans += 1
+        self.updated_at = datetime.utcnow()
+        return NarrowResult(
+            comparison=comparison,
+            previous_count=previous_count,
+            count=self.count,
+            unreadable=int((~valid).sum()),
+            elapsed=time.perf_counter() - started,
+        )
+
+    def page(self, offset: int = 0, limit: int = 1000):
+        """Return a slice of ``(addresses, values)`` for display"""
+        return self.addresses[offset:offset + limit], self.values[offset:offset + limit]
+
+    def close(self):
+        """Release resources held outside of the Python heap"""
+
+
+class ScanSessionStore:
+    """In-memory session registry that evicts the least recently used session"""
+
+    def __init__(self, max_sessions: int = 32):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ScanSession]" = OrderedDict()
+
+    def add(self, session: ScanSession) -> ScanSession:
+        self._sessions[session.id] = session
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            evicted.close()
+        return session
+
+    def get(self, session_id: str) -> Optional[ScanSession]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str) -> Optional[ScanSession]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+        return session
+
+    def drop_pid(self, pid: int) -> int:
+        """Forget every session of ``pid``; returns how many were dropped"""
+        stale = [session_id for session_id, session in self._sessions.items() if session.pid == pid]
+        for session_id in stale:
+            self._sessions.pop(session_id).close()
+        return len(stale)
+
+    def close(self):
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -1,5 +1,7 @@
-from fastapi import FastAPI, APIRouter, HTTPException, WebSocket
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pymongo import ASCENDING, DESCENDING, DeleteMany, IndexModel, InsertOne, ReplaceOne, UpdateOne
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -7,22 +9,39 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import uuid
 from datetime import datetime
 import psutil
 import json
 import asyncio
-try:
-    import pyautogui
-    from pynput import mouse, keyboard
-    GUI_AVAILABLE = True
-except Exception as e:
-    logging.warning(f"GUI libraries not available: {str(e)}. Running in headless mode.")
-    GUI_AVAILABLE = False
-import threading
+import base64
+import shutil
 import time
 
+from automation_backends import BACKENDS, RecordingBackend, create_backend
+from automation_engine import AutomationEngine, compile_script
+from event_bus import EventBus
+from memory_freeze import FreezeEngine, FrozenValue
+from memory_io import encode_value, format_address, parse_address, read_batch, write_batch
+from memory_scanner import ParallelScanner, compile_pattern, resolve_dtype
+from memory_snapshot import SnapshotSession
+from memory_watch import DEFAULT_WATCH_RATE, MAX_WATCH_RATE, WatchList, binary_frame, json_frame
+from pagination import PAGE_SORT, CollectionVersions, encode_cursor, page_filter, page_size, projection
+from pointer_chains import ModuleCache, PointerChain, resolve_chains
+from pointer_scan import DEFAULT_MAX_DEPTH, DEFAULT_MAX_OFFSET, DEFAULT_MAX_RESULTS, PointerMap, filter_chains, pointer_map_dir
+from process_discovery import DISCOVERY_INTERVAL, DiscoveryChanges, ProcessDiscovery
+from process_matcher import MATCH_FIELDS, MatcherConfig, MatcherConfigFile, ProcessMatcher
+from process_registry import ProcessHandle, ProcessRegistry
+from process_telemetry import TelemetryHub
+from region_map import RegionMap
+from scan_jobs import ScanJob, ScanJobStore
+from scan_results import MAX_HISTORY_RECORDS, MAX_STORED_RESULTS, RESULT_TTL, chunk_range, read_chunks, result_chunks
+from scan_sessions import ScanSession, ScanSessionStore
+from signature_scan import SignatureCache, compile_signature, scan_signatures
+from time_series import TIME_SERIES_FLUSH_INTERVAL, TimeSeriesStore
+from write_behind import WriteBehindQueue
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -37,10 +56,80 @@ app = FastAPI(title="Game Hacking Tools API", version="1.0.0")
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Global variables for automation
-automation_active = False
-automation_thread = None
-connected_processes = {}
+def release_process(handle: ProcessHandle, reason: str):
+    """Drop the sessions, jobs, frozen values and caches of a process that is no longer connected"""
+    scan_sessions.drop_pid(handle.pid)
+    scan_jobs.drop_pid(handle.pid)
+    freezer.forget(handle.pid)
+    modules.forget(handle.pid)
+    time_series.forget((f"process:{handle.pid}:", f"watch:{handle.pid}:"))
+    track_task(asyncio.create_task(drop_scan_results(handle.pid)))
+    publish_change("process.disconnected", pid=handle.pid, name=handle.name, reason=reason)
+
+# Cleanups started from synchronous callbacks; referenced until they finish
+cleanup_tasks = set()
+
+def track_task(task: asyncio.Task):
+    cleanup_tasks.add(task)
+    task.add_done_callback(cleanup_tasks.discard)
+
+connected_processes = ProcessRegistry(on_exit=lambda handle: release_process(handle, "exited"))
+
+def status_snapshot() -> dict:
+    """What the dashboard shows; sent with every change event"""
+    return {
+        "status": "online",
+        "connected_processes": len(connected_processes),
+        "automation_active": automation.active,
+        "scan_jobs_running": scan_jobs.running,
+    }
+
+def publish_change(event_type: str, **data):
+    """Publish a change event followed by the updated status"""
+    events.publish(event_type, **data)
+    events.publish("status", **status_snapshot())
+
+def region_map(pid: int, max_age: float = 0.0) -> RegionMap:
+    """Memory map of a process, cached on its handle while it is connected"""
+    handle = connected_processes.get(pid)
+    regions = handle.regions if handle is not None else RegionMap(pid)
+    return regions.refresh(max_age)
+
+scan_sessions = ScanSessionStore()
+scan_jobs = ScanJobStore()
+modules = ModuleCache(maps=lambda pid: region_map(pid).regions)
+signature_cache = SignatureCache()
+freezer = FreezeEngine()
+collection_versions = CollectionVersions()
+# Bookkeeping writes; listing ETags change once a flush has applied them
+writes = WriteBehindQueue(on_flush=collection_versions.bump)
+events = EventBus()
+scanner = ParallelScanner(workers=int(os.environ.get("SCAN_WORKERS", "0")) or None)
+time_series = TimeSeriesStore()
+
+PROCESS_METRICS = ("cpu_percent", "rss", "num_threads")
+
+def record_process_sample(pid: int, sample: dict):
+    """Keep the telemetry samples sent to monitor clients as time series"""
+    series = time_series.series_ids(f"process:{pid}:{metric}" for metric in PROCESS_METRICS)
+    time_series.record(series, [sample["cpu_percent"], sample["memory_info"]["rss"], sample["num_threads"]])
+
+def connected_process(pid: int) -> Optional[psutil.Process]:
+    """psutil handle kept for a connected process; None when it is not connected"""
+    handle = connected_processes.get(pid)
+    return handle.process if handle is not None else None
+
+telemetry = TelemetryHub(process=connected_process, on_sample=record_process_sample)
+
+# Process matcher config lives in this JSON file when set, otherwise in Mongo
+matcher_file = MatcherConfigFile(os.environ["PROCESS_MATCHER_FILE"]) if os.environ.get("PROCESS_MATCHER_FILE") else None
+discovery = ProcessDiscovery(
+    matcher=ProcessMatcher(),
+    interval=float(os.environ.get("PROCESS_DISCOVERY_INTERVAL", DISCOVERY_INTERVAL)),
+)
+discovery_lock = asyncio.Lock()
+discovery_task: Optional[asyncio.Task] = None
+time_series_task: Optional[asyncio.Task] = None
 
 # Models
 class GameProcess(BaseModel):
@@ -51,13 +140,20 @@ class GameProcess(BaseModel):
     status: str = "detected"
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class PointerChainModel(BaseModel):
+    module: Optional[str] = None  # module file name or path; None for an absolute base
+    base_offset: Union[int, str] = 0
+    offsets: List[Union[int, str]] = []
+
 class MemoryAddress(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     process_id: str
-    address: str
+    address: Optional[str] = None
+    pointer_chain: Optional[PointerChainModel] = None  # survives restarts, unlike address
     value: Any
     data_type: str  # int, float, string, bytes
     description: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AutomationScript(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -76,98 +172,618 @@ class HackingSession(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Game Process Management
+def discovery_operations(changes: DiscoveryChanges) -> List[UpdateOne]:
+    """Turn one discovery pass into game_processes upserts and exit markers"""
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"pid": process.pid},
+            {
+                "$set": {"name": process.name, "pid": process.pid, "exe_path": process.exe_path, "status": "detected"},
+                "$setOnInsert": {"id": process.id, "created_at": process.detected_at},
+            },
+            upsert=True
+        )
+        for process in changes.added
+    ]
+    added = {process.pid for process in changes.added}
+    operations.extend(
+        UpdateOne({"pid": process.pid}, {"$set": {"status": "exited", "exited_at": now}})
+        for process in changes.removed if process.pid not in added
+    )
+    return operations
+
+def publish_discovery(changes: DiscoveryChanges):
+    if changes.added:
+        events.publish("process.detected", processes=[
+            {"pid": process.pid, "name": process.name, "exe_path": process.exe_path} for process in changes.added
+        ])
+    if changes.removed:
+        events.publish("process.exited", pids=[process.pid for process in changes.removed])
+
+async def refresh_processes() -> DiscoveryChanges:
+    """Run one discovery pass off the event loop and persist what changed"""
+    async with discovery_lock:
+        changes = await asyncio.to_thread(discovery.refresh)
+        if changes:
+            await writes.put_many("game_processes", discovery_operations(changes))
+            publish_discovery(changes)
+        return changes
+
+async def load_matcher_config() -> Optional[MatcherConfig]:
+    """Read the stored matcher config; None when it is missing or unchanged"""
+    if matcher_file is not None:
+        return await asyncio.to_thread(matcher_file.load_if_changed)
+    stored = await db.settings.find_one({"key": "process_matcher"}, {"_id": 0, "key": 0, "updated_at": 0})
+    return MatcherConfig.from_dict(stored) if stored is not None else None
+
+async def apply_matcher_config(config: MatcherConfig) -> DiscoveryChanges:
+    """Compile ``config`` and re-match the cached processes against it"""
+    matcher = ProcessMatcher(config)
+    async with discovery_lock:
+        changes = await asyncio.to_thread(discovery.set_matcher, matcher)
+        if changes:
+            await writes.put_many("game_processes", discovery_operations(changes))
+            publish_discovery(changes)
+        return changes
+
+async def run_process_discovery():
+    deadline = time.monotonic()
+    while True:
+        # A bad config must not stop discovery; keep the last good matcher
+        try:
+            config = await load_matcher_config()
+            if config is not None and config != discovery.matcher.config:
+                await apply_matcher_config(config)
+                logger.info(f"Reloaded process matcher: {config.to_dict()}")
+        except Exception as e:
+            logger.error(f"Process matcher reload failed: {str(e)}")
+        try:
+            await refresh_processes()
+        except Exception as e:
+            logger.error(f"Process discovery failed: {str(e)}")
+        deadline = max(deadline + discovery.interval, time.monotonic())
+        await asyncio.sleep(deadline - time.monotonic())
+
+class ProcessMatcherSettings(BaseModel):
+    keywords: List[str]
+    patterns: List[str] = []
+    fields: List[str] = ["name"]  # any of name, exe, cmdline
+
 @api_router.get("/processes", response_model=List[GameProcess])
-async def get_game_processes():
-    """Detect running game processes"""
+async def get_game_processes(refresh: bool = False):
+    """Detected game processes, served from the discovery cache"""
     try:
-        processes = []
-        game_keywords = ["game", "unity", "unreal", "kingshot", "steam", "battle", "rpg", "mmo"]
-        
-        for proc in psutil.process_iter(['pid', 'name', 'exe']):
-            try:
-                proc_info = proc.info
-                if proc_info['name'] and any(keyword.lower() in proc_info['name'].lower() for keyword in game_keywords):
-                    game_proc = GameProcess(
-                        name=proc_info['name'],
-                        pid=proc_info['pid'],
-                        exe_path=proc_info['exe'] or "Unknown"
-                    )
-                    processes.append(game_proc)
-                    
-                    # Store in database
-                    await db.game_processes.update_one(
-                        {"pid": proc_info['pid']},
-                        {"$set": game_proc.dict()},
-                        upsert=True
-                    )
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-                
-        return processes
+        if refresh or discovery.refreshed_at is None:
+            await refresh_processes()
+        return [
+            GameProcess(
+                id=process.id,
+                name=process.name,
+                pid=process.pid,
+                exe_path=process.exe_path,
+                status="connected" if process.pid in connected_processes else "detected",
+                created_at=process.detected_at
+            )
+            for process in discovery.matches()
+        ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error detecting processes: {str(e)}")
 
+@api_router.get("/processes/matcher")
+async def get_process_matcher():
+    """Get the keywords and patterns used to detect game processes"""
+    return {**discovery.matcher.config.to_dict(), "available_fields": list(MATCH_FIELDS),
+            "source": "file" if matcher_file is not None else "database"}
+
+@api_router.put("/processes/matcher")
+async def update_process_matcher(settings: ProcessMatcherSettings):
+    """Replace the process matcher config and re-match the cached processes"""
+    try:
+        config = MatcherConfig.from_dict(settings.dict())
+        changes = await apply_matcher_config(config)
+        if matcher_file is not None:
+            await asyncio.to_thread(matcher_file.save, config)
+        else:
+            await db.settings.update_one(
+                {"key": "process_matcher"},
+                {"$set": {**config.to_dict(), "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        return {**await get_process_matcher(), "added": len(changes.added), "removed": len(changes.removed)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Matcher update error: {str(e)}")
+
 @api_router.post("/processes/{pid}/connect")
 async def connect_to_process(pid: int):
     """Connect to a specific game process"""
     try:
-        # Check if process exists
-        if not psutil.pid_exists(pid):
+        try:
+            handle = connected_processes.connect(pid)
+            proc = handle.process
+            process_info = {
+                "pid": pid,
+                "name": handle.name,
+                "status": "connected",
+                "memory_info": proc.memory_info()._asdict(),
+                "cpu_percent": proc.cpu_percent()
+            }
+        except (ProcessLookupError, psutil.NoSuchProcess):
             raise HTTPException(status_code=404, detail="Process not found")
-        
-        proc = psutil.Process(pid)
-        process_info = {
-            "pid": pid,
-            "name": proc.name(),
-            "status": "connected",
-            "memory_info": proc.memory_info()._asdict(),
-            "cpu_percent": proc.cpu_percent()
-        }
-        
-        connected_processes[pid] = process_info
+
+        publish_change("process.connected", pid=pid, name=process_info["name"])
         
         # Update database
-        await db.game_processes.update_one(
+        await writes.put("game_processes", UpdateOne(
             {"pid": pid},
             {"$set": {"status": "connected", "connected_at": datetime.utcnow()}},
             upsert=True
-        )
+        ))
         
         return {"message": f"Successfully connected to process {pid}", "process_info": process_info}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error connecting to process: {str(e)}")
 
+@api_router.post("/processes/{pid}/disconnect")
+async def disconnect_from_process(pid: int):
+    """Close the handles of a connected process and drop what was cached for it"""
+    handle = connected_processes.disconnect(pid)
+    if handle is None:
+        raise HTTPException(status_code=400, detail="Process not connected")
+    release_process(handle, "disconnected")
+    await writes.put("game_processes", UpdateOne({"pid": pid}, {"$set": {"status": "disconnected"}}))
+    return {"message": f"Disconnected from process {pid}"}
+
+@api_router.get("/processes/connected")
+async def list_connected_processes():
+    """Connected processes with the state of their pooled handles"""
+    return {"processes": [handle.info() for handle in connected_processes.handles()], "exits": connected_processes.exits}
+
+@api_router.get("/processes/{pid}/regions")
+async def get_process_regions(pid: int, perms: str = "r", module: Optional[str] = None,
+                              min_size: int = 0, max_size: Optional[int] = None, limit: int = 1000):
+    """Memory map of a process, filtered by permissions, module and size"""
+    try:
+        regions = region_map(pid)
+        selected = regions.select(perms, module=module, min_size=min_size, max_size=max_size, scannable=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Process not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Region map error: {str(e)}")
+    return {
+        **regions.stats(),
+        "count": len(selected),
+        "regions": [
+            {"start": hex(region.start), "end": hex(region.end), "perms": region.perms, "path": region.path}
+            for region in selected[:max(limit, 0)]
+        ],
+    }
+
 # Memory Scanning and Editing
+class MemoryScanRequest(BaseModel):
+    pid: int
+    value: Optional[Any] = None
+    data_type: str = "int"  # int8/16/32/64, float32/64, int, float, double, string, bytes
+    mode: str = "exact"  # "exact" value scan or "unknown" initial value (snapshot of writable regions)
+    aligned: bool = True
+    tolerance: float = 0.0
+    writable_only: bool = False
+    module: Optional[str] = None  # only scan the mappings of this module (path or file name)
+    min_region_size: int = 0
+    max_region_size: Optional[int] = None
+    resident_only: bool = False  # skip pages that are not present in anonymous regions
+    max_results: int = 1000  # addresses returned in the response body
+    encoding: str = "list"  # "list" of integers or "base64" packed little-endian uint64
+
+def encode_addresses(addresses, encoding: str = "list"):
+    """Encode a uint64 address array compactly for a JSON response"""
+    if encoding == "base64":
+        return base64.b64encode(addresses.astype("<u8").tobytes()).decode("ascii")
+    return addresses.tolist()
+
+def scan_regions(request: MemoryScanRequest, writable_only: bool):
+    """Regions of the target selected by the request's module and size filters"""
+    return region_map(request.pid).select(
+        "rw" if writable_only else "r",
+        module=request.module,
+        min_size=request.min_region_size,
+        max_size=request.max_region_size,
+    )
+
+async def run_scan(request: MemoryScanRequest):
+    """Compile the search value and scan the readable regions of the target on the worker pool"""
+    if request.value is None:
+        raise HTTPException(status_code=400, detail="A value is required for exact scans")
+    try:
+        pattern = compile_pattern(request.value, request.data_type, request.tolerance)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    regions = scan_regions(request, writable_only=request.writable_only)
+    return pattern, await scanner.scan(request.pid, regions, pattern, aligned=request.aligned,
+                                       resident_only=request.resident_only)
+
+def scan_timing(result):
+    """Per-scan timing fields shared by the scan endpoints"""
+    return {
+        "bytes_scanned": result.bytes_scanned,
+        "bytes_skipped": result.bytes_skipped,
+        "regions_scanned": result.regions_scanned,
+        "elapsed_ms": round(result.elapsed * 1000, 3),
+        "worker_time_ms": round(result.worker_time * 1000, 3),
+        "throughput_gbps": round(result.throughput, 3),
+        "workers": result.workers,
+        "tasks": result.tasks,
+    }
+
+async def save_scan_result(pid: int, request: MemoryScanRequest, addresses) -> str:
+    """Store every match of a scan as compressed address chunks plus a summary document
+
+    Only the newest ``MAX_STORED_RESULTS`` results of a process are kept;
+    older ones are dropped through the write-behind queue, and Mongo
+    expires any result after ``RESULT_TTL`` seconds.
+    """
+    result_id = str(uuid.uuid4())
+    created_at = datetime.utcnow()
+    chunks = await asyncio.to_thread(result_chunks, result_id, addresses, str(pid), created_at)
+    if chunks:
+        await db.scan_result_chunks.insert_many(chunks, ordered=False)
+    await db.scan_results.insert_one({
+        "id": result_id,
+        "process_id": str(pid),
+        "value": request.value,
+        "data_type": request.data_type,
+        "count": int(addresses.size),
+        "chunks": len(chunks),
+        "created_at": created_at,
+    })
+    stale = await db.scan_results.find({"process_id": str(pid)}, {"id": 1}).sort(
+        "created_at", DESCENDING).skip(MAX_STORED_RESULTS).to_list(None)
+    if stale:
+        await drop_scan_results(pid, [result["id"] for result in stale])
+    return result_id
+
+async def drop_scan_results(pid: int, result_ids: Optional[List[str]] = None):
+    """Queue the deletion of stored scan results of ``pid`` (all of them by default) and their chunks"""
+    if result_ids is None:
+        chunks = summaries = {"process_id": str(pid)}
+    else:
+        chunks, summaries = {"result_id": {"$in": result_ids}}, {"id": {"$in": result_ids}}
+    await writes.put("scan_result_chunks", DeleteMany(chunks))
+    await writes.put("scan_results", DeleteMany(summaries))
+
 @api_router.post("/memory/scan")
-async def scan_memory(pid: int, value: Any, data_type: str = "int"):
+async def scan_memory(request: MemoryScanRequest):
     """Scan process memory for specific values"""
+    pid = request.pid
+    if request.mode == "unknown":
+        return await create_scan_session(request)
     try:
         if pid not in connected_processes:
             raise HTTPException(status_code=400, detail="Process not connected")
-        
-        # This is a simplified memory scanning - in real implementation,
-        # you'd use libraries like pymem for actual memory manipulation
-        results = []
-        
-        # Simulate memory scanning results
-        for i in range(5):
-            address = f"0x{hex(0x1000000 + i * 0x1000)[2:].upper()}"
-            mem_addr = MemoryAddress(
-                process_id=str(pid),
-                address=address,
-                value=value,
-                data_type=data_type,
-                description=f"Memory location {i+1}"
-            )
-            results.append(mem_addr)
-            
-            # Store in database
-            await db.memory_addresses.insert_one(mem_addr.dict())
-        
-        return {"message": f"Found {len(results)} memory addresses", "addresses": results}
+        if request.encoding not in ("list", "base64"):
+            raise HTTPException(status_code=400, detail=f"Unsupported encoding: {request.encoding}")
+
+        pattern, result = await run_scan(request)
+
+        returned = result.addresses[:max(request.max_results, 0)]
+        result_id = await save_scan_result(pid, request, result.addresses)
+
+        # Store the first matches so they show up in the memory history
+        recorded = returned[:MAX_HISTORY_RECORDS]
+        if recorded.size:
+            await writes.put_many("memory_addresses", [
+                InsertOne(MemoryAddress(
+                    process_id=str(pid),
+                    address=format_address(address),
+                    value=request.value,
+                    data_type=request.data_type,
+                    description=f"Scan match {index + 1}"
+                ).dict())
+                for index, address in enumerate(recorded.tolist())
+            ])
+
+        return {
+            "message": f"Found {result.count} memory addresses",
+            "result_id": result_id,
+            "count": result.count,
+            "truncated": result.count > returned.size,
+            "encoding": request.encoding,
+            "addresses": encode_addresses(returned, request.encoding),
+            **scan_timing(result),
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Memory scan error: {str(e)}")
 
+@api_router.get("/memory/scan-results/{result_id}")
+async def get_scan_result(result_id: str, offset: int = 0, limit: int = 1000, encoding: str = "list"):
+    """Page through every address a stored scan found"""
+    if encoding not in ("list", "base64"):
+        raise HTTPException(status_code=400, detail=f"Unsupported encoding: {encoding}")
+    summary = await db.scan_results.find_one({"id": result_id}, {"_id": 0})
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Scan result not found")
+    offset, limit = max(offset, 0), max(limit, 0)
+    first, last = chunk_range(offset, limit)
+    chunks = await db.scan_result_chunks.find(
+        {"result_id": result_id, "index": {"$gte": first, "$lte": last}}
+    ).sort("index", ASCENDING).to_list(None)
+    addresses = await asyncio.to_thread(read_chunks, chunks, offset, limit)
+    return {
+        **summary,
+        "offset": offset,
+        "encoding": encoding,
+        "addresses": encode_addresses(addresses, encoding),
+    }
+
+@api_router.delete("/memory/scan-results/{result_id}")
+async def delete_scan_result(result_id: str):
+    deleted = await db.scan_results.delete_one({"id": result_id})
+    if not deleted.deleted_count:
+        raise HTTPException(status_code=404, detail="Scan result not found")
+    await db.scan_result_chunks.delete_many({"result_id": result_id})
+    return {"message": f"Scan result {result_id} deleted"}
+
+# Background scan jobs
+async def run_scan_job(job: ScanJob, request: MemoryScanRequest):
+    """Drive a scan job to its end, then store its hits if it completed"""
+    await job.collect(on_progress=lambda running: events.publish("scan_job.progress", **running.status()))
+    if job.state == "completed":
+        try:
+            job.result_id = await save_scan_result(job.pid, request, job.page(0, job.hits))
+        except Exception as e:
+            logger.warning(f"Could not store the result of scan job {job.id}: {e}")
+    publish_change("scan_job.finished", **job.status())
+
+def get_scan_job(job_id: str) -> ScanJob:
+    job = scan_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return job
+
+@api_router.post("/memory/scan-jobs")
+async def create_scan_job(request: MemoryScanRequest):
+    """Start an exact value scan in the background and return its job id right away"""
+    if request.mode != "exact":
+        raise HTTPException(status_code=400, detail="Scan jobs only support exact scans")
+    if request.pid not in connected_processes:
+        raise HTTPException(status_code=400, detail="Process not connected")
+    if request.value is None:
+        raise HTTPException(status_code=400, detail="A value is required for exact scans")
+    try:
+        pattern = compile_pattern(request.value, request.data_type, request.tolerance)
+        regions = scan_regions(request, writable_only=request.writable_only)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Process not found")
+    try:
+        job = ScanJob(request.pid, request.value, request.data_type)
+        job.start(scanner, regions, pattern, aligned=request.aligned, resident_only=request.resident_only)
+        scan_jobs.add(job)
+        job.task = asyncio.create_task(run_scan_job(job, request))
+        publish_change("scan_job.started", **job.status())
+        return job.status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Scan job error: {str(e)}")
+
+@api_router.get("/memory/scan-jobs")
+async def list_scan_jobs():
+    return {"jobs": [job.status() for job in scan_jobs.list()]}
+
+@api_router.get("/memory/scan-jobs/{job_id}")
+async def get_scan_job_status(job_id: str):
+    """Progress of a scan job: bytes done out of total and hits found so far"""
+    return get_scan_job(job_id).status()
+
+@api_router.get("/memory/scan-jobs/{job_id}/results")
+async def get_scan_job_results(job_id: str, offset: int = 0, limit: int = 1000,
+                               encoding: str = "list", format: str = "json"):
+    """Page through the hits of a scan job, or stream them as NDJSON with ``format=ndjson``
+
+    Hits become readable in address order while the job runs; ``available``
+    tells how many can be read now. The NDJSON stream waits for the rest
+    and ends when the job does.
+    """
+    job = get_scan_job(job_id)
+    offset = max(offset, 0)
+    if format == "ndjson":
+        async def lines():
+            async for block in job.stream(offset):
+                yield "".join(f'{{"address":{address}}}\n' for address in block.tolist())
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    if format != "json":
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if encoding not in ("list", "base64"):
+        raise HTTPException(status_code=400, detail=f"Unsupported encoding: {encoding}")
+    addresses = job.page(offset, max(limit, 0))
+    status = job.status()
+    return {
+        "id": job.id,
+        "state": status["state"],
+        "hits": status["hits"],
+        "available": status["available"],
+        "complete": not job.running and offset + addresses.size >= status["available"],
+        "offset": offset,
+        "next_offset": offset + int(addresses.size),
+        "count": int(addresses.size),
+        "encoding": encoding,
+        "addresses": encode_addresses(addresses, encoding),
+    }
+
+@api_router.post("/memory/scan-jobs/{job_id}/cancel")
+async def cancel_scan_job(job_id: str):
+    """Stop a running scan job; hits found before it stopped stay readable"""
+    job = get_scan_job(job_id)
+    if not job.cancel():
+        raise HTTPException(status_code=400, detail=f"Scan job already {job.state}")
+    return job.status()
+
+@api_router.delete("/memory/scan-jobs/{job_id}")
+async def delete_scan_job(job_id: str):
+    """Cancel a scan job if it is still running and forget it"""
+    if scan_jobs.remove(job_id) is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return {"message": f"Scan job {job_id} deleted"}
+
+# Incremental scan sessions
+class NextScanRequest(BaseModel):
+    comparison: str = "equal"  # equal, changed, unchanged, increased, decreased, in_range
+    value: Optional[Any] = None
+    value_max: Optional[Any] = None  # upper bound for in_range
+    max_results: int = 1000
+    encoding: str = "list"
+
+def encode_values(values):
+    """Convert a session value snapshot to JSON-friendly values"""
+    if values.dtype.kind == "V":
+        return [bytes(value).hex() for value in values]
+    return values.tolist()
+
+def session_summary(session: ScanSession, max_results: int = 1000, encoding: str = "list"):
+    if encoding not in ("list", "base64"):
+        raise HTTPException(status_code=400, detail=f"Unsupported encoding: {encoding}")
+    addresses, values = session.page(0, max(max_results, 0))
+    return {
+        "session_id": session.id,
+        "pid": session.pid,
+        "data_type": session.data_type,
+        "mode": session.mode,
+        "scans": session.scans,
+        "count": session.count,
+        "truncated": session.count > addresses.size,
+        "encoding": encoding,
+        "addresses": encode_addresses(addresses, encoding),
+        "values": encode_values(values),
+    }
+
+def get_scan_session(session_id: str) -> ScanSession:
+    session = scan_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Scan session not found")
+    return session
+
+@api_router.post("/memory/scan-sessions")
+async def create_scan_session(request: MemoryScanRequest):
+    """Run a first scan and keep its candidate set server-side"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+
+        if request.mode == "unknown":
+            return await create_snapshot_session(request)
+        if request.mode != "exact":
+            raise HTTPException(status_code=400, detail=f"Unsupported scan mode: {request.mode}")
+
+        pattern, result = await run_scan(request)
+        with connected_processes.memory(request.pid) as memory:
+            session = scan_sessions.add(await asyncio.to_thread(ScanSession.from_scan, memory, pattern, result))
+
+        return {
+            "message": f"Found {session.count} memory addresses",
+            **session_summary(session, request.max_results, request.encoding),
+            **scan_timing(result),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Memory scan error: {str(e)}")
+
+async def create_snapshot_session(request: MemoryScanRequest):
+    """Snapshot the writable regions of the target for an unknown initial value scan"""
+    try:
+        resolve_dtype(request.data_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started = time.perf_counter()
+    regions = scan_regions(request, writable_only=True)
+    with connected_processes.memory(request.pid) as memory:
+        session = scan_sessions.add(
+            await asyncio.to_thread(SnapshotSession.capture, memory, request.data_type, regions)
+        )
+    return {
+        "message": f"Captured {session.snapshot.size} bytes, {session.count} candidates",
+        **session_summary(session, request.max_results, request.encoding),
+        "bytes_scanned": session.snapshot.size,
+        "regions_scanned": len(session.snapshot.regions),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+@api_router.post("/memory/scan-sessions/{session_id}/next")
+async def next_scan(session_id: str, request: NextScanRequest):
+    """Narrow a scan session by re-reading only its candidate addresses"""
+    try:
+        session = get_scan_session(session_id)
+        try:
+            with connected_processes.memory(session.pid) as memory:
+                narrowed = await asyncio.to_thread(
+                    session.next_scan, memory, request.comparison, request.value, request.value_max
+                )
+        except ProcessLookupError:
+            raise HTTPException(status_code=400, detail="Process not connected")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "message": f"{narrowed.count} of {narrowed.previous_count} addresses left",
+            **session_summary(session, request.max_results, request.encoding),
+            "previous_count": narrowed.previous_count,
+            "unreadable": narrowed.unreadable,
+            "elapsed_ms": round(narrowed.elapsed * 1000, 3),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Next scan error: {str(e)}")
+
+@api_router.get("/memory/scan-sessions/{session_id}")
+async def get_scan_session_results(session_id: str, offset: int = 0, limit: int = 1000):
+    """Page through the candidates of a scan session"""
+    session = get_scan_session(session_id)
+    addresses, values = session.page(max(offset, 0), max(limit, 0))
+    return {
+        "session_id": session.id,
+        "count": session.count,
+        "offset": offset,
+        "addresses": addresses.tolist(),
+        "values": encode_values(values),
+    }
+
+@api_router.delete("/memory/scan-sessions/{session_id}")
+async def delete_scan_session(session_id: str):
+    """Discard a scan session"""
+    if scan_sessions.remove(session_id) is None:
+        raise HTTPException(status_code=404, detail="Scan session not found")
+    return {"message": f"Scan session {session_id} deleted"}
+
+# Scanner settings
+class ScannerSettings(BaseModel):
+    workers: Optional[int] = None
+    task_size: Optional[int] = None  # bytes per pool task
+
+@api_router.get("/memory/scanner")
+async def get_scanner_settings():
+    """Get the memory scanner worker pool settings"""
+    return {"workers": scanner.workers, "task_size": scanner.task_size, "chunk_size": scanner.chunk_size,
+            "pool_resets": scanner.resets}
+
+@api_router.put("/memory/scanner")
+async def update_scanner_settings(settings: ScannerSettings):
+    """Change the memory scanner worker count or task size"""
+    try:
+        scanner.configure(workers=settings.workers, task_size=settings.task_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await get_scanner_settings()
+
 @api_router.post("/memory/edit")
 async def edit_memory(pid: int, address: str, new_value: Any, data_type: str = "int"):
     """Edit memory at specific address"""
@@ -175,94 +791,458 @@ async def edit_memory(pid: int, address: str, new_value: Any, data_type: str = "
         if pid not in connected_processes:
             raise HTTPException(status_code=400, detail="Process not connected")
         
-        # Simulate memory editing
-        # In real implementation, use pymem to write to memory
-        success = True  # Simulate successful edit
+        try:
+            payload = encode_value(new_value, data_type)
+            target = parse_address(address)
+            with connected_processes.memory(pid, writable=True) as memory:
+                (success,), _ = await asyncio.to_thread(write_batch, memory, [target], [payload])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         if success:
-            # Update database record
-            await db.memory_addresses.update_one(
-                {"process_id": str(pid), "address": address},
+            # Update database record (indexed on process_id, address)
+            await writes.put("memory_addresses", UpdateOne(
+                {"process_id": str(pid), "address": format_address(target)},
                 {"$set": {"value": new_value, "updated_at": datetime.utcnow()}}
-            )
+            ))
             
             return {"message": f"Successfully updated memory at {address} to {new_value}"}
         else:
             raise HTTPException(status_code=500, detail="Failed to edit memory")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Memory edit error: {str(e)}")
 
+# Batched memory access
+class MemoryEntry(BaseModel):
+    address: Union[int, str]  # integer or hex string
+    data_type: str = "int"
+    size: Optional[int] = None  # byte length for string/bytes entries
+
+class MemoryWriteEntry(BaseModel):
+    address: Union[int, str]
+    data_type: str = "int"
+    value: Any
+
+class BatchReadRequest(BaseModel):
+    pid: int
+    entries: List[MemoryEntry]
+
+class BatchWriteRequest(BaseModel):
+    pid: int
+    entries: List[MemoryWriteEntry]
+
+@api_router.post("/memory/read-batch")
+async def read_memory_batch(request: BatchReadRequest):
+    """Read many typed values with page-coalesced reads"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+
+        started = time.perf_counter()
+        try:
+            addresses = [parse_address(entry.address) for entry in request.entries]
+            with connected_processes.memory(request.pid) as memory:
+                values, valid = await asyncio.to_thread(
+                    read_batch,
+                    memory,
+                    addresses,
+                    [entry.data_type for entry in request.entries],
+                    [entry.size for entry in request.entries],
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "count": len(values),
+            "values": values,
+            "valid": valid,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch read error: {str(e)}")
+
+@api_router.post("/memory/write-batch")
+async def write_memory_batch(request: BatchWriteRequest):
+    """Write many typed values, merging adjacent entries into vectored writes"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+
+        started = time.perf_counter()
+        try:
+            addresses = [parse_address(entry.address) for entry in request.entries]
+            payloads = [encode_value(entry.value, entry.data_type) for entry in request.entries]
+            with connected_processes.memory(request.pid, writable=True) as memory:
+                ok, syscalls = await asyncio.to_thread(write_batch, memory, addresses, payloads)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "written": sum(ok),
+            "failed": [index for index, success in enumerate(ok) if not success],
+            "syscalls": syscalls,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch write error: {str(e)}")
+
+# Frozen values
+class FreezeRequest(BaseModel):
+    pid: int
+    entries: List[MemoryWriteEntry]
+    rate: Optional[float] = None  # writes per second, defaults to 20
+
+class FreezeSettings(BaseModel):
+    rate: float
+
+@api_router.post("/memory/freeze")
+async def freeze_memory(request: FreezeRequest):
+    """Keep values fixed by re-writing them on every tick of the freeze writer"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+        try:
+            values = [FrozenValue.from_request(entry.dict()) for entry in request.entries]
+            freeze_list = freezer.freeze(connected_processes.handle(request.pid), values, request.rate)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ProcessLookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return freeze_list.status()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Freeze error: {str(e)}")
+
+@api_router.get("/memory/freeze")
+async def list_frozen_values():
+    """Freeze lists of all processes with their write latency and missed deadlines"""
+    return freezer.lists()
+
+@api_router.get("/memory/freeze/{pid}")
+async def get_frozen_values(pid: int):
+    freeze_list = freezer.get(pid)
+    if freeze_list is None:
+        raise HTTPException(status_code=404, detail="No values frozen for this process")
+    return freeze_list.status()
+
+@api_router.put("/memory/freeze/{pid}")
+async def update_freeze_settings(pid: int, settings: FreezeSettings):
+    """Change how often the values of one process are re-written"""
+    freeze_list = freezer.get(pid)
+    if freeze_list is None:
+        raise HTTPException(status_code=404, detail="No values frozen for this process")
+    try:
+        return freezer.freeze(freeze_list.handle, [], settings.rate).status()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@api_router.delete("/memory/freeze/{pid}")
+async def unfreeze_memory(pid: int, address: Optional[str] = None):
+    """Unfreeze one address, or every value of the process"""
+    try:
+        addresses = None if address is None else [parse_address(address)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"unfrozen": freezer.unfreeze(pid, addresses)}
+
+class PointerResolveRequest(BaseModel):
+    pid: int
+    chains: List[PointerChainModel] = []
+    process_id: Optional[str] = None  # also resolve the chains stored for this process
+    data_type: Optional[str] = None  # read the value behind each resolved address
+    size: Optional[int] = None  # byte size for string/bytes values
+    pointer_size: int = 8
+
+@api_router.post("/memory/addresses")
+async def save_memory_address(record: MemoryAddress):
+    """Store an address or a pointer chain"""
+    if record.address is None and record.pointer_chain is None:
+        raise HTTPException(status_code=400, detail="Either address or pointer_chain is required")
+    try:
+        if record.pointer_chain is not None:
+            PointerChain.from_dict(record.pointer_chain.dict())
+        if record.address is not None:
+            record.address = format_address(parse_address(record.address))
+        await db.memory_addresses.insert_one(record.dict())
+        collection_versions.bump("memory_addresses")
+        return {"message": "Address saved", "id": record.id}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Address save error: {str(e)}")
+
+@api_router.post("/memory/pointer-chains/resolve")
+async def resolve_pointer_chains(request: PointerResolveRequest):
+    """Resolve pointer chains against the current process, one read round per level"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+        if request.pointer_size not in (4, 8):
+            raise HTTPException(status_code=400, detail="pointer_size must be 4 or 8")
+
+        started = time.perf_counter()
+        records = [{"id": None, "pointer_chain": chain.dict()} for chain in request.chains]
+        if request.process_id is not None:
+            records += await db.memory_addresses.find(
+                {"process_id": request.process_id, "pointer_chain": {"$ne": None}},
+                {"_id": 0, "id": 1, "pointer_chain": 1}
+            ).to_list(10000)
+
+        try:
+            chains = [PointerChain.from_dict(record["pointer_chain"]) for record in records]
+            with connected_processes.memory(request.pid) as memory:
+                addresses = await asyncio.to_thread(resolve_chains, memory, modules, chains, request.pointer_size)
+                values = [None] * len(chains)
+                resolved = [i for i, address in enumerate(addresses) if address is not None]
+                if request.data_type and resolved:
+                    read, _ = await asyncio.to_thread(
+                        read_batch,
+                        memory,
+                        [addresses[i] for i in resolved],
+                        [request.data_type] * len(resolved),
+                        [request.size] * len(resolved),
+                    )
+                    for i, value in zip(resolved, read):
+                        values[i] = value
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "results": [
+                {
+                    "id": record["id"],
+                    "chain": str(chain),
+                    "address": hex(address) if address is not None else None,
+                    "value": value,
+                }
+                for record, chain, address, value in zip(records, chains, addresses, values)
+            ],
+            "resolved": len(resolved),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    except HTTPException:
+        raise
+    except ProcessLookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Pointer resolve error: {str(e)}")
+
+class PointerMapRequest(BaseModel):
+    pid: int
+    pointer_size: int = 8
+
+class PointerMapTarget(BaseModel):
+    map_id: str
+    target: Union[int, str]
+
+class PointerScanRequest(BaseModel):
+    map_id: str
+    target: Union[int, str]  # address of the value in the run the map was taken from
+    max_depth: int = DEFAULT_MAX_DEPTH
+    max_offset: int = DEFAULT_MAX_OFFSET
+    max_results: int = DEFAULT_MAX_RESULTS
+    intersect: List[PointerMapTarget] = []  # keep only paths that also hold in these runs
+
+@api_router.post("/memory/pointer-maps")
+async def create_pointer_map(request: PointerMapRequest):
+    """Index every pointer of a process and save the map to disk"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+        if request.pointer_size not in (4, 8):
+            raise HTTPException(status_code=400, detail="pointer_size must be 4 or 8")
+        with connected_processes.memory(request.pid) as memory:
+            pointer_map = await asyncio.to_thread(PointerMap.build, memory, request.pointer_size,
+                                                  regions=region_map(request.pid).select())
+        await asyncio.to_thread(pointer_map.save)
+        return {**pointer_map.meta, "modules": len({static.module for static in pointer_map.statics})}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Pointer map error: {str(e)}")
+
+@api_router.delete("/memory/pointer-maps/{map_id}")
+async def delete_pointer_map(map_id: str):
+    """Delete a saved pointer map"""
+    path = os.path.join(pointer_map_dir(), os.path.basename(map_id))
+    if not os.path.isdir(path):
+        raise HTTPException(status_code=404, detail="Pointer map not found")
+    await asyncio.to_thread(shutil.rmtree, path)
+    return {"message": "Pointer map deleted"}
+
+@api_router.post("/memory/pointer-scan")
+async def pointer_scan(request: PointerScanRequest):
+    """Find static pointer paths to an address, optionally confirmed in other runs"""
+    try:
+        started = time.perf_counter()
+        try:
+            pointer_map = await asyncio.to_thread(PointerMap.load, request.map_id)
+            others = [
+                (await asyncio.to_thread(PointerMap.load, other.map_id), parse_address(other.target))
+                for other in request.intersect
+            ]
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Pointer map not found")
+
+        chains = await asyncio.to_thread(
+            pointer_map.scan, parse_address(request.target), request.max_depth, request.max_offset,
+            max_results=request.max_results
+        )
+        found = len(chains)
+        for other_map, other_target in others:
+            chains = await asyncio.to_thread(filter_chains, other_map, chains, other_target)
+
+        return {
+            "count": len(chains),
+            "found": found,
+            "chains": [{**chain.to_dict(), "path": str(chain)} for chain in chains],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Pointer scan error: {str(e)}")
+
+class SignatureScanRequest(BaseModel):
+    pid: int
+    signatures: List[str]  # e.g. "48 8B ?? ?? 89"; ?? matches any byte
+    executable_only: bool = True  # False scans every readable region
+    max_results: int = 1000  # addresses returned per signature
+
+@api_router.post("/memory/signature-scan")
+async def signature_scan(request: SignatureScanRequest):
+    """Search for many wildcard byte signatures in one pass over memory"""
+    try:
+        if request.pid not in connected_processes:
+            raise HTTPException(status_code=400, detail="Process not connected")
+        try:
+            signatures = [compile_signature(text) for text in request.signatures]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not signatures:
+            raise HTTPException(status_code=400, detail="At least one signature is required")
+
+        with connected_processes.memory(request.pid) as memory:
+            result = await asyncio.to_thread(
+                scan_signatures, memory, signatures, request.executable_only, signature_cache,
+                regions=region_map(request.pid).select(),
+            )
+        return {
+            "results": [
+                {
+                    "signature": signature.text,
+                    "count": int(result.hits[signature.text].size),
+                    "addresses": [
+                        {"address": hex(address), "module": result.locate(address)}
+                        for address in result.hits[signature.text][:request.max_results].tolist()
+                    ],
+                }
+                for signature in signatures
+            ],
+            "bytes_scanned": result.bytes_scanned,
+            "regions_scanned": result.regions_scanned,
+            "cached_modules": len(result.cached_modules),
+            "throughput_gbps": round(result.throughput, 3),
+            "elapsed_ms": round(result.elapsed * 1000, 3),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Signature scan error: {str(e)}")
+
 # Automation System
+automation = AutomationEngine(
+    backend=create_backend(os.environ.get("AUTOMATION_BACKEND")),
+    on_finish=lambda run: publish_change("automation.stopped", script_id=run.script_id, name=run.name, finished=True),
+)
+
+class AutomationBackendSettings(BaseModel):
+    backend: str  # pyautogui, log or recorder
+
 @api_router.post("/automation/start")
-async def start_automation(script: AutomationScript):
-    """Start automation script"""
-    global automation_active, automation_thread
-    
+async def start_automation(script: AutomationScript, max_loops: Optional[int] = None):
+    """Start automation script; several scripts can run at once"""
     try:
-        if automation_active:
-            return {"message": "Automation already running"}
+        try:
+            compiled = compile_script(script.actions)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            # Checks and registers the run under the engine lock, before any
+            # await, so concurrent starts of one script cannot both get in
+            automation.start(script.id, script.name, compiled, max_loops)
+        except ValueError:
+            raise HTTPException(status_code=409, detail="Automation already running")
+        publish_change("automation.started", script_id=script.id, name=script.name)
         
         # Store script in database
-        await db.automation_scripts.insert_one(script.dict())
-        
-        automation_active = True
-        automation_thread = threading.Thread(target=run_automation, args=(script.actions,))
-        automation_thread.daemon = True
-        automation_thread.start()
-        
+        await writes.put("automation_scripts", ReplaceOne({"id": script.id}, script.dict(), upsert=True))
         return {"message": "Automation started successfully", "script_id": script.id}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Automation start error: {str(e)}")
 
 @api_router.post("/automation/stop")
-async def stop_automation():
-    """Stop automation script"""
-    global automation_active
-    
+async def stop_automation(script_id: Optional[str] = None):
+    """Stop one automation script, or all of them when no script_id is given"""
     try:
-        automation_active = False
-        return {"message": "Automation stopped"}
+        if script_id is None:
+            stopped = automation.stop_all()
+            if stopped:
+                publish_change("automation.stopped", script_id=None, stopped=stopped)
+            return {"message": "Automation stopped", "stopped": stopped}
+        if not automation.stop(script_id):
+            raise HTTPException(status_code=404, detail="Script not running")
+        publish_change("automation.stopped", script_id=script_id)
+        return {"message": f"Automation {script_id} stopped", "stopped": 1}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Automation stop error: {str(e)}")
 
-def run_automation(actions):
-    """Run automation actions in separate thread"""
-    global automation_active
-    
-    while automation_active:
-        try:
-            for action in actions:
-                if not automation_active:
-                    break
-                    
-                action_type = action.get("type")
-                
-                if GUI_AVAILABLE:
-                    if action_type == "click":
-                        x, y = action.get("x", 100), action.get("y", 100)
-                        pyautogui.click(x, y)
-                    elif action_type == "key":
-                        key = action.get("key", "space")
-                        pyautogui.press(key)
-                    elif action_type == "type":
-                        text = action.get("text", "")
-                        pyautogui.write(text)
-                else:
-                    # Simulate actions in headless mode
-                    logging.info(f"Simulating action: {action_type}")
-                
-                if action_type == "wait":
-                    delay = action.get("duration", 1)
-                    time.sleep(delay)
-                
-                # Small delay between actions
-                time.sleep(0.1)
-                
-        except Exception as e:
-            logging.error(f"Automation error: {str(e)}")
-            
-        # Loop delay
-        time.sleep(1)
+@api_router.get("/automation/runs")
+async def get_automation_runs():
+    """Running and finished automation scripts with their timing statistics"""
+    return automation.runs()
+
+@api_router.get("/automation/backend")
+async def get_automation_backend():
+    """Get the active action backend and the available ones"""
+    return {"backend": automation.backend.name, "available": sorted(BACKENDS), "stats": automation.backend.stats()}
+
+@api_router.put("/automation/backend")
+async def set_automation_backend(settings: AutomationBackendSettings):
+    """Switch the action backend; running scripts continue on the new one"""
+    try:
+        automation.backend = create_backend(settings.backend)
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await get_automation_backend()
+
+@api_router.get("/automation/trace")
+async def get_automation_trace():
+    """Recorded action trace, replayable with automation_backends.py"""
+    if not isinstance(automation.backend, RecordingBackend):
+        raise HTTPException(status_code=400, detail="The recorder backend is not active")
+    return {**automation.backend.to_trace(), "stats": automation.backend.stats()}
+
+@api_router.delete("/automation/trace")
+async def clear_automation_trace():
+    """Clear the recorded action trace"""
+    if not isinstance(automation.backend, RecordingBackend):
+        raise HTTPException(status_code=400, detail="The recorder backend is not active")
+    automation.backend.clear()
+    return {"message": "Trace cleared"}
 
 # Game-specific hacks
 @api_router.post("/hacks/unlimited-resources")
@@ -274,13 +1254,14 @@ async def enable_unlimited_resources(pid: int, resource_type: str):
         
         # Simulate resource hack activation
         hack_session = HackingSession(
-            game_name=connected_processes[pid]["name"],
+            game_name=connected_processes.handle(pid).name,
             process_id=str(pid),
             tools_enabled=["unlimited_resources"],
             status="active"
         )
         
-        await db.hacking_sessions.insert_one(hack_session.dict())
+        await writes.put("hacking_sessions", InsertOne(hack_session.dict()))
+        events.publish("session.created", session=jsonable_encoder(hack_session))
         
         return {"message": f"Unlimited {resource_type} enabled for process {pid}"}
     except Exception as e:
@@ -310,53 +1291,251 @@ async def enable_auto_aim(pid: int, sensitivity: float = 1.0):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Auto-aim error: {str(e)}")
 
+# Time series of watched values and process metrics
+async def flush_time_series():
+    """Store the rollup rows compacted since the last flush as one chunk document per series"""
+    rows = time_series.take_pending()
+    if not rows["t"].size:
+        return
+    try:
+        await db.time_series.insert_many(time_series.chunk_documents(rows), ordered=False)
+    except Exception as e:
+        time_series.requeue(rows)
+        logger.warning(f"Time series flush failed: {str(e)}")
+
+async def run_time_series():
+    """Compact the raw samples every second and flush the rollups in the background"""
+    deadline = flushed = time.monotonic()
+    while True:
+        try:
+            await asyncio.to_thread(time_series.compact)
+            if time.monotonic() - flushed >= TIME_SERIES_FLUSH_INTERVAL:
+                flushed = time.monotonic()
+                await flush_time_series()
+        except Exception as e:
+            logger.error(f"Time series compaction failed: {str(e)}")
+        deadline = max(deadline + time_series.resolution, time.monotonic())
+        await asyncio.sleep(deadline - time.monotonic())
+
+@api_router.get("/time-series")
+async def list_time_series():
+    """Known series with the raw samples held for each"""
+    return {"stats": time_series.stats(), "series": time_series.series()}
+
+@api_router.get("/time-series/query")
+async def query_time_series(key: str, start: Optional[float] = None, end: Optional[float] = None,
+                            buckets: int = 200):
+    """Min/max/avg buckets of one series between two Unix timestamps (default: the last 10 minutes)"""
+    end = end if end is not None else time.time()
+    start = start if start is not None else end - 600
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    try:
+        history = None
+        memory_start = time_series.memory_start()
+        if start < memory_start:
+            documents = await db.time_series.find(
+                {"key": key, "end": {"$gt": start}, "start": {"$lt": min(end, memory_start)}}
+            ).sort("start", ASCENDING).to_list(None)
+            history = time_series.rows_from_documents(documents)
+        return await asyncio.to_thread(time_series.query, key, start, end, buckets, history)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Time series query error: {str(e)}")
+
 # Real-time monitoring
+async def stream_process_stats(websocket: WebSocket, pid: int, send_lock: asyncio.Lock):
+    """Forward the shared telemetry samples of ``pid`` until the process goes away"""
+    subscription = telemetry.subscribe(pid)
+    try:
+        while True:
+            frame = await subscription.next()
+            if frame is None:
+                break
+            async with send_lock:
+                await websocket.send_text(frame)
+        await websocket.close()
+    finally:
+        telemetry.unsubscribe(pid, subscription)
+
+async def stream_watch_list(websocket: WebSocket, pid: int, watch_list: WatchList, rate: float,
+                            frame_format: str, send_lock: asyncio.Lock):
+    """Poll a watch list on monotonic deadlines and push only changed values"""
+    period = 1.0 / rate
+    series = time_series.series_ids(
+        f"watch:{pid}:{format_address(watch_list.entries[index].address)}:{watch_list.entries[index].data_type}"
+        for index in watch_list.numeric_entries.tolist()
+    )
+    try:
+        with connected_processes.memory(pid) as memory:
+            deadline = time.monotonic()
+            while True:
+                changed, values, raw_bytes = await asyncio.to_thread(watch_list.poll, memory)
+                positions, numeric = watch_list.numeric
+                time_series.record(series[positions], numeric)
+                if changed.size:
+                    async with send_lock:
+                        if frame_format == "binary":
+                            await websocket.send_bytes(binary_frame(changed, raw_bytes))
+                        else:
+                            await websocket.send_text(json.dumps(json_frame(changed, values)))
+
+                # Missed ticks are dropped rather than replayed in a burst
+                deadline = max(deadline + period, time.monotonic())
+                await asyncio.sleep(deadline - time.monotonic())
+    except OSError as e:
+        async with send_lock:
+            await websocket.send_text(json.dumps({"type": "error", "error": f"Watch stopped: {str(e)}"}))
+
 @api_router.websocket("/ws/monitor/{pid}")
 async def websocket_monitor(websocket: WebSocket, pid: int):
-    """WebSocket for real-time process monitoring"""
+    """WebSocket for real-time process monitoring
+
+    Besides the per-second process stats, clients can send
+    {"action": "watch", "entries": [{"address", "data_type", "size"}], "rate": 30,
+    "format": "json" | "binary"} to stream changed values of watched
+    addresses, and {"action": "unwatch"} to stop.
+    """
     await websocket.accept()
-    
+    send_lock = asyncio.Lock()
+    stats_task = asyncio.create_task(stream_process_stats(websocket, pid, send_lock))
+    watch_task = None
+
+    async def reply(message):
+        async with send_lock:
+            await websocket.send_text(json.dumps(message))
+
     try:
         while True:
-            if pid in connected_processes:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message.get("action")
+            except (ValueError, AttributeError):
+                await reply({"type": "error", "error": "Messages must be JSON objects"})
+                continue
+
+            if action == "watch":
+                if pid not in connected_processes:
+                    await reply({"type": "error", "error": "Process not connected"})
+                    continue
                 try:
-                    proc = psutil.Process(pid)
-                    data = {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "cpu_percent": proc.cpu_percent(),
-                        "memory_info": proc.memory_info()._asdict(),
-                        "status": proc.status(),
-                        "num_threads": proc.num_threads()
-                    }
-                    await websocket.send_text(json.dumps(data))
-                except psutil.NoSuchProcess:
-                    await websocket.send_text(json.dumps({"error": "Process no longer exists"}))
-                    break
+                    watch_list = WatchList.from_request(message.get("entries", []))
+                    rate = min(max(float(message.get("rate", DEFAULT_WATCH_RATE)), 1.0), MAX_WATCH_RATE)
+                except (KeyError, TypeError, ValueError) as e:
+                    await reply({"type": "error", "error": f"Invalid watch list: {str(e)}"})
+                    continue
+                frame_format = "binary" if message.get("format") == "binary" else "json"
+
+                if watch_task:
+                    watch_task.cancel()
+                await reply({"type": "watching", "count": len(watch_list), "rate": rate, "format": frame_format})
+                watch_task = asyncio.create_task(
+                    stream_watch_list(websocket, pid, watch_list, rate, frame_format, send_lock)
+                )
+            elif action == "unwatch":
+                if watch_task:
+                    watch_task.cancel()
+                    watch_task = None
+                await reply({"type": "unwatched"})
             else:
-                await websocket.send_text(json.dumps({"error": "Process not connected"}))
-                
-            await asyncio.sleep(1)
+                await reply({"type": "error", "error": f"Unknown action: {action}"})
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logging.error(f"WebSocket error: {str(e)}")
+    finally:
+        stats_task.cancel()
+        if watch_task:
+            watch_task.cancel()
+
+@api_router.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket):
+    """Change feed for the dashboard
+
+    The first message is a ``snapshot`` of the current status and session
+    count; after that every status change, new session, automation
+    start/stop and process connect/detect/exit is pushed as it happens.
+    """
+    await websocket.accept()
+    subscription = events.subscribe()
+
+    async def forward():
+        while True:
+            frame = await subscription.next()
+            if frame is None:
+                break
+            await websocket.send_text(frame)
+
+    sender = None
+    try:
+        sessions = await db.hacking_sessions.count_documents({})
+        await websocket.send_text(json.dumps({
+            "type": "snapshot",
+            **status_snapshot(),
+            "sessions": sessions,
+            "timestamp": datetime.utcnow().isoformat(),
+        }))
+        sender = asyncio.create_task(forward())
+        while True:
+            await websocket.receive_text()  # clients only listen; this notices disconnects
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logging.error(f"Event stream error: {str(e)}")
+    finally:
+        events.unsubscribe(subscription)
+        if sender:
+            sender.cancel()
 
 # Statistics and History
-@api_router.get("/sessions", response_model=List[HackingSession])
-async def get_hacking_sessions():
-    """Get all hacking sessions"""
-    sessions = await db.hacking_sessions.find().to_list(100)
-    return [HackingSession(**session) for session in sessions]
+async def list_page(request: Request, collection: str, query: dict, allowed: List[str],
+                    fields: Optional[str], cursor: Optional[str], limit: Optional[int]):
+    """One newest-first page of a collection with a keyset cursor and an ETag
+
+    The next page's cursor is sent in the ``X-Next-Cursor`` header so the
+    body stays a plain list; the first page also carries the number of
+    matching documents in ``X-Total-Count``. A matching ``If-None-Match``
+    is answered with 304 before Mongo is queried.
+    """
+    etag = collection_versions.etag(collection, query, fields, cursor, limit)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    try:
+        fetch, selected = projection(fields, allowed)
+        keyset = page_filter(query, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    size = page_size(limit)
+    documents = await db[collection].find(keyset, fetch).sort(PAGE_SORT).limit(size + 1).to_list(size + 1)
+    if len(documents) > size:
+        documents = documents[:size]
+        headers["X-Next-Cursor"] = encode_cursor(documents[-1])
+    if cursor is None:
+        headers["X-Total-Count"] = str(await db[collection].count_documents(query))
+    body = [{field: document[field] for field in selected if field in document} for document in documents]
+    return JSONResponse(content=jsonable_encoder(body), headers=headers)
+
+@api_router.get("/sessions")
+async def get_hacking_sessions(request: Request, fields: Optional[str] = None,
+                               cursor: Optional[str] = None, limit: Optional[int] = None):
+    """Get hacking sessions, newest first"""
+    return await list_page(request, "hacking_sessions", {}, list(HackingSession.model_fields), fields, cursor, limit)
 
 @api_router.get("/memory/history/{process_id}")
-async def get_memory_history(process_id: str):
+async def get_memory_history(request: Request, process_id: str, fields: Optional[str] = None,
+                             cursor: Optional[str] = None, limit: Optional[int] = None):
     """Get memory editing history for a process"""
-    history = await db.memory_addresses.find({"process_id": process_id}).to_list(100)
-    return history
+    return await list_page(
+        request, "memory_addresses", {"process_id": process_id},
+        [*MemoryAddress.model_fields, "updated_at"], fields, cursor, limit,
+    )
 
-@api_router.get("/automation/scripts", response_model=List[AutomationScript])
-async def get_automation_scripts():
-    """Get all automation scripts"""
-    scripts = await db.automation_scripts.find().to_list(100)
-    return [AutomationScript(**script) for script in scripts]
+@api_router.get("/automation/scripts")
+async def get_automation_scripts(request: Request, fields: Optional[str] = None,
+                                 cursor: Optional[str] = None, limit: Optional[int] = None):
+    """Get automation scripts, newest first"""
+    return await list_page(request, "automation_scripts", {}, list(AutomationScript.model_fields), fields, cursor, limit)
 
 # Legacy endpoints
 @api_router.get("/")
@@ -366,12 +1545,12 @@ async def root():
 @api_router.get("/status")
 async def api_status():
     """API health check"""
-    return {
-        "status": "online",
-        "connected_processes": len(connected_processes),
-        "automation_active": automation_active,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return {**status_snapshot(), "timestamp": datetime.utcnow().isoformat()}
+
+@api_router.get("/write-queue")
+async def write_queue_stats():
+    """Depth and flush latency of the write-behind queue"""
+    return writes.stats()
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -382,6 +1561,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],
 )
 
 # Configure logging
@@ -391,8 +1571,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Indexes behind the lookups and history queries of each collection
+INDEXES = {
+    "memory_addresses": [
+        IndexModel([("process_id", ASCENDING), ("address", ASCENDING)]),
+        IndexModel([("process_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+    "scan_results": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("process_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=RESULT_TTL),
+    ],
+    "scan_result_chunks": [
+        IndexModel([("result_id", ASCENDING), ("index", ASCENDING)], unique=True),
+        IndexModel([("process_id", ASCENDING)]),
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=RESULT_TTL),
+    ],
+    "hacking_sessions": [IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)])],
+    "automation_scripts": [
+        IndexModel([("id", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "game_processes": [IndexModel([("pid", ASCENDING)])],
+    "time_series": [IndexModel([("key", ASCENDING), ("start", ASCENDING)])],
+}
+
+@app.on_event("startup")
+async def create_indexes():
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except Exception as e:
+            logger.warning(f"Could not create indexes on {collection}: {str(e)}")
+
+@app.on_event("startup")
+async def start_event_bus():
+    events.start()
+
+@app.on_event("startup")
+async def start_write_queue():
+    writes.start(db)
+
+@app.on_event("startup")
+async def start_process_registry():
+    connected_processes.start()
+
+@app.on_event("startup")
+async def start_scanner_pool():
+    scanner.start()
+
+@app.on_event("startup")
+async def start_process_discovery():
+    global discovery_task
+    discovery_task = asyncio.create_task(run_process_discovery())
+
+@app.on_event("startup")
+async def start_time_series():
+    global time_series_task
+    time_series_task = asyncio.create_task(run_time_series())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    global automation_active
-    automation_active = False
+    automation.shutdown()
+    freezer.shutdown()
+    if discovery_task is not None:
+        discovery_task.cancel()
+    if time_series_task is not None:
+        time_series_task.cancel()
+    scan_jobs.close()
+    connected_processes.close()
+    scanner.shutdown()
+    scan_sessions.close()
+    telemetry.close()
+    events.close()
+    time_series.compact()
+    await flush_time_series()
+    await writes.close()
     client.close()
@@ -0,0 +1,330 @@
+"""AOB signature scanning: wildcard byte patterns over a process's code"""
+import bisect
+import logging
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from memory_scanner import DEFAULT_CHUNK_SIZE, EMPTY_ADDRESSES, MemoryRegion, ProcessMemory, parse_maps, scannable_regions
+
+logger = logging.getLogger(__name__)
+
+WILDCARDS = ("?", "??", "*", "**")
+# Anchors are located with a bytearray.find (memchr) loop; once a chunk has
+# more occurrences than this, a vectorized NumPy compare takes over
+FIND_LOOP_MAX = 2048
+VERIFY_BATCH = 65536
+# Bytes that fill code padding and zeroed data; poor anchors
+COMMON_BYTES = frozenset(b"\x00\xff\xcc\x90")
+
+
+@dataclass(frozen=True, eq=False)
+class Signature:
+    """A compiled pattern such as ``48 8B ?? ?? 89``
+
+    ``anchor`` is the longest run of fixed bytes; candidates are found by
+    searching for it and then checked against ``pattern`` under ``mask``.
+    """
+    text: str
+    pattern: np.ndarray  # wildcard bytes are zero
+    mask: np.ndarray  # 0xFF for fixed bytes, 0x00 for wildcards
+    anchor: bytes
+    anchor_offset: int
+
+    @property
+    def size(self) -> int:
+        return int(self.pattern.size)
+
+
+def compile_signature(text: str) -> Signature:
+    tokens = text.replace(",", " ").split()
+    if not tokens:
+        raise ValueError("Signature must not be empty")
+    pattern = np.zeros(len(tokens), dtype=np.uint8)
+    mask = np.zeros(len(tokens), dtype=np.uint8)
+    for i, token in enumerate(tokens):
+        if token in WILDCARDS:
+            continue
+        try:
+            if len(token) > 2:
+                raise ValueError
+            pattern[i] = int(token, 16)
+        except ValueError:
+            raise ValueError(f"Invalid signature byte {token!r} in {text!r}")
+        mask[i] = 0xFF
+
+    runs, start = [], None
+    for i, fixed in enumerate(mask.tolist() + [0]):
+        if fixed and start is None:
+            start = i
+        elif not fixed and start is not None:
+            runs.append((start, i))
+            start = None
+    if not runs:
+        raise ValueError(f"Signature {text!r} has no fixed bytes")
+
+    def quality(run):
+        length = run[1] - run[0]
+        common = sum(byte in COMMON_BYTES for byte in pattern[run[0]:run[1]].tolist())
+        return length, -common
+
+    first, last = max(runs, key=quality)
+    return Signature(" ".join(tokens).upper(), pattern, mask, pattern[first:last].tobytes(), first)
+
+
+def _candidates(buf: bytearray, data: np.ndarray, length: int, signature: Signature) -> np.ndarray:
+    """Start offsets in ``buf[:length]`` where the anchor of ``signature`` sits"""
+    anchor = signature.anchor
+    positions = []
+    position = buf.find(anchor, 0, length)
+    while position != -1 and len(positions) <= FIND_LOOP_MAX:
+        positions.append(position)
+        position = buf.find(anchor, position + 1, length)
+
+    if position == -1:
+        found = np.array(positions, dtype=np.int64)
+    else:
+        count = length - len(anchor) + 1
+        hit = data[:count] == anchor[0]
+        for i in range(1, len(anchor)):
+            hit &= data[i:i + count] == anchor[i]
+        found = np.flatnonzero(hit)
+    starts = found - signature.anchor_offset
+    return starts[(starts >= 0) & (starts + signature.size <= length)]
+
+
+def match_chunk(buf: bytearray, length: int, signature: Signature) -> np.ndarray:
+    """Offsets in ``buf[:length]`` where ``signature`` matches"""
+    data = np.frombuffer(buf, dtype=np.uint8, count=length)
+    starts = _candidates(buf, data, length, signature)
+    if not starts.size or len(signature.anchor) == signature.size:
+        return starts  # no wildcards: the anchor is the whole pattern
+
+    windows = np.lib.stride_tricks.sliding_window_view(data, signature.size)
+    matched = []
+    for first in range(0, starts.size, VERIFY_BATCH):
+        batch = starts[first:first + VERIFY_BATCH]
+        ok = ((windows[batch] & signature.mask) == signature.pattern).all(axis=1)
+        matched.append(batch[ok])
+    return np.concatenate(matched)
+
+
+def read_build_id(path: str) -> Optional[str]:
+    """GNU build ID of an ELF file from its PT_NOTE segments, if it has one"""
+    try:
+        with open(path, "rb") as elf:
+            header = elf.read(64)
+            if header[:4] != b"\x7fELF":
+                return None
+            endian = "<" if header[5] == 1 else ">"
+            # Offsets of e_phoff and e_phentsize, and the p_offset/p_filesz layout
+            if header[4] == 2:
+                phoff, = struct.unpack_from(endian + "Q", header, 0x20)
+                phentsize, phnum = struct.unpack_from(endian + "HH", header, 0x36)
+                segment_format, segment_at = endian + "Q8xQ", 8
+            else:
+                phoff, = struct.unpack_from(endian + "I", header, 0x1C)
+                phentsize, phnum = struct.unpack_from(endian + "HH", header, 0x2A)
+                segment_format, segment_at = endian + "I8xI", 4
+            elf.seek(phoff)
+            table = elf.read(phentsize * phnum)
+
+            for i in range(phnum):
+                entry = table[i * phentsize:(i + 1) * phentsize]
+                if struct.unpack_from(endian + "I", entry)[0] != 4:  # PT_NOTE
+                    continue
+                offset, size = struct.unpack_from(segment_format, entry, segment_at)
+                elf.seek(offset)
+                notes = elf.read(min(size, 1 << 16))
+                position = 0
+                while position + 12 <= len(notes):
+                    namesz, descsz, kind = struct.unpack_from(endian + "III", notes, position)
+                    name_at = position + 12
+                    desc_at = name_at + (namesz + 3) // 4 * 4
+                    if kind == 3 and notes[name_at:name_at + namesz] == b"GNU\0":  # NT_GNU_BUILD_ID
+                        return notes[desc_at:desc_at + descsz].hex()
+                    position = desc_at + (descsz + 3) // 4 * 4
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+class SignatureCache:
+    """Signature hits per module build, as offsets from the module base
+
+    A module with the same build ID has the same code, so the hits in its
+    read-only mappings can be reused across processes and restarts without
+    reading them again. Writable mappings are never cached. Scans run in
+    worker threads and share one cache, so every access holds its lock.
+    """
+
+    def __init__(self, max_modules: int = 256):
+        self.max_modules = max_modules
+        self.hits = 0
+        self.misses = 0
+        self._modules: "OrderedDict[str, Dict[Tuple[str, bool], np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, build_id: str, signatures: Sequence[Signature], executable_only: bool) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            cached = self._modules.get(build_id)
+            if cached is None or any((signature.text, executable_only) not in cached for signature in signatures):
+                self.misses += 1
+                return None
+            self._modules.move_to_end(build_id)
+            self.hits += 1
+            return {signature.text: cached[(signature.text, executable_only)] for signature in signatures}
+
+    def put(self, build_id: str, executable_only: bool, offsets: Dict[str, np.ndarray]):
+        with self._lock:
+            cached = self._modules.setdefault(build_id, {})
+            self._modules.move_to_end(build_id)
+            for text, found in offsets.items():
+                cached[(text, executable_only)] = found
+            while len(self._modules) > self.max_modules:
+                self._modules.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"modules": len(self._modules), "hits": self.hits, "misses": self.misses}
+
+
+@dataclass
+class SignatureScanResult:
+    hits: Dict[str, np.ndarray]  # signature text -> sorted addresses
+    bytes_scanned: int
+    regions_scanned: int
+    cached_modules: List[str]
+    elapsed: float
+    modules: Dict[str, int] = field(default_factory=dict)  # module path -> base address
+    module_regions: List[MemoryRegion] = field(default_factory=list)  # sorted by start
+
+    def __post_init__(self):
+        self._starts = [region.start for region in self.module_regions]
+
+    @property
+    def throughput(self) -> float:
+        """Scan throughput in GB/s"""
+        return self.bytes_scanned / self.elapsed / 1e9 if self.elapsed else 0.0
+
+    def locate(self, address: int) -> Optional[str]:
+        """``module+offset`` for addresses inside a module mapping"""
+        slot = bisect.bisect_right(self._starts, address) - 1
+        if slot < 0 or address >= self.module_regions[slot].end:
+            return None
+        path = self.module_regions[slot].path
+        return f"{os.path.basename(path)}+{address - self.modules[path]:#x}"
+
+
+def _scan(memory: ProcessMemory, regions: List[MemoryRegion], signatures: Sequence[Signature],
+          chunk_size: int) -> Tuple[Dict[str, List[np.ndarray]], int]:
+    overlap = max(signature.size for signature in signatures) - 1
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    found: Dict[str, List[np.ndarray]] = {signature.text: [] for signature in signatures}
+    scanned = 0
+    for region in regions:
+        address = region.start
+        while address < region.end:
+            length = min(chunk_size, region.end - address)
+            try:
+                read = memory.readinto(view[:length], address)
+            except OSError as e:
+                logger.debug(f"Skipping unreadable chunk at 0x{address:X}: {e}")
+                address += length
+                continue
+            if read <= 0:
+                break
+            last = address + read >= region.end or read <= overlap
+            # Matches starting in the overlap are left to the next chunk, so
+            # hits come out sorted and without duplicates
+            limit = read if last else read - overlap
+            # Every signature is matched against the chunk while it is hot
+            for signature in signatures:
+                offsets = match_chunk(buf, read, signature)
+                if not last:
+                    offsets = offsets[offsets < limit]
+                if offsets.size:
+                    found[signature.text].append(offsets.astype(np.uint64) + np.uint64(address))
+            scanned += read
+            if last:
+                break
+            address += limit
+    return found, scanned
+
+
+def scan_signatures(memory: ProcessMemory, signatures: Sequence[Signature], executable_only: bool = True,
+                    cache: Optional[SignatureCache] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    regions: Optional[List[MemoryRegion]] = None) -> SignatureScanResult:
+    """Find every signature in the executable (or all readable) regions behind ``memory``
+
+    Regions are grouped by module; the read-only mappings of modules whose
+    build ID is in ``cache`` for all signatures are not read at all.
+    Writable module mappings and anonymous regions (JIT code) are always
+    scanned. ``regions`` are the scannable regions of the process when
+    already known.
+    """
+    started = time.perf_counter()
+    pid = memory.pid
+    if regions is None:
+        regions = scannable_regions(parse_maps(pid))
+    bases: Dict[str, int] = {}
+    for region in regions:
+        if region.path.startswith("/"):
+            bases.setdefault(region.path, region.start)
+    selected = [region for region in regions if region.executable or not executable_only]
+
+    groups: Dict[str, List[MemoryRegion]] = {}
+    for region in selected:
+        groups.setdefault(region.path if region.path.startswith("/") else "", []).append(region)
+
+    hits: Dict[str, List[np.ndarray]] = {signature.text: [] for signature in signatures}
+    cached_modules, scanned, regions_scanned = [], 0, 0
+
+    def scan_group(group: List[MemoryRegion]) -> Dict[str, np.ndarray]:
+        nonlocal scanned, regions_scanned
+        found, group_scanned = _scan(memory, group, signatures, chunk_size)
+        scanned += group_scanned
+        regions_scanned += len(group)
+        merged = {text: np.concatenate(parts) if parts else EMPTY_ADDRESSES for text, parts in found.items()}
+        for text, addresses in merged.items():
+            hits[text].append(addresses)
+        return merged
+
+    for path, group in groups.items():
+        build_id = (read_build_id(f"/proc/{pid}/root{path}") or read_build_id(path)) if path else None
+        if not build_id or cache is None:
+            scan_group(group)
+            continue
+        # Writable mappings of a module (.data, .bss, relocated pointers)
+        # change at runtime, so only its read-only image is cached
+        image = [region for region in group if not region.writable]
+        writable = [region for region in group if region.writable]
+        base = np.uint64(bases.get(path, 0))
+        if image:
+            offsets = cache.get(build_id, signatures, executable_only)
+            if offsets is not None:
+                for text, found in offsets.items():
+                    hits[text].append(found + base)
+                cached_modules.append(path)
+            else:
+                merged = scan_group(image)
+                cache.put(build_id, executable_only, {text: addresses - base for text, addresses in merged.items()})
+        if writable:
+            scan_group(writable)
+
+    return SignatureScanResult(
+        hits={text: np.sort(np.concatenate(parts)) if parts else EMPTY_ADDRESSES for text, parts in hits.items()},
+        bytes_scanned=scanned,
+        regions_scanned=regions_scanned,
+        cached_modules=cached_modules,
+        elapsed=time.perf_counter() - started,
+        modules=bases,
+        module_regions=[region for region in regions if region.path.startswith("/")],
+    )
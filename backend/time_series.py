@@ -0,0 +1,323 @@
+"""Columnar in-memory time series with one-second rollups
+
+Memory holds two rings shared by every series, so how far back memory
+reaches depends on the total sample rate: the raw ring keeps
+``RAW_CAPACITY / (series x rate)`` seconds and the rollup ring
+``ROLLUP_CAPACITY / series`` seconds. One series sampled at 60 Hz keeps
+about 36 minutes raw and 18 hours of rollups; 100 watched values at 60 Hz
+keep about 22 seconds raw and 11 minutes of rollups. Rollups are flushed
+to Mongo, and queries read anything older than memory from there, so the
+full history at one-second resolution survives either way.
+"""
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from bson import Binary
+
+RAW_CAPACITY = 1 << 17  # samples kept at full rate, 20 bytes each
+ROLLUP_CAPACITY = 1 << 16  # rollup rows kept in memory, 36 bytes each
+ROLLUP_RESOLUTION = 1.0  # seconds per rollup bucket
+MAX_QUERY_BUCKETS = 2000
+TIME_SERIES_FLUSH_INTERVAL = 10.0  # seconds between flushes of rollup rows to Mongo
+
+RAW_COLUMNS = {"t": np.float64, "series": np.uint32, "value": np.float64}
+ROLLUP_COLUMNS = {"t": np.float64, "series": np.uint32, "min": np.float64, "max": np.float64,
+                  "sum": np.float64, "count": np.uint32}
+ROLLUP_FIELDS = ("t", "min", "max", "sum", "count")  # stored per chunk document
+
+
+class ColumnRing:
+    """Fixed-size ring of parallel NumPy columns, oldest rows overwritten first"""
+
+    def __init__(self, columns: Dict[str, type], capacity: int):
+        self.capacity = capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self.size = 0
+        self.evicted = 0
+        self._head = 0  # next row to write
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def append(self, **rows: np.ndarray):
+        count = len(rows["t"])
+        if count > self.capacity:
+            rows = {name: values[-self.capacity:] for name, values in rows.items()}
+            self.evicted += count - self.capacity
+            count = self.capacity
+        first = min(count, self.capacity - self._head)
+        for name, column in self.columns.items():
+            values = rows[name]
+            column[self._head:self._head + first] = values[:first]
+            column[:count - first] = values[first:]
+        self.evicted += max(self.size + count - self.capacity, 0)
+        self.size = min(self.size + count, self.capacity)
+        self._head = (self._head + count) % self.capacity
+
+    def ordered(self) -> Dict[str, np.ndarray]:
+        """Copy of every column, oldest row first"""
+        start = (self._head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return {name: column[start:start + self.size].copy() for name, column in self.columns.items()}
+        return {
+            name: np.concatenate((column[start:], column[:self._head]))
+            for name, column in self.columns.items()
+        }
+
+    def oldest(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return float(self.columns["t"][(self._head - self.size) % self.capacity])
+
+
+def rollup(t: np.ndarray, series: np.ndarray, values: np.ndarray, resolution: float) -> Dict[str, np.ndarray]:
+    """Min, max, sum and count per series and ``resolution``-second bucket of time-sorted samples"""
+    buckets = np.floor(t / resolution)
+    order = np.lexsort((series, buckets))
+    buckets, series, values = buckets[order], series[order], values[order]
+    starts = np.flatnonzero(np.r_[True, (np.diff(buckets) != 0) | (np.diff(series) != 0)])
+    return {
+        "t": buckets[starts] * resolution,
+        "series": series[starts],
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+        "sum": np.add.reduceat(values, starts),
+        "count": np.diff(np.r_[starts, values.size]).astype(np.uint32),
+    }
+
+
+def downsample(rows: Dict[str, np.ndarray], start: float, step: float) -> Dict[str, list]:
+    """Merge rollup rows into ``step``-second buckets from ``start``, dropping empty buckets"""
+    if not rows["t"].size:
+        return {"t": [], "min": [], "max": [], "avg": [], "count": []}
+    index = np.floor((rows["t"] - start) / step).astype(np.int64)
+    order = np.argsort(index, kind="stable")
+    index = index[order]
+    starts = np.flatnonzero(np.r_[True, np.diff(index) != 0])
+    count = np.add.reduceat(rows["count"][order].astype(np.int64), starts)
+    return {
+        "t": (start + index[starts] * step).tolist(),
+        "min": np.minimum.reduceat(rows["min"][order], starts).tolist(),
+        "max": np.maximum.reduceat(rows["max"][order], starts).tolist(),
+        "avg": (np.add.reduceat(rows["sum"][order], starts) / count).tolist(),
+        "count": count.tolist(),
+    }
+
+
+def _select(columns: Dict[str, np.ndarray], series: int, start: float, end: float) -> Dict[str, np.ndarray]:
+    keep = (columns["series"] == series) & (columns["t"] >= start) & (columns["t"] < end)
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def _concat(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    return {name: np.concatenate([part[name] for part in parts]) for name in ROLLUP_FIELDS}
+
+
+class TimeSeriesStore:
+    """Samples of many numeric series in two bounded, columnar tiers
+
+    Samples are appended to a raw ring of ``(t, series, value)`` columns.
+    ``compact`` folds every finished second of raw samples into rollup rows
+    (min, max, sum and count per series), which go to a second ring and to
+    a queue that is flushed to Mongo as one chunk document per series.
+    Queries read raw samples where the raw ring still has them and rollup
+    rows before that, with older rows supplied from Mongo by the caller.
+
+    ``forget`` retires the series of a process that went away: their keys
+    stop resolving at once and are freed by the compaction that rolls up
+    their last samples.
+    """
+
+    def __init__(self, capacity: int = RAW_CAPACITY, rollup_capacity: int = ROLLUP_CAPACITY,
+                 resolution: float = ROLLUP_RESOLUTION):
+        self.resolution = resolution
+        self.raw = ColumnRing(RAW_COLUMNS, capacity)
+        self.rollups = ColumnRing(ROLLUP_COLUMNS, rollup_capacity)
+        self.samples = 0
+        self.dropped = 0  # raw samples overwritten before they were compacted
+        self._keys: Dict[int, str] = {}  # every series id with rows that may still be compacted
+        self._ids: Dict[str, int] = {}  # live series only
+        self._next_id = 0
+        self._retired: Dict[int, float] = {}  # series id -> time it was forgotten
+        self._created = time.time()
+        self._compacted_to = 0.0  # raw samples before this time are in the rollups
+        self._uncompacted = 0  # raw samples from _compacted_to on
+        self._last = 0.0
+        self._pending: List[Dict[str, np.ndarray]] = []
+        self._lock = threading.Lock()
+
+    def series_ids(self, keys: Iterable[str]) -> np.ndarray:
+        """Id of each series key, registering new ones"""
+        with self._lock:
+            ids = []
+            for key in keys:
+                if key not in self._ids:
+                    self._ids[key] = self._next_id
+                    self._keys[self._next_id] = key
+                    self._next_id += 1
+                ids.append(self._ids[key])
+            return np.array(ids, dtype=np.uint32)
+
+    def forget(self, prefixes: Iterable[str]) -> int:
+        """Retire every series whose key starts with one of ``prefixes``; returns how many"""
+        prefixes = tuple(prefixes)
+        with self._lock:
+            stale = [key for key in self._ids if key.startswith(prefixes)]
+            for key in stale:
+                self._retired[self._ids.pop(key)] = self._last
+            return len(stale)
+
+    def record(self, series: np.ndarray, values: np.ndarray, timestamp: Optional[float] = None):
+        """Append one sample per series, all taken at ``timestamp``"""
+        if not len(series):
+            return
+        with self._lock:
+            # Timestamps never go backwards, so both rings stay sorted by time
+            timestamp = max(timestamp or time.time(), self._last, self._compacted_to)
+            self._last = timestamp
+            overflow = max(self._uncompacted + len(series) - self.raw.capacity, 0)
+            self.dropped += overflow
+            self._uncompacted += len(series) - overflow
+            self.raw.append(
+                t=np.full(len(series), timestamp),
+                series=np.asarray(series, dtype=np.uint32),
+                value=np.asarray(values, dtype=np.float64),
+            )
+            self.samples += len(series)
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Roll up the raw samples of every finished bucket; returns the rows added"""
+        now = time.time() if now is None else now
+        with self._lock:
+            until = math.floor(now / self.resolution) * self.resolution
+            if until <= self._compacted_to:
+                return 0
+            raw = self.raw.ordered()
+            first, last = np.searchsorted(raw["t"], [self._compacted_to, until])
+            self._compacted_to = until
+            self._uncompacted -= min(int(last - first), self._uncompacted)
+            if first == last:
+                return 0
+            rows = rollup(raw["t"][first:last], raw["series"][first:last], raw["value"][first:last], self.resolution)
+            # Pending rows carry their key, which may be freed before they are flushed
+            keys = [self._keys.get(series) for series in rows["series"].tolist()]
+            known = np.array([key is not None for key in keys], dtype=bool)
+            rows = {**{name: values[known] for name, values in rows.items()},
+                    "key": np.array(keys, dtype=object)[known]}
+            for series in [series for series, retired in self._retired.items() if retired < until]:
+                del self._retired[series], self._keys[series]
+            self.rollups.append(**{name: rows[name] for name in ROLLUP_COLUMNS})
+            self._pending.append(rows)
+            return len(rows["t"])
+
+    def take_pending(self) -> Dict[str, np.ndarray]:
+        """Rollup rows compacted since the last call, for flushing"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return {**{name: np.empty(0, dtype=dtype) for name, dtype in ROLLUP_COLUMNS.items()},
+                    "key": np.empty(0, dtype=object)}
+        return {name: np.concatenate([rows[name] for rows in pending]) for name in (*ROLLUP_COLUMNS, "key")}
+
+    def requeue(self, rows: Dict[str, np.ndarray]):
+        """Put back rows whose flush failed, keeping at most one ring's worth"""
+        with self._lock:
+            self._pending.insert(0, rows)
+            while sum(len(part["t"]) for part in self._pending) > self.rollups.capacity and len(self._pending) > 1:
+                self._pending.pop(0)
+
+    def chunk_documents(self, rows: Dict[str, np.ndarray]) -> List[dict]:
+        """One document per series holding its rollup rows as packed arrays"""
+        documents = []
+        for series in np.unique(rows["series"]).tolist():
+            mask = rows["series"] == series
+            documents.append({
+                "key": rows["key"][mask][0],
+                "start": float(rows["t"][mask][0]),
+                "end": float(rows["t"][mask][-1]) + self.resolution,
+                "rows": int(mask.sum()),
+                "resolution": self.resolution,
+                **{field: Binary(rows[field][mask].astype(ROLLUP_COLUMNS[field]).tobytes()) for field in ROLLUP_FIELDS},
+                "created_at": datetime.utcnow(),
+            })
+        return documents
+
+    @staticmethod
+    def rows_from_documents(documents: List[dict]) -> Dict[str, np.ndarray]:
+        parts = [
+            {field: np.frombuffer(document[field], dtype=ROLLUP_COLUMNS[field]) for field in ROLLUP_FIELDS}
+            for document in documents
+        ]
+        if not parts:
+            return {field: np.empty(0, dtype=ROLLUP_COLUMNS[field]) for field in ROLLUP_FIELDS}
+        return _concat(parts)
+
+    def memory_start(self) -> float:
+        """Time from which memory holds every sample; older rows come from Mongo"""
+        with self._lock:
+            if not self.rollups.evicted:
+                return self._created
+            return self.rollups.oldest() + self.resolution
+
+    def query(self, key: str, start: float, end: float, buckets: int = 200,
+              history: Optional[Dict[str, np.ndarray]] = None) -> dict:
+        """Min/max/avg of ``key`` in up to ``buckets`` equal slices of ``[start, end)``
+
+        ``history`` holds stored rollup rows of ``key``; only those from
+        before ``memory_start()`` are used.
+        """
+        buckets = min(max(buckets, 1), MAX_QUERY_BUCKETS)
+        step = max((end - start) / buckets, 1e-6)
+        memory_start = self.memory_start()
+        parts = []
+        if history is not None:
+            keep = (history["t"] >= start) & (history["t"] < min(end, memory_start))
+            parts.append({field: history[field][keep] for field in ROLLUP_FIELDS})
+        with self._lock:
+            series = self._ids.get(key)
+            if series is not None:
+                raw = self.raw.ordered()
+                rollups = self.rollups.ordered()
+                # Raw samples from the first bucket the raw ring holds in full;
+                # rollup rows before that
+                raw_start = -math.inf
+                if self.raw.evicted:
+                    raw_start = (math.floor(raw["t"][0] / self.resolution) + 1) * self.resolution
+        if series is not None:
+            held = _select(rollups, series, max(start, memory_start), min(end, raw_start))
+            parts.append({field: held[field] for field in ROLLUP_FIELDS})
+            # Stored history already covers everything before memory_start
+            samples = _select(raw, series, max(start, raw_start, memory_start if history is not None else -math.inf), end)
+            values = samples["value"]
+            parts.append({"t": samples["t"], "min": values, "max": values, "sum": values,
+                          "count": np.ones(values.size, dtype=np.uint32)})
+        if not parts:
+            parts.append({field: np.empty(0, dtype=ROLLUP_COLUMNS[field]) for field in ROLLUP_FIELDS})
+        return {"key": key, "start": start, "end": end, "step": step, **downsample(_concat(parts), start, step)}
+
+    def series(self) -> List[dict]:
+        with self._lock:
+            raw = self.raw.ordered()
+            live = sorted(self._ids.items(), key=lambda item: item[1])
+        counts = np.bincount(raw["series"], minlength=self._next_id)
+        return [{"id": series, "key": key, "raw_samples": int(counts[series])} for key, series in live]
+
+    def stats(self) -> dict:
+        return {
+            "series": len(self._ids),
+            "samples": self.samples,
+            "raw_samples": len(self.raw),
+            "raw_span_s": round(self._last - self.raw.oldest(), 3) if self.raw.size else 0.0,
+            "rollup_rows": len(self.rollups),
+            "rollup_span_s": round(self._compacted_to - self.rollups.oldest(), 3) if self.rollups.size else 0.0,
+            "dropped": self.dropped,
+            "memory_bytes": self.raw.nbytes + self.rollups.nbytes,
+        }
@@ -0,0 +1,179 @@
+"""Write-behind queue that batches bookkeeping writes into bulk_write calls"""
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 500  # operations per flush
+MAX_DELAY = 0.05  # seconds an operation may wait for its batch to fill
+MAX_PENDING = 10000  # queued operations before put() waits for a flush
+LATENCY_WINDOW = 256  # flushes kept for the latency percentiles
+MAX_ATTEMPTS = 3  # flushes an operation may take part in before it is given up
+
+
+class WriteBehindQueue:
+    """Applies queued write operations to Mongo off the request path
+
+    Handlers ``put`` pymongo operations (``InsertOne``, ``UpdateOne``, ...)
+    and return without waiting for Mongo. One writer task flushes as soon
+    as ``max_batch`` operations are queued or the oldest one has waited
+    ``max_delay`` seconds, with one ordered ``bulk_write`` per collection,
+    so writes to a collection are applied in the order they were queued.
+    The queue is bounded: once ``max_pending`` operations wait, ``put``
+    waits for the next flush instead of growing memory. ``on_flush`` is
+    called with the name of every collection a flush wrote to.
+
+    When a ``bulk_write`` fails, the operations it applied count as written.
+    An operation rejected by Mongo itself (a write error such as a duplicate
+    key) is dropped. Operations that were never attempted go back to the
+    front of the queue. When the whole call failed (connection loss,
+    timeout), its operations are retried, each at most ``max_attempts`` times.
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY,
+                 max_pending: int = MAX_PENDING, on_flush: Optional[Callable[[str], None]] = None,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.db = None
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.on_flush = on_flush
+        self.queued = 0
+        self.written = 0
+        self.failed = 0
+        self.retried = 0
+        self.flushes = 0
+        self.waits = 0  # puts that had to wait for room
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._room = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self, db):
+        """Start the writer task against the Mongo database ``db``"""
+        self.db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, collection: str, operation):
+        """Queue ``operation`` on ``collection``; waits only while the queue is full"""
+        while len(self._queue) >= self.max_pending and self._task is not None and not self._closing:
+            self.waits += 1
+            self._room.clear()
+            await self._room.wait()
+        self._queue.append((collection, operation, 0))
+        self.queued += 1
+        self._wakeup.set()
+        if len(self._queue) >= self.max_batch:
+            self._full.set()
+
+    async def put_many(self, collection: str, operations: List):
+        for operation in operations:
+            await self.put(collection, operation)
+
+    async def _run(self):
+        while self._queue or not self._closing:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if len(self._queue) < self.max_batch and not self._closing:
+                self._full.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+            await self._write(self._take())
+
+    def _take(self) -> List[Tuple[str, object, int]]:
+        batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+        self._room.set()
+        return batch
+
+    async def _write(self, batch: List[Tuple[str, object, int]]):
+        """One ordered bulk_write per collection, in order of first appearance"""
+        started = time.perf_counter()
+        by_collection: Dict[str, list] = {}
+        for collection, operation, attempts in batch:
+            by_collection.setdefault(collection, []).append((operation, attempts))
+        retry = []
+        for collection, entries in by_collection.items():
+            try:
+                await self.db[collection].bulk_write([operation for operation, _ in entries], ordered=True)
+                applied = len(entries)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors") or []
+                # An ordered bulk stops at its first write error: everything
+                # before it was applied and nothing after it was attempted.
+                # Without one, only the write concern failed and all was applied.
+                applied = errors[0]["index"] if errors else len(entries)
+                logger.warning(f"Write-behind flush to {collection} failed after {applied} of {len(entries)} "
+                               f"operations: {errors[0].get('errmsg') if errors else e.details.get('writeConcernErrors')}")
+                if errors:
+                    self.failed += 1
+                    retry.extend((collection, operation, attempts) for operation, attempts in entries[applied + 1:])
+            except Exception as e:
+                applied = 0
+                again = [(collection, operation, attempts + 1) for operation, attempts in entries
+                         if attempts + 1 < self.max_attempts]
+                self.failed += len(entries) - len(again)
+                logger.warning(f"Write-behind flush of {len(entries)} operations to {collection} failed, "
+                               f"retrying {len(again)}: {e}")
+                retry.extend(again)
+            self.written += applied
+            if applied and self.on_flush is not None:
+                try:
+                    self.on_flush(collection)
+                except Exception as e:
+                    logger.warning(f"Write-behind flush callback for {collection} failed: {e}")
+        # Retried operations go first so each collection keeps its order
+        self._queue.extendleft(reversed(retry))
+        self.retried += len(retry)
+        self.flushes += 1
+        self.latencies.append(time.perf_counter() - started)
+
+    async def _drain(self):
+        while self._queue:
+            await self._write(self._take())
+
+    async def close(self):
+        """Stop taking new triggers and write out everything still queued"""
+        self._closing = True
+        self._wakeup.set()
+        self._full.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self.db is not None:
+            await self._drain()
+
+    def stats(self) -> dict:
+        latencies = np.array(self.latencies) * 1000
+        return {
+            "depth": len(self._queue),
+            "max_pending": self.max_pending,
+            "queued": self.queued,
+            "written": self.written,
+            "failed": self.failed,
+            "retried": self.retried,
+            "flushes": self.flushes,
+            "waits": self.waits,
+            "mean_batch": round((self.written + self.failed + self.retried) / self.flushes, 1) if self.flushes else 0.0,
+            "flush_latency_ms": {
+                "last": round(float(latencies[-1]), 3),
+                "mean": round(float(latencies.mean()), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+                "max": round(float(latencies.max()), 3),
+            } if latencies.size else None,
+        }
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""End-to-end benchmarks of the backend against a synthetic target process
+
+Spawns ``tests/fixture_target.py`` with a seeded heap of the requested size,
+drives the API in-process through FastAPI's TestClient with Mongo replaced by
+mongomock, and writes every result as JSON. Passing ``--compare`` with an
+earlier result file prints the change per metric and exits non-zero when one
+regressed by more than ``--threshold``.
+
+    python backend_benchmark.py --heap-mb 256 --output bench-main.json
+    python backend_benchmark.py --heap-mb 256 --compare bench-main.json
+
+``--reserve-mb`` gives the target a sparsely touched mapping as well and
+adds full and resident-only scans of it to the results.
+
+Needs the backend requirements plus ``mongomock-motor``.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark")
+logger.setLevel(logging.INFO)
+
+FIXTURE = os.path.join(ROOT_DIR, "tests", "fixture_target.py")
+BATCH_ENTRIES = 1000
+FANOUT_EVENTS = 200  # per round; stays below the event bus backlog limit
+
+
+@contextlib.contextmanager
+def fixture_process(heap_mb: int, seed: int, reserve_mb: int = 0):
+    """Start the fixture target and yield the layout it reports on its first line"""
+    process = subprocess.Popen(
+        [sys.executable, FIXTURE, "--heap-mb", str(heap_mb), "--seed", str(seed), "--reserve-mb", str(reserve_mb)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        yield json.loads(process.stdout.readline())
+    finally:
+        process.stdin.close()
+        process.wait(timeout=30)
+
+
+def load_server():
+    """Import the API with its Mongo client swapped for an in-memory one"""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("mongomock-motor is required for the benchmarks: pip install mongomock-motor")
+    import server
+    server.client = AsyncMongoMockClient()
+    server.db = server.client[os.environ["DB_NAME"]]
+    return server
+
+
+def metric(samples, unit: str, higher_is_better: bool) -> dict:
+    samples = np.asarray(samples, dtype=float)
+    return {
+        "value": float(np.median(samples)),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "min": float(samples.min()),
+        "max": float(samples.max()),
+        "samples": len(samples),
+    }
+
+
+def timed(call):
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started
+
+
+def post(client, path: str, body: dict) -> dict:
+    response = client.post(path, json=body)
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} failed with {response.status_code}: {response.text}")
+    return response.json()
+
+
+def bench_scan(client, pid: int, repeat: int) -> dict:
+    """Exact value scans over every writable region"""
+    throughput, latency = [], []
+    for _ in range(repeat):
+        result, elapsed = timed(lambda: post(client, "/api/memory/scan", {
+            "pid": pid, "value": 1337133, "data_type": "int32", "writable_only": True, "max_results": 100,
+        }))
+        throughput.append(result["bytes_scanned"] / elapsed / 1e9)
+        latency.append(elapsed * 1000)
+    return {"scan_gbps": metric(throughput, "GB/s", True), "scan_ms": metric(latency, "ms", False)}
+
+
+def bench_sparse_scan(client, pid: int, reserve: dict, repeat: int) -> dict:
+    """Scans for the marker planted in the sparse mapping, reading every page or only resident ones"""
+    marker = reserve["marker"]
+    full, resident = [], []
+    for samples, resident_only in ((full, False), (resident, True)):
+        for _ in range(repeat):
+            _, elapsed = timed(lambda: post(client, "/api/memory/scan", {
+                "pid": pid, "value": marker["value"], "data_type": marker["data_type"], "writable_only": True,
+                "resident_only": resident_only, "max_results": 0,
+            }))
+            samples.append(elapsed * 1000)
+    return {"sparse_scan_ms": metric(full, "ms", False), "resident_scan_ms": metric(resident, "ms", False)}
+
+
+def bench_next_scan(client, pid: int, repeat: int) -> dict:
+    """First scan for a common byte value, then narrowing re-reads of its candidates"""
+    first, narrow = [], []
+    for _ in range(repeat):
+        session, elapsed = timed(lambda: post(client, "/api/memory/scan-sessions", {
+            "pid": pid, "value": 7, "data_type": "int8", "writable_only": True, "max_results": 0,
+        }))
+        first.append(elapsed * 1000)
+        _, elapsed = timed(lambda: post(client, f"/api/memory/scan-sessions/{session['session_id']}/next", {
+            "comparison": "unchanged", "max_results": 0,
+        }))
+        narrow.append(elapsed * 1000)
+        client.delete(f"/api/memory/scan-sessions/{session['session_id']}")
+    return {
+        "session_first_scan_ms": metric(first, "ms", False),
+        "next_scan_ms": metric(narrow, "ms", False),
+    }
+
+
+def bench_batch(client, pid: int, heap: dict, seed: int, repeat: int) -> dict:
+    """Batched reads and writes of random aligned addresses in the heap"""
+    rng = np.random.default_rng(seed)
+    reads, writes = [], []
+    for _ in range(repeat):
+        addresses = (heap["heap_address"] + rng.integers(0, heap["heap_size"] // 4, BATCH_ENTRIES) * 4).tolist()
+        result, elapsed = timed(lambda: post(client, "/api/memory/read-batch", {
+            "pid": pid, "entries": [{"address": address, "data_type": "int32"} for address in addresses],
+        }))
+        reads.append(BATCH_ENTRIES / elapsed)
+        # Write back what was read, so the heap stays as seeded
+        entries = [
+            {"address": address, "data_type": "int32", "value": value}
+            for address, value in dict(zip(addresses, result["values"])).items()
+        ]
+        _, elapsed = timed(lambda: post(client, "/api/memory/write-batch", {"pid": pid, "entries": entries}))
+        writes.append(len(entries) / elapsed)
+    return {"batch_read_ops": metric(reads, "values/s", True), "batch_write_ops": metric(writes, "values/s", True)}
+
+
+def bench_discovery(client, repeat: int) -> dict:
+    """A /proc walk from an empty cache, then passes that only diff against it"""
+    from process_discovery import ProcessDiscovery
+    from process_matcher import ProcessMatcher
+
+    cold, warm, endpoint = [], [], []
+    for _ in range(repeat):
+        discovery = ProcessDiscovery(matcher=ProcessMatcher(), interval=0)
+        _, elapsed = timed(discovery.refresh)
+        cold.append(elapsed * 1000)
+        _, elapsed = timed(discovery.refresh)
+        warm.append(elapsed * 1000)
+        _, elapsed = timed(lambda: client.get("/api/processes", params={"refresh": True}))
+        endpoint.append(elapsed * 1000)
+    return {
+        "discovery_cold_ms": metric(cold, "ms", False),
+        "discovery_warm_ms": metric(warm, "ms", False),
+        "processes_endpoint_ms": metric(endpoint, "ms", False),
+    }
+
+
+def bench_event_bus(subscribers: int, repeat: int) -> dict:
+    """Deliveries per second from one publisher to many in-process subscribers"""
+    from event_bus import EventBus
+
+    async def run():
+        bus = EventBus()
+        bus.start()
+        subscriptions = [bus.subscribe() for _ in range(subscribers)]
+
+        async def drain(subscription):
+            for _ in range(FANOUT_EVENTS):
+                await subscription.next()
+
+        rates = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            consumers = [asyncio.create_task(drain(subscription)) for subscription in subscriptions]
+            for index in range(FANOUT_EVENTS):
+                bus.publish("benchmark", index=index)
+            await asyncio.gather(*consumers)
+            rates.append(FANOUT_EVENTS * subscribers / (time.perf_counter() - started))
+        bus.close()
+        return rates
+
+    return {"event_bus_deliveries": metric(asyncio.run(run()), "events/s", True)}
+
+
+def bench_websocket_fanout(server, client, clients: int, repeat: int) -> dict:
+    """Events per second received over /api/ws/events by several clients"""
+    rates = []
+    with contextlib.ExitStack() as stack:
+        sockets = [stack.enter_context(client.websocket_connect("/api/ws/events")) for _ in range(clients)]
+        for socket in sockets:
+            socket.receive_text()  # snapshot
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for index in range(FANOUT_EVENTS):
+                server.events.publish("benchmark", index=index)
+            for socket in sockets:
+                for _ in range(FANOUT_EVENTS):
+                    socket.receive_text()
+            rates.append(FANOUT_EVENTS * clients / (time.perf_counter() - started))
+    return {"websocket_deliveries": metric(rates, "events/s", True)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(args) -> dict:
+    from fastapi.testclient import TestClient
+
+    server = load_server()
+    results = {}
+    with TestClient(server.app) as client, fixture_process(args.heap_mb, args.seed, args.reserve_mb) as heap:
+        pid = heap["pid"]
+        post(client, f"/api/processes/{pid}/connect", {})
+        steps = [
+            ("scan", lambda: bench_scan(client, pid, args.repeat)),
+            ("next scan", lambda: bench_next_scan(client, pid, args.repeat)),
+            ("batch access", lambda: bench_batch(client, pid, heap, args.seed, args.repeat)),
+            ("discovery", lambda: bench_discovery(client, args.repeat)),
+            ("event bus", lambda: bench_event_bus(args.subscribers, args.repeat)),
+            ("websocket fan-out", lambda: bench_websocket_fanout(server, client, args.clients, args.repeat)),
+        ]
+        if heap["reserve"]:
+            steps.insert(1, ("sparse scan", lambda: bench_sparse_scan(client, pid, heap["reserve"], args.repeat)))
+        for name, step in steps:
+            logger.info(f"Running {name} benchmark")
+            results.update(step())
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "heap_mb": args.heap_mb,
+            "reserve_mb": args.reserve_mb,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print the change of every metric against ``baseline``; True if none regressed"""
+    ok = True
+    for key in ("heap_mb", "reserve_mb", "seed"):
+        if current["meta"][key] != baseline["meta"].get(key):
+            print(f"warning: {key} differs from the baseline ({baseline['meta'].get(key)} vs {current['meta'][key]})")
+    print(f"{'metric':<28}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or not before["value"]:
+            print(f"{name:<28}{'-':>14}{result['value']:>14.3f}{'new':>10}")
+            continue
+        change = result["value"] / before["value"] - 1
+        worse = -change if result["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            flag, ok = "  REGRESSION", False
+        print(f"{name:<28}{before['value']:>14.3f}{result['value']:>14.3f}{change:>+10.1%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backend against a synthetic target process")
+    parser.add_argument("--heap-mb", type=int, default=256, help="seeded heap size of the target in MiB")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--reserve-mb", type=int, default=0, help="size of a sparsely touched mapping in the target")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per metric; the median is reported")
+    parser.add_argument("--subscribers", type=int, default=100, help="in-process event bus subscribers")
+    parser.add_argument("--clients", type=int, default=4, help="WebSocket clients for the fan-out benchmark")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline:
+            if not compare(report, json.load(baseline), args.threshold):
+                sys.exit(1)
+    elif not args.output:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -27,19 +27,77 @@ const Dashboard = () => {
 
   useEffect(() => {
     fetchDashboardData();
-    const interval = setInterval(fetchDashboardData, 5000);
-    return () => clearInterval(interval);
+    return connectEvents();
   }, []);
 
+  // Status changes are pushed by the server; the page only re-fetches after a reconnect
+  const connectEvents = () => {
+    let socket;
+    let retryTimer;
+    let retryDelay = 1000;
+    let closed = false;
+
+    const open = () => {
+      socket = new WebSocket(`${BACKEND_URL.replace(/^http/, 'ws')}/api/ws/events`);
+      socket.onopen = () => {
+        retryDelay = 1000;
+      };
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        switch (event.type) {
+          case 'snapshot':
+            setStats({
+              connectedProcesses: event.connected_processes,
+              activeSessions: event.sessions,
+              automationRunning: event.automation_active,
+              systemStatus: event.status
+            });
+            setLoading(false);
+            break;
+          case 'status':
+            setStats((current) => ({
+              ...current,
+              connectedProcesses: event.connected_processes,
+              automationRunning: event.automation_active,
+              systemStatus: event.status
+            }));
+            break;
+          case 'session.created':
+            setStats((current) => ({ ...current, activeSessions: current.activeSessions + 1 }));
+            break;
+          case 'resync':
+            fetchDashboardData();
+            break;
+          default:
+            break;
+        }
+      };
+      socket.onclose = () => {
+        if (closed) return;
+        setStats((current) => ({ ...current, systemStatus: 'reconnecting' }));
+        retryTimer = setTimeout(open, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    open();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket.close();
+    };
+  };
+
   const fetchDashboardData = async () => {
     try {
       // Fetch API status
       const statusResponse = await axios.get(`${API}/status`);
-      const sessionsResponse = await axios.get(`${API}/sessions`);
+      // Only the total is needed; the first page carries it in X-Total-Count
+      const sessionsResponse = await axios.get(`${API}/sessions`, { params: { limit: 1, fields: 'id' } });
       
       setStats({
         connectedProcesses: statusResponse.data.connected_processes,
-        activeSessions: sessionsResponse.data.length,
+        activeSessions: Number(sessionsResponse.headers['x-total-count']),
         automationRunning: statusResponse.data.automation_active,
         systemStatus: statusResponse.data.status
       });
@@ -23,6 +23,7 @@ const MemoryEditor = () => {
   const [dataType, setDataType] = useState('int');
   const [scanResults, setScanResults] = useState([]);
   const [scanning, setScanning] = useState(false);
+  const [refreshing, setRefreshing] = useState(false);
   const [editingAddress, setEditingAddress] = useState(null);
   const [newValue, setNewValue] = useState('');
 
@@ -55,8 +56,17 @@ const MemoryEditor = () => {
         data_type: dataType
       });
       
-      setScanResults(response.data.addresses);
-      toast.success(`Found ${response.data.addresses.length} memory addresses`);
+      const { addresses, count, truncated, elapsed_ms } = response.data;
+      setScanResults(addresses.map((address, index) => ({
+        address: `0x${address.toString(16).toUpperCase()}`,
+        value: searchValue,
+        data_type: dataType,
+        description: `Scan match ${index + 1}`
+      })));
+      toast.success(
+        `Found ${count} memory addresses in ${elapsed_ms} ms` +
+        (truncated ? ` (showing first ${addresses.length})` : '')
+      );
     } catch (error) {
       console.error('Error scanning memory:', error);
       toast.error('Memory scan failed');
@@ -75,12 +85,13 @@ const MemoryEditor = () => {
       const value = dataType === 'int' ? parseInt(newValue) : 
                     dataType === 'float' ? parseFloat(newValue) : newValue;
       
-      await axios.post(`${API}/memory/edit`, {
+      const response = await axios.post(`${API}/memory/write-batch`, {
         pid: parseInt(selectedProcess),
-        address: address,
-        new_value: value,
-        data_type: dataType
+        entries: [{ address, value, data_type: dataType }]
       });
+      if (response.data.failed.length > 0) {
+        throw new Error(`Write to ${address} failed`);
+      }
 
       // Update local state
       setScanResults(prev => prev.map(result => 
@@ -96,6 +107,35 @@ const MemoryEditor = () => {
     }
   };
 
+  const valueSize = () => {
+    if (dataType === 'string') return new TextEncoder().encode(searchValue).length;
+    if (dataType === 'bytes') return searchValue.replace(/\s+/g, '').length / 2;
+    return undefined;
+  };
+
+  const refreshValues = async () => {
+    if (!selectedProcess || scanResults.length === 0) return;
+
+    try {
+      setRefreshing(true);
+      const size = valueSize();
+      const response = await axios.post(`${API}/memory/read-batch`, {
+        pid: parseInt(selectedProcess),
+        entries: scanResults.map(result => ({ address: result.address, data_type: result.data_type, size }))
+      });
+      const { values, valid } = response.data;
+      setScanResults(prev => prev.map((result, index) => ({
+        ...result,
+        value: valid[index] ? values[index] : '??'
+      })));
+    } catch (error) {
+      console.error('Error reading memory:', error);
+      toast.error('Failed to refresh values');
+    } finally {
+      setRefreshing(false);
+    }
+  };
+
   const AddressRow = ({ address }) => {
     const isEditing = editingAddress === address.address;
     
@@ -258,9 +298,19 @@ const MemoryEditor = () => {
       {/* Results Table */}
       {scanResults.length > 0 ? (
         <div className="bg-gray-800 border border-gray-700 rounded-xl overflow-hidden">
-          <div className="px-6 py-4 border-b border-gray-700">
-            <h2 className="text-xl font-semibold text-white">Scan Results</h2>
-            <p className="text-gray-400 text-sm">Found {scanResults.length} matching addresses</p>
+          <div className="px-6 py-4 border-b border-gray-700 flex items-center justify-between">
+            <div>
+              <h2 className="text-xl font-semibold text-white">Scan Results</h2>
+              <p className="text-gray-400 text-sm">Found {scanResults.length} matching addresses</p>
+            </div>
+            <button
+              onClick={refreshValues}
+              disabled={refreshing}
+              className="flex items-center space-x-2 bg-gray-700 hover:bg-gray-600 disabled:bg-gray-600 text-white px-3 py-2 rounded-lg transition-colors"
+            >
+              <RefreshCw className={`w-4 h-4 ${refreshing ? 'animate-spin' : ''}`} />
+              <span>Refresh Values</span>
+            </button>
           </div>
           
           <div className="overflow-x-auto">
@@ -0,0 +1,85 @@
+"""Shared fixtures: a running scan target and an API client on an in-memory Mongo"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+TESTS_DIR = Path(__file__).parent
+BACKEND_DIR = TESTS_DIR.parent / "backend"
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "hack_tool_test")
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+class FixtureTarget:
+    """A ``fixture_target.py`` process and the addresses it reported"""
+
+    def __init__(self, *args: str):
+        self.process = subprocess.Popen(
+            [sys.executable, str(TESTS_DIR / "fixture_target.py"), *args],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        self.info = json.loads(self.process.stdout.readline())
+        self.pid = self.info["pid"]
+        self.values = self.info["values"]
+
+    def address(self, name: str) -> int:
+        return self.values[name]["address"]
+
+    def set(self, name: str, value):
+        """Change a planted value from inside the target"""
+        self.process.stdin.write(json.dumps({"op": "set", "name": name, "value": value}) + "\n")
+        self.process.stdin.flush()
+        assert json.loads(self.process.stdout.readline())["ok"]
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=10)
+
+
+@pytest.fixture(scope="session")
+def server():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import server
+
+    server.client = mongomock_motor.AsyncMongoMockClient()
+    server.db = server.client[os.environ["DB_NAME"]]
+    return server
+
+
+@pytest.fixture(scope="session")
+def api(server):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def spawn_target():
+    """Start extra, unconnected fixture targets; they are stopped after the test"""
+    started = []
+
+    def spawn(*args: str) -> FixtureTarget:
+        started.append(FixtureTarget(*args))
+        return started[-1]
+
+    yield spawn
+    for target in started:
+        if target.process.poll() is None:
+            target.close()
+
+
+@pytest.fixture(scope="module")
+def target(api):
+    """A small fixture target, connected for the tests of one module"""
+    target = FixtureTarget("--heap-mb", "4")
+    response = api.post(f"/api/processes/{target.pid}/connect")
+    assert response.status_code == 200, response.text
+    yield target
+    api.post(f"/api/processes/{target.pid}/disconnect")
+    target.close()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Scan target process holding known values at known addresses
+
+Run ``python tests/fixture_target.py --heap-mb 64`` and read the first line of
+stdout: a JSON document with the pid, the heap address and the address of
+every planted value. The process then reads JSON commands from stdin, one per
+line, and exits on EOF:
+
+    {"op": "set", "name": "health", "value": 75}
+    {"op": "set", "address": 140000000000, "data_type": "int32", "value": 1}
+
+A file-backed mapping named ``fixture-module.bin`` stands in for a loaded
+module; ``pointer_chain`` in the first line leads from it to ``health``.
+
+``--reserve-mb`` adds a large anonymous mapping of which only one page per
+MiB is touched, each holding ``RESERVE_MARKER``, like a sparse game heap.
+"""
+import argparse
+import ctypes
+import json
+import mmap
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+PLANTED = {
+    "health": ("int32", 1337133),
+    "gold": ("int64", 9000000000001),
+    "speed": ("float32", 13.375),
+    "ratio": ("float64", 0.0078125),
+    "level": ("int16", 31337),
+    "flag": ("int8", -77),
+    "signature": ("bytes", "de ad be ef 13 37 c0 de"),
+    "player": ("string", "fixture-player-name"),
+}
+
+RESERVE_MARKER = ("int32", 424242)
+RESERVE_STRIDE = 1024 * 1024
+
+DTYPES = {
+    "int8": "<i1", "int16": "<i2", "int32": "<i4", "int64": "<i8",
+    "float32": "<f4", "float64": "<f8",
+}
+
+
+def encode(data_type, value):
+    if data_type == "bytes":
+        return bytes.fromhex(value)
+    if data_type == "string":
+        return value.encode("utf-8")
+    return np.array([value], dtype=DTYPES[data_type]).tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--heap-mb", type=int, default=64, help="size of the seeded heap in MiB")
+    parser.add_argument("--seed", type=int, default=1234, help="seed for the random heap contents")
+    parser.add_argument("--reserve-mb", type=int, default=0, help="size of the sparsely touched mapping in MiB")
+    args = parser.parse_args()
+
+    size = args.heap_mb * 1024 * 1024
+    heap = np.random.default_rng(args.seed).integers(0, 256, size=size, dtype=np.uint8)
+    base = heap.ctypes.data
+
+    # Plant each value on its own page, 64 bytes in, so every value is aligned.
+    addresses = {}
+    for index, (name, (data_type, value)) in enumerate(PLANTED.items()):
+        offset = (index + 1) * 4096 + 64
+        raw = encode(data_type, value)
+        heap[offset:offset + len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+        addresses[name] = {"address": base + offset, "data_type": data_type, "value": value}
+
+    # module+0x40 -> struct at heap page 32; struct+0x10 -> health-0x18
+    module_dir = tempfile.mkdtemp(prefix="fixture-")
+    module_path = os.path.join(module_dir, "fixture-module.bin")
+    module = np.memmap(module_path, dtype=np.uint8, mode="w+", shape=(4 * 4096,))
+    struct = 32 * 4096
+    module[0x40:0x48] = np.frombuffer(encode("int64", base + struct), dtype=np.uint8)
+    heap[struct + 0x10:struct + 0x18] = np.frombuffer(encode("int64", addresses["health"]["address"] - 0x18), dtype=np.uint8)
+
+    reserve = None
+    if args.reserve_mb:
+        reserve = mmap.mmap(-1, args.reserve_mb * 1024 * 1024, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+        marker = encode(*RESERVE_MARKER)
+        for offset in range(0, len(reserve), RESERVE_STRIDE):
+            reserve[offset + 64:offset + 64 + len(marker)] = marker
+    reserve_address = ctypes.addressof(ctypes.c_char.from_buffer(reserve)) if reserve is not None else None
+
+    print(json.dumps({
+        "pid": os.getpid(),
+        "heap_address": base,
+        "heap_size": size,
+        "values": addresses,
+        "module": {"path": module_path, "address": module.ctypes.data},
+        "pointer_chain": {"module": "fixture-module.bin", "base_offset": "0x40", "offsets": ["0x10", "0x18"],
+                          "target": "health"},
+        "reserve": {
+            "address": reserve_address,
+            "size": len(reserve),
+            "touched": len(reserve) // RESERVE_STRIDE,
+            "marker": {"data_type": RESERVE_MARKER[0], "value": RESERVE_MARKER[1]},
+        } if reserve is not None else None,
+    }), flush=True)
+
+    for line in sys.stdin:
+        command = json.loads(line)
+        if command.get("op") == "set":
+            planted = addresses.get(command.get("name"), {})
+            address = command.get("address", planted.get("address"))
+            data_type = command.get("data_type", planted.get("data_type"))
+            raw = encode(data_type, command["value"])
+            ctypes.memmove(address, raw, len(raw))
+            if command.get("name") in addresses:
+                addresses[command["name"]]["value"] = command["value"]
+        print(json.dumps({"ok": True}), flush=True)
+
+    del module
+    os.unlink(module_path)
+    os.rmdir(module_dir)
+
+
+if __name__ == "__main__":
+    main()
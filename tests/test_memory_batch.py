@@ -0,0 +1,88 @@
+"""Coalesced batch reads and vectored batch writes"""
+import pytest
+
+NUMERIC = ["health", "gold", "speed", "ratio", "level", "flag"]
+
+
+def read(api, target, entries):
+    response = api.post("/api/memory/read-batch", json={"pid": target.pid, "entries": entries})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_read_batch_returns_planted_values_in_request_order(api, target):
+    names = list(reversed(NUMERIC))
+    result = read(api, target, [
+        {"address": hex(target.address(name)), "data_type": target.values[name]["data_type"]} for name in names
+    ])
+    assert result["values"] == [target.values[name]["value"] for name in names]
+    assert all(result["valid"])
+
+
+def test_read_batch_decodes_strings_and_bytes(api, target):
+    player, signature = target.values["player"], target.values["signature"]
+    result = read(api, target, [
+        {"address": player["address"], "data_type": "string", "size": len(player["value"])},
+        {"address": signature["address"], "data_type": "bytes", "size": 8},
+    ])
+    assert result["values"] == [player["value"], signature["value"].replace(" ", "")]
+
+
+def test_read_batch_marks_unreadable_addresses(api, target):
+    result = read(api, target, [
+        {"address": target.address("health"), "data_type": "int32"},
+        {"address": 8, "data_type": "int32"},
+    ])
+    assert result["valid"] == [True, False]
+    assert result["values"][1] is None
+
+
+def test_batch_endpoints_reject_negative_addresses(api, target):
+    response = api.post("/api/memory/read-batch", json={
+        "pid": target.pid, "entries": [{"address": -8, "data_type": "int32"}],
+    })
+    assert response.status_code == 400
+    response = api.post("/api/memory/write-batch", json={
+        "pid": target.pid, "entries": [{"address": "-0x10", "data_type": "int32", "value": 1}],
+    })
+    assert response.status_code == 400
+
+
+def test_read_batch_requires_size_for_strings(api, target):
+    response = api.post("/api/memory/read-batch", json={
+        "pid": target.pid, "entries": [{"address": target.address("player"), "data_type": "string"}],
+    })
+    assert response.status_code == 400
+
+
+def test_write_batch_merges_adjacent_entries(api, target):
+    base = target.info["heap_address"] + 64 * 4096
+    entries = [{"address": base + 4 * index, "data_type": "int32", "value": index * 7} for index in range(16)]
+    response = api.post("/api/memory/write-batch", json={"pid": target.pid, "entries": entries})
+    assert response.status_code == 200, response.text
+    written = response.json()
+    assert written["written"] == 16
+    assert written["failed"] == []
+    assert written["syscalls"] == 1
+
+    result = read(api, target, [{"address": entry["address"], "data_type": "int32"} for entry in entries])
+    assert result["values"] == [entry["value"] for entry in entries]
+
+
+def test_write_batch_rejects_overlapping_entries(api, target):
+    address = target.address("gold")
+    response = api.post("/api/memory/write-batch", json={"pid": target.pid, "entries": [
+        {"address": address, "data_type": "int64", "value": 1},
+        {"address": address + 4, "data_type": "int32", "value": 2},
+    ]})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("name, value", [("speed", 2.5), ("level", -12)])
+def test_write_batch_round_trip(api, target, name, value):
+    planted = target.values[name]
+    response = api.post("/api/memory/write-batch", json={"pid": target.pid, "entries": [
+        {"address": planted["address"], "data_type": planted["data_type"], "value": value},
+    ]})
+    assert response.json()["written"] == 1
+    assert read(api, target, [{"address": planted["address"], "data_type": planted["data_type"]}])["values"] == [value]
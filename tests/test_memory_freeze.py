@@ -0,0 +1,132 @@
+"""Freeze engine ticks and writes on the shared deadline scheduler"""
+import threading
+import time
+
+import pytest
+
+from deadline_scheduler import DeadlineScheduler
+from memory_freeze import FreezeEngine, FreezeList, FrozenValue
+from memory_scanner import ProcessMemory
+from process_registry import ProcessRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = ProcessRegistry()
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def engine():
+    engine = FreezeEngine()
+    yield engine
+    engine.shutdown()
+
+
+def frozen(target, name, value):
+    return FrozenValue.from_request({"address": target.address(name), "data_type": target.values[name]["data_type"],
+                                     "value": value})
+
+
+def read(target, name):
+    size = {"int16": 2, "int32": 4, "int64": 8}[target.values[name]["data_type"]]
+    with ProcessMemory(target.pid) as memory:
+        return int.from_bytes(memory.read(target.address(name), size), "little", signed=True)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+class Item:
+    def __init__(self, name, repeat=0):
+        self.name = name
+        self.repeat = repeat
+        self.stopped = False
+
+
+def test_scheduler_fires_in_deadline_order():
+    fired = []
+    done = threading.Event()
+
+    def fire(item, deadline):
+        fired.append(item.name)
+        if item.repeat:
+            item.repeat -= 1
+            return deadline + 0.01
+        if len(fired) == 5:
+            done.set()
+        return None
+
+    scheduler = DeadlineScheduler("test-scheduler", fire)
+    now = time.monotonic()
+    stopped = Item("stopped")
+    scheduler.schedule(Item("c"), now + 0.03)
+    scheduler.schedule(Item("a", repeat=2), now + 0.005)
+    scheduler.schedule(stopped, now + 0.01)
+    scheduler.schedule(Item("b"), now + 0.02)
+    stopped.stopped = True
+    assert done.wait(2)
+    assert fired == ["a", "a", "b", "a", "c"]
+    assert scheduler.shutdown() == []
+
+
+def test_adjacent_values_share_one_write(registry, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    freeze_list = FreezeList(registry.connect(target.pid))
+    base = target.info["heap_address"] + 16 * 4096
+    freeze_list.update([FrozenValue.from_request({"address": base + 4 * i, "data_type": "int32", "value": i})
+                        for i in range(8)] + [frozen(target, "health", 1)])
+    assert freeze_list.status()["syscalls_per_tick"] == 2
+
+    freeze_list.tick(time.monotonic())
+    assert (freeze_list.writes, freeze_list.failed, freeze_list.syscalls) == (9, 0, 2)
+    assert read(target, "health") == 1
+
+
+def test_late_ticks_are_skipped_and_counted(registry, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    freeze_list = FreezeList(registry.connect(target.pid), rate=100)
+    assert freeze_list.next_deadline(10.0, now=10.005) == pytest.approx(10.01)
+    assert freeze_list.next_deadline(10.0, now=10.055) == pytest.approx(10.06)
+    assert freeze_list.missed == 5
+
+
+def test_frozen_value_is_written_back(registry, engine, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    freeze_list = engine.freeze(registry.connect(target.pid), [frozen(target, "health", 4242)], rate=200)
+    wait_for(lambda: read(target, "health") == 4242)
+    target.set("health", 1)
+    wait_for(lambda: read(target, "health") == 4242)
+    assert freeze_list.ticks > 1
+    assert freeze_list.failed == 0
+
+    assert engine.unfreeze(target.pid) == 1
+    assert freeze_list.stopped
+    ticks = freeze_list.ticks
+    target.set("health", 7)
+    time.sleep(0.05)
+    assert read(target, "health") == 7
+    assert freeze_list.ticks <= ticks + 1
+
+
+def test_rate_change_keeps_the_list(registry, engine, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    handle = registry.connect(target.pid)
+    freeze_list = engine.freeze(handle, [frozen(target, "health", 1)], rate=50)
+    assert engine.freeze(handle, [frozen(target, "level", 2)], rate=100) is freeze_list
+    assert freeze_list.rate == 100
+    assert sorted(freeze_list.values) == sorted([target.address("health"), target.address("level")])
+
+
+def test_exited_process_drops_its_list(registry, engine, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    freeze_list = engine.freeze(registry.connect(target.pid), [frozen(target, "health", 1)], rate=200)
+    wait_for(lambda: freeze_list.ticks > 0)
+    target.close()
+    wait_for(lambda: freeze_list.stopped)
+    assert engine.get(target.pid) is None
@@ -0,0 +1,91 @@
+"""Coalesced scattered reads and address parsing"""
+import numpy as np
+import pytest
+
+from memory_io import MAX_SPAN, PAGE_SIZE, parse_address, parse_offset, plan_spans, read_scattered
+
+
+class FakeMemory:
+    """Byte image of an address space in which some pages cannot be read"""
+
+    pid = 0
+
+    def __init__(self, data: np.ndarray, holes):
+        self.data = data
+        self.holes = set(holes)
+
+    def readinto(self, buf: memoryview, address: int) -> int:
+        read = 0
+        while read < len(buf) and address + read < self.data.size:
+            if (address + read) // PAGE_SIZE in self.holes:
+                if not read:
+                    raise OSError(5, "Input/output error")
+                break
+            chunk = min(len(buf) - read, PAGE_SIZE - (address + read) % PAGE_SIZE, self.data.size - address - read)
+            buf[read:read + chunk] = self.data[address + read:address + read + chunk]
+            read += chunk
+        return read
+
+
+@pytest.fixture
+def image():
+    return np.random.default_rng(7).integers(0, 256, size=64 * PAGE_SIZE, dtype=np.uint8)
+
+
+def expected(image, holes, addresses, sizes):
+    readable = [all(page not in holes for page in range(a // PAGE_SIZE, (a + s - 1) // PAGE_SIZE + 1))
+                for a, s in zip(addresses, sizes)]
+    return [image[a:a + s].tobytes() for a, s in zip(addresses, sizes)], readable
+
+
+def entries(buffer, offsets, sizes):
+    return [buffer[offset:offset + size].tobytes() for offset, size in zip(offsets.tolist(), sizes)]
+
+
+def test_read_scattered_matches_per_entry_reads(image):
+    holes = {3, 10, 11, 40}
+    rng = np.random.default_rng(1)
+    addresses = np.sort(rng.choice(image.size - 16, size=3000, replace=False))
+    sizes = rng.choice([1, 2, 4, 8, 16], size=addresses.size)
+
+    buffer, offsets, valid = read_scattered(FakeMemory(image, holes), addresses, sizes)
+
+    values, readable = expected(image, holes, addresses.tolist(), sizes.tolist())
+    assert valid.tolist() == readable
+    got = entries(buffer, offsets, sizes.tolist())
+    assert [g for g, ok in zip(got, readable) if ok] == [v for v, ok in zip(values, readable) if ok]
+
+
+def test_read_scattered_with_every_page_unreadable(image):
+    addresses = np.arange(0, image.size, 64, dtype=np.uint64)
+    _, _, valid = read_scattered(FakeMemory(image, range(64)), addresses, 4)
+    assert not valid.any()
+
+
+def test_read_scattered_entries_straddling_a_bad_page(image):
+    addresses = np.array([PAGE_SIZE - 2, 2 * PAGE_SIZE - 4, 2 * PAGE_SIZE + 8], dtype=np.uint64)
+    buffer, offsets, valid = read_scattered(FakeMemory(image, {1}), addresses, 4)
+    assert valid.tolist() == [False, False, True]
+    assert buffer[offsets[2]:offsets[2] + 4].tobytes() == image[2 * PAGE_SIZE + 8:2 * PAGE_SIZE + 12].tobytes()
+
+
+def test_read_scattered_without_addresses(image):
+    buffer, offsets, valid = read_scattered(FakeMemory(image, ()), np.empty(0, dtype=np.uint64), 4)
+    assert buffer.size == offsets.size == valid.size == 0
+
+
+def test_plan_spans_caps_span_length():
+    addresses = np.arange(0, 8 * MAX_SPAN, 4, dtype=np.uint64)
+    starts, ends, span_of = plan_spans(addresses, 4)
+    assert int((ends - starts).max()) <= MAX_SPAN + 4
+    assert np.all(addresses >= starts[span_of]) and np.all(addresses + np.uint64(4) <= ends[span_of])
+
+
+def test_parse_address():
+    assert parse_address("0x7FFE1000") == 0x7FFE1000
+    assert parse_address(4096) == 4096
+    with pytest.raises(ValueError):
+        parse_address(-8)
+    with pytest.raises(ValueError):
+        parse_address("-0x10")
+    assert parse_offset("-0x18") == -0x18
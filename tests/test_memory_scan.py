@@ -0,0 +1,55 @@
+"""Exact scans against the values planted in the fixture target"""
+import base64
+
+import numpy as np
+import pytest
+
+PLANTED = ["health", "gold", "speed", "ratio", "level", "flag", "signature", "player"]
+
+
+def scan(api, target, name, **options):
+    planted = target.values[name]
+    response = api.post("/api/memory/scan", json={
+        "pid": target.pid,
+        "value": planted["value"],
+        "data_type": planted["data_type"],
+        "max_results": 10_000_000,
+        **options,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("name", PLANTED)
+def test_scan_finds_planted_value(api, target, name):
+    result = scan(api, target, name)
+    assert not result["truncated"]
+    assert target.address(name) in result["addresses"]
+    assert result["bytes_scanned"] >= target.info["heap_size"]
+
+
+def test_scan_base64_encoding(api, target):
+    result = scan(api, target, "health", encoding="base64")
+    addresses = np.frombuffer(base64.b64decode(result["addresses"]), dtype="<u8")
+    assert addresses.size == result["count"]
+    assert target.address("health") in addresses.tolist()
+
+
+def test_scan_tolerance(api, target):
+    result = scan(api, target, "speed", value=13.3, tolerance=0.1)
+    assert target.address("speed") in result["addresses"]
+
+
+def test_scan_stores_every_match(api, target):
+    result = scan(api, target, "flag", max_results=10)
+    assert result["truncated"]
+    response = api.get(f"/api/memory/scan-results/{result['result_id']}", params={"limit": 10_000_000})
+    assert response.status_code == 200, response.text
+    stored = response.json()
+    assert stored["count"] == result["count"]
+    assert target.address("flag") in stored["addresses"]
+
+
+def test_scan_rejects_unconnected_process(api):
+    response = api.post("/api/memory/scan", json={"pid": 2 ** 22 + 1, "value": 1, "data_type": "int32"})
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+"""Keyset pagination of the listing endpoints"""
+import time
+
+
+def history(api, target, **params):
+    response = api.get(f"/api/memory/history/{target.pid}", params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def wait_for_history(api, target, count, timeout=5.0):
+    """Scan matches reach Mongo through the write-behind queue"""
+    deadline = time.monotonic() + timeout
+    while int(history(api, target, limit=1).headers["X-Total-Count"]) < count:
+        assert time.monotonic() < deadline, "memory history was never written"
+        time.sleep(0.05)
+
+
+def test_history_pages_follow_the_cursor(api, target):
+    planted = target.values["health"]
+    response = api.post("/api/memory/scan", json={
+        "pid": target.pid, "value": planted["value"], "data_type": "int32", "max_results": 5,
+    })
+    assert response.status_code == 200, response.text
+    recorded = min(response.json()["count"], 5)
+    wait_for_history(api, target, recorded)
+
+    first = history(api, target, limit=2)
+    assert first.headers["X-Total-Count"] == str(recorded)
+    pages, cursor = [first.json()], first.headers.get("X-Next-Cursor")
+    while cursor:
+        page = history(api, target, limit=2, cursor=cursor)
+        assert "X-Total-Count" not in page.headers
+        pages.append(page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+
+    assert [len(page) for page in pages[:-1]] == [2] * (len(pages) - 1)
+    ids = [record["id"] for page in pages for record in page]
+    assert len(ids) == len(set(ids)) == recorded
+
+
+def test_history_field_selection(api, target):
+    records = history(api, target, fields="address,value").json()
+    assert records
+    assert all(set(record) == {"address", "value"} for record in records)
+    assert api.get(f"/api/memory/history/{target.pid}", params={"fields": "nope"}).status_code == 400
+
+
+def test_history_etag_answers_304(api, target):
+    first = history(api, target, limit=2)
+    response = api.get(f"/api/memory/history/{target.pid}", params={"limit": 2},
+                       headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_bad_cursor_is_rejected(api, target):
+    response = api.get(f"/api/memory/history/{target.pid}", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
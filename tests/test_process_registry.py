@@ -0,0 +1,105 @@
+"""Pooled process handles, exit detection and pid reuse"""
+import asyncio
+import os
+
+import pytest
+
+import process_registry
+from process_registry import ProcessRegistry
+
+
+def test_connect_reuses_the_handle_and_its_descriptor(spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    registry = ProcessRegistry()
+    handle = registry.connect(target.pid)
+    assert registry.connect(target.pid) is handle
+    with handle.memory() as first, registry.memory(target.pid) as second:
+        assert first is second
+        assert first.read(target.address("health"), 4) == (1337133).to_bytes(4, "little")
+    assert handle.info()["open_descriptors"] == 1
+    assert handle.leases == 2
+    registry.close()
+
+
+def test_closed_handle_waits_for_its_leases(spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    registry = ProcessRegistry()
+    handle = registry.connect(target.pid)
+    with handle.memory() as memory:
+        assert registry.disconnect(target.pid) is handle
+        assert target.pid not in registry
+        # The lease still works until it is returned
+        assert len(memory.read(target.address("health"), 4)) == 4
+    assert memory.fd is None
+    with pytest.raises(ProcessLookupError):
+        with handle.memory():
+            pass
+
+
+def test_exit_is_noticed_without_a_lookup(spawn_target):
+    if not hasattr(os, "pidfd_open"):
+        pytest.skip("pidfd_open is not available")
+
+    async def test():
+        exited = asyncio.Event()
+        registry = ProcessRegistry(on_exit=lambda handle: exited.set())
+        registry.start()
+        target = spawn_target("--heap-mb", "1")
+        handle = registry.connect(target.pid)
+        target.close()
+        await asyncio.wait_for(exited.wait(), 5)
+        assert handle.closed
+        assert len(registry) == 0
+        assert registry.exits == 1
+        registry.close()
+
+    asyncio.run(test())
+
+
+def test_exit_is_noticed_on_lookup(spawn_target):
+    exits = []
+    registry = ProcessRegistry(on_exit=exits.append)
+    target = spawn_target("--heap-mb", "1")
+    handle = registry.connect(target.pid)
+    target.close()
+    assert registry.get(target.pid) is None
+    assert exits == [handle]
+    with pytest.raises(ProcessLookupError):
+        registry.memory(target.pid)
+
+
+def test_reused_pid_gets_a_new_handle(spawn_target, monkeypatch):
+    exits = []
+    registry = ProcessRegistry(on_exit=exits.append)
+    target = spawn_target("--heap-mb", "1")
+    old = registry.connect(target.pid)
+
+    # Another process with the same pid has a different start time
+    start_time = process_registry.read_start_time(target.pid)
+    monkeypatch.setattr(process_registry, "read_start_time", lambda pid: start_time + 1)
+    assert not old.alive()
+    assert target.pid not in registry
+    assert exits == [old]
+    with pytest.raises(ProcessLookupError):
+        with old.memory():
+            pass
+
+    new = registry.connect(target.pid)
+    assert new is not old
+    assert new.start_time == start_time + 1
+    registry.close()
+
+
+def test_reconnect_after_pid_reuse_replaces_the_handle(spawn_target, monkeypatch):
+    exits = []
+    registry = ProcessRegistry(on_exit=exits.append)
+    target = spawn_target("--heap-mb", "1")
+    old = registry.connect(target.pid)
+    start_time = process_registry.read_start_time(target.pid)
+    monkeypatch.setattr(process_registry, "read_start_time", lambda pid: start_time + 1)
+
+    new = registry.connect(target.pid)
+    assert new is not old
+    assert old.closed
+    assert exits == [old]
+    registry.close()
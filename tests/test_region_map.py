@@ -0,0 +1,113 @@
+"""Incremental RegionMap refresh checked against a full parse of the maps file"""
+import mmap
+import os
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from memory_scanner import parse_map_line, parse_maps
+from region_map import EMPTY_LAYOUT, RegionMap, _columns, _update
+
+PERMS = ["r--p", "rw-p", "r-xp", "---p", "rw-s"]
+PATHS = ["", "/usr/lib/libc.so.6", "/opt/game/bin/game", "[heap]", "[stack]", "/dev/shm/fixture (deleted)"]
+
+
+def maps_text(regions):
+    return "".join(f"{start:x}-{end:x} {perms} {0:08x} 00:00 0 {path}\n" for start, end, perms, path in regions)
+
+
+def full_parse(raw: bytes):
+    return [parse_map_line(line) for line in raw.decode().splitlines()]
+
+
+def random_edit(rng: random.Random, regions):
+    """Insert, remove or re-protect one mapping, keeping the list sorted and disjoint"""
+    regions = list(regions)
+    slot = rng.randrange(len(regions) + 1)
+    action = rng.choice(["insert", "remove", "protect"]) if regions else "insert"
+    if action == "insert":
+        low = regions[slot - 1][1] if slot else 0x1000
+        high = regions[slot][0] if slot < len(regions) else low + 0x100000
+        if high - low >= 0x2000:
+            start = low + 0x1000
+            regions.insert(slot, (start, start + 0x1000, rng.choice(PERMS), rng.choice(PATHS)))
+    elif action == "remove":
+        del regions[min(slot, len(regions) - 1)]
+    else:
+        start, end, _, path = regions[min(slot, len(regions) - 1)]
+        regions[min(slot, len(regions) - 1)] = (start, end, rng.choice(PERMS), path)
+    return regions
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_update_matches_full_parse(seed):
+    rng = random.Random(seed)
+    regions = [(0x400000 + i * 0x10000, 0x400000 + i * 0x10000 + 0x8000, rng.choice(PERMS), rng.choice(PATHS))
+               for i in range(60)]
+    layout = EMPTY_LAYOUT
+    for _ in range(40):
+        for _ in range(rng.randint(1, 3)):
+            regions = random_edit(rng, regions)
+        raw = maps_text(regions).encode()
+        layout, parsed = _update(layout, raw)
+        expected = full_parse(raw)
+        assert layout.regions == expected
+        for column, full in zip(layout[2:], _columns(expected)):
+            assert column.tolist() == full.tolist()
+        assert parsed <= len(expected)
+
+
+def test_refresh_matches_parse_maps(api, target):
+    regions = RegionMap(target.pid).refresh()
+    assert regions.regions == parse_maps(target.pid)
+    version = regions.version
+    assert regions.refresh().version == version
+    assert regions.find(target.address("health")) is not None
+
+
+def test_refresh_follows_new_mappings():
+    regions = RegionMap(os.getpid()).refresh()
+    mapping = mmap.mmap(-1, 16 * mmap.PAGESIZE)
+    address = np.frombuffer(mapping, dtype=np.uint8).ctypes.data
+    try:
+        regions.refresh()
+        assert regions.find(address) is not None
+        assert regions.regions == full_parse(regions._layout.raw)
+        assert regions.parsed < len(regions)
+    finally:
+        mapping.close()
+    regions.refresh()
+    found = regions.find(address)
+    assert found is None or found.size != 16 * mmap.PAGESIZE
+
+
+def test_readers_see_consistent_columns_during_refresh():
+    regions = RegionMap(os.getpid()).refresh()
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        while not stop.is_set():
+            mapping = mmap.mmap(-1, mmap.PAGESIZE)
+            regions.refresh()
+            mapping.close()
+            regions.refresh()
+
+    def read():
+        while not stop.is_set():
+            layout = regions._layout
+            if not (len(layout.regions) == layout.starts.size == layout.ends.size == layout.paths.size):
+                errors.append("columns out of step")
+            for region in regions.select("r"):
+                if regions.find(region.start) is None and regions._layout is layout:
+                    errors.append(f"{region.start:#x} missing")
+
+    threads = [threading.Thread(target=churn)] + [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    threading.Timer(1.0, stop.set).start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
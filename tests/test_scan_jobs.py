@@ -0,0 +1,147 @@
+"""Background scan jobs: progress, readable prefixes, cancellation and streaming"""
+import asyncio
+import json
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from memory_scanner import MemoryRegion
+from scan_jobs import ScanJob
+
+REGION = 1 << 20
+
+
+class FakeScanner:
+    """Hands out one future per task that the test resolves by hand"""
+
+    def __init__(self, tasks: int):
+        self.futures = [Future() for _ in range(tasks)]
+
+    def submit(self, pid, regions, pattern, aligned, resident_only):
+        return [[region] for region in regions], self.futures
+
+    def finish(self, index: int, *addresses: int):
+        self.futures[index].set_result((np.array(addresses, dtype=np.uint64), REGION, 0.001, 0))
+
+
+def start_job(tasks: int):
+    scanner = FakeScanner(tasks)
+    regions = [MemoryRegion(index * REGION, (index + 1) * REGION, "rw-p", 0, "") for index in range(tasks)]
+    job = ScanJob(pid=1, value=5, data_type="int32")
+    job.start(scanner, regions, pattern=None)
+    return job, scanner
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_progress_and_the_readable_prefix():
+    async def test():
+        job, scanner = start_job(3)
+        progress = []
+        collecting = asyncio.create_task(job.collect(on_progress=lambda running: progress.append(running.bytes_done)))
+
+        scanner.finish(1, 1 * REGION + 8, 1 * REGION + 16)
+        await settle()
+        status = job.status()
+        assert (status["tasks_done"], status["hits"], status["available"]) == (1, 2, 0)
+        assert status["progress"] == round(1 / 3, 4)
+        assert job.page().tolist() == []
+
+        scanner.finish(0, 64)
+        await settle()
+        assert job.status()["available"] == 3
+        assert job.page().tolist() == [64, REGION + 8, REGION + 16]
+
+        scanner.finish(2)
+        await collecting
+        assert job.state == "completed"
+        assert job.status()["progress"] == 1.0
+        assert progress[0] == REGION
+
+    asyncio.run(test())
+
+
+def test_cancel_keeps_finished_hits():
+    async def test():
+        job, scanner = start_job(3)
+        collecting = asyncio.create_task(job.collect())
+        scanner.finish(0, 64)
+        scanner.finish(2, 2 * REGION)
+        await settle()
+
+        assert job.cancel()
+        await collecting
+        assert job.state == "cancelled"
+        assert scanner.futures[1].cancelled()
+        assert job.page().tolist() == [64, 2 * REGION]
+        assert not job.cancel()
+
+    asyncio.run(test())
+
+
+def test_failed_task_fails_the_job():
+    async def test():
+        job, scanner = start_job(2)
+        collecting = asyncio.create_task(job.collect())
+        scanner.futures[0].set_exception(OSError("worker died"))
+        await collecting
+        assert job.state == "failed"
+        assert job.error == "worker died"
+        assert scanner.futures[1].cancelled()
+
+    asyncio.run(test())
+
+
+def test_stream_yields_hits_as_tasks_finish():
+    async def test():
+        job, scanner = start_job(2)
+        collecting = asyncio.create_task(job.collect())
+
+        async def read_all():
+            return [address for block in [block async for block in job.stream(batch=1)] for address in block.tolist()]
+
+        reading = asyncio.create_task(read_all())
+        scanner.finish(1, REGION + 4)
+        scanner.finish(0, 4, 8)
+        await collecting
+        assert await reading == [4, 8, REGION + 4]
+
+    asyncio.run(test())
+
+
+def wait_for_job(api, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        status = api.get(f"/api/memory/scan-jobs/{job_id}").json()
+        if status["state"] != "running":
+            return status
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_scan_job_finds_the_planted_value(api, target):
+    response = api.post("/api/memory/scan-jobs", json={
+        "pid": target.pid, "value": target.values["health"]["value"], "data_type": "int32",
+    })
+    assert response.status_code == 200, response.text
+    status = wait_for_job(api, response.json()["id"])
+    assert status["state"] == "completed"
+    assert status["bytes_done"] == status["total_bytes"]
+    assert status["available"] == status["hits"]
+
+    results = api.get(f"/api/memory/scan-jobs/{status['id']}/results", params={"limit": 10_000_000}).json()
+    assert results["complete"]
+    assert target.address("health") in results["addresses"]
+
+    stream = api.get(f"/api/memory/scan-jobs/{status['id']}/results", params={"format": "ndjson"})
+    assert [json.loads(line)["address"] for line in stream.text.splitlines()] == results["addresses"]
+    assert api.post(f"/api/memory/scan-jobs/{status['id']}/cancel").status_code == 400
+
+
+def test_scan_job_requires_a_connected_process(api):
+    response = api.post("/api/memory/scan-jobs", json={"pid": 2 ** 22 + 1, "value": 1, "data_type": "int32"})
+    assert response.status_code == 400
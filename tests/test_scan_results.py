@@ -0,0 +1,52 @@
+"""Retention of stored scan results"""
+import time
+
+from scan_results import MAX_STORED_RESULTS
+
+
+def scan(api, target):
+    response = api.post("/api/memory/scan", json={
+        "pid": target.pid, "value": target.values["health"]["value"], "data_type": "int32", "max_results": 1,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["result_id"]
+
+
+def wait_until_gone(api, result_ids, timeout=5.0):
+    """Deletions reach Mongo through the write-behind queue"""
+    deadline = time.monotonic() + timeout
+    remaining = list(result_ids)
+    while remaining:
+        remaining = [result_id for result_id in remaining
+                     if api.get(f"/api/memory/scan-results/{result_id}").status_code != 404]
+        assert time.monotonic() < deadline, f"{len(remaining)} scan results were never deleted"
+        time.sleep(0.05)
+
+
+def test_stored_results_keep_all_matches(api, target):
+    result_id = scan(api, target)
+    stored = api.get(f"/api/memory/scan-results/{result_id}").json()
+    assert target.address("health") in stored["addresses"]
+
+
+def test_only_the_newest_results_are_kept(api, target):
+    result_ids = [scan(api, target) for _ in range(MAX_STORED_RESULTS + 3)]
+    wait_until_gone(api, result_ids[:3])
+    for result_id in result_ids[3:]:
+        assert api.get(f"/api/memory/scan-results/{result_id}").status_code == 200
+
+
+def test_disconnect_drops_stored_results(api, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    assert api.post(f"/api/processes/{target.pid}/connect").status_code == 200
+    result_ids = [scan(api, target) for _ in range(2)]
+    assert api.post(f"/api/processes/{target.pid}/disconnect").status_code == 200
+    wait_until_gone(api, result_ids)
+
+
+def test_exit_drops_stored_results(api, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    assert api.post(f"/api/processes/{target.pid}/connect").status_code == 200
+    result_id = scan(api, target)
+    target.close()
+    wait_until_gone(api, [result_id])
@@ -0,0 +1,48 @@
+"""Next-scan narrowing for exact and unknown-initial-value sessions"""
+
+
+def start_session(api, target, **request):
+    response = api.post("/api/memory/scan-sessions", json={"pid": target.pid, "max_results": 10_000_000, **request})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def next_scan(api, session_id, **request):
+    response = api.post(f"/api/memory/scan-sessions/{session_id}/next", json={"max_results": 10_000_000, **request})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_exact_session_narrows_to_changed_value(api, target):
+    session = start_session(api, target, value=target.values["level"]["value"], data_type="int16")
+    assert target.address("level") in session["addresses"]
+
+    target.set("level", 31340)
+    increased = next_scan(api, session["session_id"], comparison="increased")
+    assert target.address("level") in increased["addresses"]
+    assert increased["count"] < session["count"]
+
+    equal = next_scan(api, session["session_id"], comparison="equal", value=31340)
+    assert target.address("level") in equal["addresses"]
+
+    response = api.get(f"/api/memory/scan-sessions/{session['session_id']}")
+    assert response.status_code == 200, response.text
+
+
+def test_unknown_session_finds_changed_value(api, target):
+    session = start_session(api, target, mode="unknown", data_type="int32")
+    assert session["mode"] == "snapshot"
+
+    target.set("health", target.values["health"]["value"] - 100)
+    decreased = next_scan(api, session["session_id"], comparison="decreased")
+    assert target.address("health") in decreased["addresses"]
+
+    unchanged = next_scan(api, session["session_id"], comparison="unchanged")
+    assert target.address("health") in unchanged["addresses"]
+
+
+def test_deleted_session_is_gone(api, target):
+    session = start_session(api, target, value=target.values["gold"]["value"], data_type="int64")
+    assert api.delete(f"/api/memory/scan-sessions/{session['session_id']}").status_code == 200
+    response = api.post(f"/api/memory/scan-sessions/{session['session_id']}/next", json={"comparison": "unchanged"})
+    assert response.status_code == 404
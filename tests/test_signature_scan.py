@@ -0,0 +1,61 @@
+"""Wildcard signature scans"""
+import threading
+
+import numpy as np
+
+from signature_scan import SignatureCache, compile_signature
+
+
+def signature_scan(api, target, signatures, **request):
+    response = api.post("/api/memory/signature-scan", json={
+        "pid": target.pid, "signatures": signatures, "executable_only": False, **request,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_signature_scan_finds_planted_bytes(api, target):
+    result = signature_scan(api, target, ["DE AD BE EF 13 37 C0 DE", "DE AD ?? EF 13 ?? C0 DE"])
+    for signature in result["results"]:
+        addresses = [int(hit["address"], 16) for hit in signature["addresses"]]
+        assert target.address("signature") in addresses, signature["signature"]
+
+
+def test_signature_scan_reports_each_signature(api, target):
+    result = signature_scan(api, target, ["DE AD BE EF 13 37 C0 DE", "66 69 78 74 75 72 65 2D 70 6C 61 79"])
+    assert [signature["count"] >= 1 for signature in result["results"]] == [True, True]
+    player = [int(hit["address"], 16) for hit in result["results"][1]["addresses"]]
+    assert target.address("player") in player
+
+
+def test_signature_scan_rejects_bad_signatures(api, target):
+    response = api.post("/api/memory/signature-scan", json={"pid": target.pid, "signatures": ["DE AD XY"]})
+    assert response.status_code == 400
+    response = api.post("/api/memory/signature-scan", json={"pid": target.pid, "signatures": []})
+    assert response.status_code == 400
+
+
+def test_signature_cache_is_shared_between_threads():
+    cache = SignatureCache(max_modules=4)
+    signatures = [compile_signature("DE AD ?? EF")]
+    offsets = {"DE AD ?? EF": np.array([16], dtype=np.uint64)}
+    errors = []
+
+    def hammer(worker):
+        try:
+            for round in range(2000):
+                build_id = f"build-{(worker + round) % 8}"
+                if cache.get(build_id, signatures, False) is None:
+                    cache.put(build_id, False, offsets)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    stats = cache.stats()
+    assert stats["modules"] <= 4
+    assert stats["hits"] + stats["misses"] == 8 * 2000
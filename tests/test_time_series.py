@@ -0,0 +1,119 @@
+"""Time-series rings, rollups, range queries and retired series"""
+import math
+import time
+
+import numpy as np
+import pytest
+
+from time_series import ColumnRing, RAW_COLUMNS, TimeSeriesStore, rollup
+
+# Whole seconds after any store a test creates; samples are never older than their store
+T0 = float(math.ceil(time.time())) + 60
+
+
+def fill(store, key, seconds, rate, start=T0, value=lambda t: t - T0):
+    """Record ``rate`` samples per second of ``key`` for ``seconds`` seconds"""
+    series = store.series_ids([key])
+    for t in np.arange(start, start + seconds, 1 / rate):
+        store.record(series, [value(t)], timestamp=t)
+
+
+def test_ring_keeps_the_newest_rows_in_order():
+    ring = ColumnRing(RAW_COLUMNS, 8)
+    for chunk in np.array_split(np.arange(20, dtype=np.float64), 6):
+        ring.append(t=chunk, series=np.zeros(chunk.size, dtype=np.uint32), value=chunk)
+    assert ring.ordered()["t"].tolist() == list(range(12, 20))
+    assert ring.evicted == 12
+    assert ring.oldest() == 12
+
+
+def test_rollup_per_series_and_second():
+    t = np.array([0.1, 0.5, 0.9, 1.2, 0.3])
+    series = np.array([0, 0, 0, 0, 1], dtype=np.uint32)
+    values = np.array([3.0, 1.0, 2.0, 7.0, 5.0])
+    order = np.argsort(t, kind="stable")
+    rows = rollup(t[order], series[order], values[order], 1.0)
+    assert rows["t"].tolist() == [0.0, 0.0, 1.0]
+    assert rows["series"].tolist() == [0, 1, 0]
+    assert rows["min"].tolist() == [1.0, 5.0, 7.0]
+    assert rows["max"].tolist() == [3.0, 5.0, 7.0]
+    assert rows["count"].tolist() == [3, 1, 1]
+
+
+def test_query_reads_raw_samples():
+    store = TimeSeriesStore()
+    fill(store, "a", 10, rate=8)
+    result = store.query("a", T0, T0 + 10, buckets=5)
+    assert result["t"] == [T0 + 2 * i for i in range(5)]
+    assert result["count"] == [16] * 5
+    assert result["min"] == pytest.approx([2 * i for i in range(5)])
+    assert result["max"] == pytest.approx([2 * i + 1.875 for i in range(5)])
+
+
+def test_query_joins_rollups_and_raw_samples():
+    store = TimeSeriesStore(capacity=40)
+    fill(store, "a", 4, rate=8)
+    store.compact(now=T0 + 4)
+    fill(store, "a", 4, rate=8, start=T0 + 4)
+    assert store.raw.evicted
+    result = store.query("a", T0, T0 + 8, buckets=8)
+    assert result["count"] == [8] * 8
+    assert result["avg"] == pytest.approx([i + 0.4375 for i in range(8)])
+
+
+def test_query_reads_history_before_memory():
+    # The raw ring reaches further back than the rollup ring here, as it
+    # does for slowly sampled series; no second may be counted twice
+    store = TimeSeriesStore(capacity=20, rollup_capacity=4)
+    fill(store, "a", 10, rate=2)
+    for second in range(1, 11):
+        store.compact(now=T0 + second)
+    documents = store.chunk_documents(store.take_pending())
+    assert [document["key"] for document in documents] == ["a"]
+    assert store.memory_start() == T0 + 7
+
+    history = store.rows_from_documents(documents)
+    result = store.query("a", T0, T0 + 10, buckets=10, history=history)
+    assert result["count"] == [2] * 10
+    assert result["avg"] == pytest.approx([i + 0.25 for i in range(10)])
+
+
+def test_series_of_other_keys_are_not_mixed_in():
+    store = TimeSeriesStore()
+    fill(store, "a", 2, rate=4)
+    fill(store, "b", 2, rate=4, value=lambda t: 100.0)
+    assert store.query("a", T0, T0 + 2, buckets=1)["max"] == pytest.approx([1.75])
+    assert store.query("b", T0, T0 + 2, buckets=1)["min"] == [100.0]
+    assert store.query("missing", T0, T0 + 2)["t"] == []
+
+
+def test_forget_retires_keys_after_their_last_compaction():
+    store = TimeSeriesStore()
+    fill(store, "process:1:rss", 2, rate=4)
+    fill(store, "process:2:rss", 2, rate=4)
+    assert store.forget(["process:1:"]) == 1
+    assert [series["key"] for series in store.series()] == ["process:2:rss"]
+    assert store.stats()["series"] == 1
+    assert store.query("process:1:rss", T0, T0 + 2)["t"] == []
+
+    store.compact(now=T0 + 3)
+    documents = store.chunk_documents(store.take_pending())
+    assert sorted(document["key"] for document in documents) == ["process:1:rss", "process:2:rss"]
+    assert list(store._keys.values()) == ["process:2:rss"]
+
+    # A key used again after it was forgotten starts a new series
+    new = store.series_ids(["process:1:rss"])
+    assert new.tolist() == [2]
+
+
+def test_disconnect_forgets_process_series(api, spawn_target):
+    target = spawn_target("--heap-mb", "1")
+    assert api.post(f"/api/processes/{target.pid}/connect").status_code == 200
+    with api.websocket_connect(f"/api/ws/monitor/{target.pid}") as websocket:
+        websocket.receive_text()
+    keys = [series["key"] for series in api.get("/api/time-series").json()["series"]]
+    assert f"process:{target.pid}:rss" in keys
+
+    assert api.post(f"/api/processes/{target.pid}/disconnect").status_code == 200
+    keys = [series["key"] for series in api.get("/api/time-series").json()["series"]]
+    assert not [key for key in keys if key.startswith(f"process:{target.pid}:")]
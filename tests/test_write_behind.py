@@ -0,0 +1,136 @@
+"""Write-behind queue: flushing, draining on shutdown and failed bulk writes"""
+import asyncio
+
+import pytest
+from pymongo import InsertOne
+
+from write_behind import WriteBehindQueue
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+class FlakyDatabase:
+    """Mongo database whose bulk writes raise ``failures`` times before they work"""
+
+    def __init__(self, db, failures: int):
+        self.db = db
+        self.failures = failures
+
+    def __getitem__(self, name):
+        return FlakyCollection(self, self.db[name])
+
+
+class FlakyCollection:
+    def __init__(self, database: FlakyDatabase, collection):
+        self.database = database
+        self.collection = collection
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.database.failures:
+            self.database.failures -= 1
+            raise ConnectionError("connection reset")
+        return await self.collection.bulk_write(operations, ordered=ordered)
+
+
+def run(test):
+    """Run ``test(db)`` against a fresh in-memory database"""
+    return asyncio.run(test(mongomock_motor.AsyncMongoMockClient()["write_behind"]))
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_flushes_after_max_delay():
+    async def test(db):
+        flushed = []
+        writes = WriteBehindQueue(max_delay=0.02, on_flush=flushed.append)
+        writes.start(db)
+        await writes.put_many("events", [InsertOne({"n": n}) for n in range(10)])
+        await wait_for(lambda: writes.written == 10)
+        assert await db.events.count_documents({}) == 10
+        assert flushed == ["events"]
+        await writes.close()
+
+    run(test)
+
+
+def test_full_batches_flush_without_waiting():
+    async def test(db):
+        writes = WriteBehindQueue(max_batch=5, max_delay=60)
+        writes.start(db)
+        await writes.put_many("events", [InsertOne({"n": n}) for n in range(10)])
+        await wait_for(lambda: writes.written == 10)
+        assert writes.flushes == 2
+        await writes.close()
+
+    run(test)
+
+
+def test_close_drains_the_queue_in_order():
+    async def test(db):
+        writes = WriteBehindQueue(max_batch=7, max_delay=60)
+        writes.start(db)
+        await writes.put_many("events", [InsertOne({"n": n}) for n in range(100)])
+        await writes.close()
+        assert len(writes) == 0
+        assert writes.written == 100
+        assert [event["n"] for event in await db.events.find().sort("_id", 1).to_list(None)] == list(range(100))
+
+    run(test)
+
+
+def test_rejected_operation_keeps_the_rest():
+    async def test(db):
+        await db.events.create_index("n", unique=True)
+        writes = WriteBehindQueue(max_delay=60)
+        writes.start(db)
+        await writes.put_many("events", [InsertOne({"n": n}) for n in (1, 2, 1, 3, 4)])
+        await writes.close()
+        assert (writes.written, writes.failed, writes.retried) == (4, 1, 2)
+        assert sorted(await db.events.distinct("n")) == [1, 2, 3, 4]
+
+    run(test)
+
+
+def test_failed_flush_is_retried():
+    async def test(db):
+        writes = WriteBehindQueue(max_delay=0.01)
+        writes.start(FlakyDatabase(db, failures=2))
+        await writes.put_many("events", [InsertOne({"n": n}) for n in range(3)])
+        await wait_for(lambda: writes.written == 3)
+        assert writes.failed == 0
+        assert writes.retried == 6
+        await writes.close()
+
+    run(test)
+
+
+def test_retries_are_bounded():
+    async def test(db):
+        writes = WriteBehindQueue(max_delay=0.01, max_attempts=3)
+        writes.start(FlakyDatabase(db, failures=100))
+        await writes.put_many("events", [InsertOne({"n": n}) for n in range(3)])
+        await wait_for(lambda: writes.failed == 3)
+        assert len(writes) == 0
+        assert writes.written == 0
+        await writes.close()
+
+    run(test)
+
+
+def test_raising_flush_callback_does_not_stop_the_writer():
+    async def test(db):
+        def on_flush(collection):
+            raise RuntimeError("listener failed")
+
+        writes = WriteBehindQueue(max_batch=2, max_delay=0.01, max_pending=4, on_flush=on_flush)
+        writes.start(db)
+        await asyncio.wait_for(writes.put_many("events", [InsertOne({"n": n}) for n in range(20)]), 2)
+        await wait_for(lambda: writes.written == 20)
+        await writes.close()
+
+    run(test)